@@ -0,0 +1,259 @@
+"""Hourly and daily conversion rollups for the admin dashboard, counted in memory and flushed as ``$inc`` upserts."""
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_FLUSH_SECONDS = float(os.environ.get('ANALYTICS_FLUSH_SECONDS', 5))
+ANALYTICS_MAX_HOURLY_SPAN = timedelta(days=31)
+BACKFILL_LOCK_ID = "analytics_backfill"
+BACKFILL_LEASE = timedelta(hours=1)
+
+# Counters
+REGISTRATIONS = "registrations"
+LOGINS = "logins"
+LOGIN_FAILURES = "login_failures"
+LOGINS_MFA_REQUIRED = "logins_mfa_required"
+MFA_SENT_EMAIL = "mfa_sent_email"
+MFA_SENT_SMS = "mfa_sent_sms"
+MFA_VERIFIED = "mfa_verified"
+MFA_REJECTED = "mfa_rejected"
+APPLICATIONS_SUBMITTED = "applications_submitted"
+# Application funnel after submission, one counter per lead status reached
+APPLICATION_STAGE_COUNTERS = {
+    "Reviewing": "applications_reviewing",
+    "Contacted": "applications_contacted",
+    "Approved": "applications_approved",
+    "Declined": "applications_declined",
+}
+FUNNEL = [
+    APPLICATIONS_SUBMITTED,
+    "applications_reviewing",
+    "applications_contacted",
+    "applications_approved",
+]
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rate(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator * 100, 1) if denominator else None
+
+
+class AnalyticsRollups:
+    def __init__(self, db, flush_seconds: float = ANALYTICS_FLUSH_SECONDS):
+        self.db = db
+        self.flush_seconds = flush_seconds
+        # hour (day) bucket -> counter name -> count, waiting for the next flush
+        self._pending: Dict[datetime, Counter] = {}
+        self._pending_daily: Dict[datetime, Counter] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self.backfill_state: Dict[str, Any] = {"status": "idle"}
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info("Analytics rollups started")
+
+    async def stop(self):
+        for task in (self._task, self._backfill_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = None
+        self._backfill_task = None
+        await self.flush()
+
+    def record(self, counter: str, count: int = 1):
+        hour = hour_bucket(datetime.utcnow())
+        self._pending.setdefault(hour, Counter())[counter] += count
+        self._pending_daily.setdefault(day_bucket(hour), Counter())[counter] += count
+
+    async def flush(self):
+        hourly, self._pending = self._pending, {}
+        daily, self._pending_daily = self._pending_daily, {}
+        if not hourly and not daily:
+            return
+        # Each rollup requeues only its own counts, so a failed write is
+        # retried without applying the one that succeeded a second time
+        failed = False
+        if hourly and not await self._write(self.db.analytics_hourly, hourly):
+            self._requeue(self._pending, hourly)
+            failed = True
+        if daily and not await self._write(self.db.analytics_daily, daily):
+            self._requeue(self._pending_daily, daily)
+            failed = True
+        if not failed:
+            self.flushes += 1
+
+    async def _write(self, collection, buckets: Dict[datetime, Counter]) -> bool:
+        try:
+            await collection.bulk_write(self._increments(buckets), ordered=False)
+            return True
+        except Exception as e:
+            logger.error(f"Analytics rollup flush to {collection.name} failed: {e}")
+            return False
+
+    @staticmethod
+    def _requeue(pending: Dict[datetime, Counter], buckets: Dict[datetime, Counter]):
+        # Kept for the next pass rather than dropped
+        for bucket, counts in buckets.items():
+            pending.setdefault(bucket, Counter()).update(counts)
+
+    @staticmethod
+    def _increments(buckets: Dict[datetime, Counter]) -> List[UpdateOne]:
+        return [
+            UpdateOne(
+                {"_id": bucket},
+                {"$inc": {f"counts.{counter}": count for counter, count in counts.items()}},
+                upsert=True,
+            )
+            for bucket, counts in buckets.items()
+        ]
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def summary(self, since: datetime, until: datetime, granularity: str) -> Dict[str, Any]:
+        collection = self.db.analytics_hourly if granularity == "hour" else self.db.analytics_daily
+        start = hour_bucket(since) if granularity == "hour" else day_bucket(since)
+        cursor = collection.find({"_id": {"$gte": start, "$lt": until}}).sort("_id", 1)
+        series = []
+        totals: Counter = Counter()
+        async for bucket in cursor:
+            series.append({"bucket": bucket["_id"], "counts": bucket.get("counts", {})})
+            totals.update(bucket.get("counts", {}))
+
+        mfa_sent = totals[MFA_SENT_EMAIL] + totals[MFA_SENT_SMS]
+        funnel = []
+        for index, stage in enumerate(FUNNEL):
+            previous = totals[FUNNEL[index - 1]] if index else None
+            funnel.append({
+                "stage": stage,
+                "count": totals[stage],
+                "conversion_rate": _rate(totals[stage], previous) if previous is not None else None,
+            })
+        return {
+            "since": start,
+            "until": until,
+            "granularity": granularity,
+            "totals": dict(totals),
+            "rates": {
+                "login_success_rate": _rate(totals[LOGINS], totals[LOGINS] + totals[LOGIN_FAILURES]),
+                "mfa_verify_success_rate": _rate(totals[MFA_VERIFIED], totals[MFA_VERIFIED] + totals[MFA_REJECTED]),
+                "mfa_completion_rate": _rate(totals[MFA_VERIFIED], mfa_sent),
+            },
+            "funnel": funnel,
+            "series": series,
+        }
+
+    async def start_backfill(self, since: Optional[datetime] = None) -> bool:
+        """Run ``backfill`` in the background; False if one is already running on any worker"""
+        now = datetime.utcnow()
+        try:
+            # One run at a time; a second would only repeat the same work
+            await self.db.app_settings.update_one(
+                {"_id": BACKFILL_LOCK_ID, "lease_until": {"$lt": now}},
+                {"$set": {"lease_until": now + BACKFILL_LEASE}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        self._backfill_task = asyncio.create_task(self.backfill(since))
+        return True
+
+    async def backfill(self, since: Optional[datetime] = None):
+        # The current hour is still being counted live; leave it alone
+        until = hour_bucket(datetime.utcnow())
+        self.backfill_state = {"status": "running", "since": since, "until": until, "started_at": datetime.utcnow()}
+        try:
+            # (collection, time field, counter)
+            sources = [
+                (self.db.users, "created_at", REGISTRATIONS),
+                (self.db.applications, "created_at", APPLICATIONS_SUBMITTED),
+            ]
+            hourly: Dict[datetime, Counter] = {}
+            for collection, time_field, counter in sources:
+                async for row in self._hourly_counts(collection, time_field, since, until):
+                    hourly.setdefault(row["_id"], Counter())[counter] += row["count"]
+
+            await self._raise_counts(hourly)
+            self.backfill_state.update({"status": "done", "hours": len(hourly), "finished_at": datetime.utcnow()})
+            logger.info(f"Analytics backfill checked {len(hourly)} hours")
+        except Exception as e:
+            self.backfill_state.update({"status": "failed", "error": str(e), "finished_at": datetime.utcnow()})
+            logger.error(f"Analytics backfill failed: {e}")
+        finally:
+            await self.db.app_settings.update_one({"_id": BACKFILL_LOCK_ID}, {"$set": {"lease_until": datetime.utcnow()}})
+
+    @staticmethod
+    def _window(since: Optional[datetime], until: datetime) -> Dict[str, Any]:
+        window: Dict[str, Any] = {"$lt": until}
+        if since is not None:
+            window["$gte"] = hour_bucket(since)
+        return window
+
+    def _hourly_counts(self, collection, time_field: str, since: Optional[datetime], until: datetime):
+        date = f"${time_field}"
+        return collection.aggregate([
+            {"$match": {time_field: self._window(since, until)}},
+            {"$group": {
+                # $dateFromParts rather than $dateTrunc, which needs MongoDB 5
+                "_id": {"$dateFromParts": {
+                    "year": {"$year": date}, "month": {"$month": date},
+                    "day": {"$dayOfMonth": date}, "hour": {"$hour": date},
+                }},
+                "count": {"$sum": 1},
+            }},
+        ])
+
+    async def _raise_counts(self, hourly: Dict[datetime, Counter]):
+        """Raise each hour's counters to at least ``hourly`` and move the daily totals by what changed"""
+        daily_deltas: Dict[datetime, Counter] = {}
+        for hour, counts in hourly.items():
+            # The document as it was just before $max, so the daily
+            # difference is exact even if a live flush lands in between
+            before = await self.db.analytics_hourly.find_one_and_update(
+                {"_id": hour},
+                {"$max": {f"counts.{counter}": count for counter, count in counts.items()}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+            previous = (before or {}).get("counts", {})
+            delta = daily_deltas.setdefault(day_bucket(hour), Counter())
+            for counter, count in counts.items():
+                delta[counter] += max(0, count - previous.get(counter, 0))
+        # $inc by the change, so live flushes into the same day are never overwritten
+        changed = {day: +delta for day, delta in daily_deltas.items() if +delta}
+        if changed:
+            await self.db.analytics_daily.bulk_write(self._increments(changed), ordered=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending_hours": len(self._pending),
+            "flushes": self.flushes,
+            "backfill": self.backfill_state,
+        }
@@ -0,0 +1,379 @@
+"""Investor applications: stored in ``applications`` and synced to Airtable in batches by a background worker."""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException, status
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from leads import NEW_LEAD_STATUS, lead_fields
+
+logger = logging.getLogger(__name__)
+
+AIRTABLE_API_URL = os.environ.get('AIRTABLE_API_URL', 'https://api.airtable.com/v0')
+# Airtable rejects requests with more than 10 records
+AIRTABLE_BATCH_LIMIT = 10
+AIRTABLE_REQUEST_TIMEOUT_SECONDS = 10
+# Airtable allows 5 requests per second per base
+AIRTABLE_MIN_REQUEST_INTERVAL_SECONDS = float(os.environ.get('AIRTABLE_MIN_REQUEST_INTERVAL_SECONDS', 0.25))
+AIRTABLE_RATE_LIMIT_PAUSE_SECONDS = 30
+APPLICATION_SYNC_POLL_SECONDS = float(os.environ.get('APPLICATION_SYNC_POLL_SECONDS', 5))
+APPLICATION_SYNC_MAX_ATTEMPTS = int(os.environ.get('APPLICATION_SYNC_MAX_ATTEMPTS', 8))
+APPLICATION_SYNC_BACKOFF_SECONDS = float(os.environ.get('APPLICATION_SYNC_BACKOFF_SECONDS', 5))
+APPLICATION_SYNC_MAX_BACKOFF_SECONDS = 3600
+APPLICATION_SYNC_LEASE_SECONDS = 60
+APPLICATION_MAX_BACKLOG = int(os.environ.get('APPLICATION_MAX_BACKLOG', 5000))
+
+# Sync states
+SYNC_PENDING = "pending"
+SYNC_CLAIMED = "syncing"
+SYNC_RETRYING = "retrying"
+SYNCED = "synced"
+SYNC_DEAD = "dead"
+UNSYNCED_STATES = [SYNC_PENDING, SYNC_CLAIMED, SYNC_RETRYING]
+
+def default_idempotency_key(application: Dict[str, Any]) -> str:
+    """Identical resubmissions of the same form hash to the same key"""
+    return hashlib.sha256(orjson.dumps(application, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def airtable_fields(application: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "Application ID": application["id"],
+        "First Name": application["first_name"],
+        "Last Name": application["last_name"],
+        "Email": application["email"],
+        "Phone": application.get("phone") or "",
+        "Investment Capacity": application["investment_capacity"],
+        "Accredited Status": application["accredited_status"],
+        "Investment Experience": application.get("investment_experience") or "",
+        "How They Heard": application.get("hear_about_us") or "",
+        "Additional Info": application.get("additional_info") or "",
+        "Application Source": application["source"],
+        "Lead Score": application["lead_score"],
+        "Application Date": application["created_at"].isoformat(),
+        "Status": application["status"],
+        "Follow Up Required": application["follow_up_required"],
+        "Follow Up Notes": application.get("follow_up_notes") or "",
+        "Investment Interest Level": application["interest_level"],
+        "Priority": application["priority"],
+    }
+
+
+class AirtableError(Exception):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AirtableClient:
+    """Upserts records through the Airtable REST API"""
+
+    def __init__(self, api_key: str, base_id: str, table_name: str, api_url: str = AIRTABLE_API_URL, transport=None):
+        # Only this backend needs httpx, so LocalAirtable deployments never import it
+        import httpx
+
+        self.url = f"{api_url}/{base_id}/{table_name}"
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=AIRTABLE_REQUEST_TIMEOUT_SECONDS,
+            transport=transport,
+        )
+
+    async def upsert(self, records: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Create or update rows merged on "Application ID"; returns application id -> record id"""
+        import httpx
+
+        try:
+            response = await self._client.patch(self.url, json={
+                "performUpsert": {"fieldsToMergeOn": ["Application ID"]},
+                "records": [{"fields": fields} for fields in records],
+                "typecast": True,
+            })
+        except httpx.HTTPError as e:
+            raise AirtableError(f"{e.__class__.__name__}: {e}")
+        if response.status_code == 429:
+            raise AirtableError("rate limited", retry_after=AIRTABLE_RATE_LIMIT_PAUSE_SECONDS)
+        if response.status_code >= 400:
+            raise AirtableError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return {record["fields"]["Application ID"]: record["id"] for record in response.json()["records"]}
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class LocalAirtable:
+    """Local stand-in with Airtable's batch limit and upsert semantics; fails ``failure_rate`` of requests"""
+
+    def __init__(self, failure_rate: float = 0.0, latency_seconds: float = 0.0):
+        self.failure_rate = failure_rate
+        self.latency_seconds = latency_seconds
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+
+    async def upsert(self, records: List[Dict[str, Any]]) -> Dict[str, str]:
+        self.requests += 1
+        await asyncio.sleep(self.latency_seconds)
+        if len(records) > AIRTABLE_BATCH_LIMIT:
+            raise AirtableError(f"HTTP 422: at most {AIRTABLE_BATCH_LIMIT} records per request")
+        if random.random() < self.failure_rate:
+            raise AirtableError("HTTP 503: simulated outage")
+        record_ids = {}
+        for fields in records:
+            application_id = fields["Application ID"]
+            existing = self.records.get(application_id)
+            record_id = existing["id"] if existing else f"rec{uuid.uuid4().hex[:14]}"
+            self.records[application_id] = {"id": record_id, "fields": fields}
+            record_ids[application_id] = record_id
+        return record_ids
+
+    async def close(self):
+        pass
+
+
+class ApplicationPipeline:
+    def __init__(
+        self,
+        db,
+        airtable: Optional[Any],
+        batch_size: int = AIRTABLE_BATCH_LIMIT,
+        poll_seconds: float = APPLICATION_SYNC_POLL_SECONDS,
+        max_attempts: int = APPLICATION_SYNC_MAX_ATTEMPTS,
+        backoff_seconds: float = APPLICATION_SYNC_BACKOFF_SECONDS,
+        max_backlog: int = APPLICATION_MAX_BACKLOG,
+        min_request_interval: float = AIRTABLE_MIN_REQUEST_INTERVAL_SECONDS,
+    ):
+        self.db = db
+        self.airtable = airtable
+        self.batch_size = max(1, min(batch_size, AIRTABLE_BATCH_LIMIT))
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backlog = max_backlog
+        self.min_request_interval = min_request_interval
+        # Refreshed from MongoDB by the worker, bumped locally on submit
+        self.backlog = 0
+        self.synced = 0
+        self.failed_batches = 0
+        self.dead = 0
+        self.last_error: Optional[str] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._sync_loop())
+        if self.airtable is None:
+            logger.warning("No AIRTABLE_BACKEND configured; applications are stored but not synced")
+        else:
+            logger.info(f"Application sync started with {self.airtable.__class__.__name__}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Claimed records are picked up again once their lease runs out
+        if self.airtable is not None:
+            await self.airtable.close()
+
+    async def submit(self, application: Dict[str, Any], idempotency_key: Optional[str] = None,
+                     client_ip: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """Store an application for syncing; returns (stored document, whether it is new)"""
+        key = idempotency_key or default_idempotency_key(application)
+        existing = await self.db.applications.find_one({"idempotency_key": key}, {"_id": 0})
+        if existing is not None:
+            return existing, False
+        # Without a backend the backlog only grows; keep taking applications
+        if self.airtable is not None and self.backlog >= self.max_backlog:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Applications are busy, please retry shortly",
+                headers={"Retry-After": str(max(1, round(self.poll_seconds)))},
+            )
+
+        now = datetime.utcnow()
+        document = {
+            "id": str(uuid.uuid4()),
+            "idempotency_key": key,
+            **application,
+            **lead_fields(application),
+            "status": NEW_LEAD_STATUS,
+            "follow_up_required": True,
+            "client_ip": client_ip,
+            "created_at": now,
+            "sync_status": SYNC_PENDING,
+            "sync_attempts": 0,
+            "next_sync_at": now,
+            "airtable_record_id": None,
+            "last_sync_error": None,
+        }
+        try:
+            await self.db.applications.insert_one(document)
+        except DuplicateKeyError:
+            # The same key raced in from another request
+            return await self.db.applications.find_one({"idempotency_key": key}, {"_id": 0}), False
+        document.pop("_id", None)
+        self.backlog += 1
+        self._wake.set()
+        return document, True
+
+    async def requeue(self, application_id: str):
+        """Sync an application again, e.g. after an admin edited it"""
+        await self.db.applications.update_one(
+            {"id": application_id},
+            {
+                "$set": {"sync_status": SYNC_PENDING, "sync_attempts": 0, "next_sync_at": datetime.utcnow()},
+                # Dropping the claim keeps an upload already in flight from marking the edit as synced
+                "$unset": {"sync_claim": ""},
+            },
+        )
+        self._wake.set()
+
+    async def sync_once(self) -> int:
+        """Push one batch of due records; returns how many were claimed"""
+        if self.airtable is None:
+            return 0
+        batch = await self._claim()
+        if not batch:
+            return 0
+        try:
+            record_ids = await self.airtable.upsert([airtable_fields(application) for application in batch])
+        except AirtableError as e:
+            self.failed_batches += 1
+            self.last_error = str(e)
+            logger.warning(f"Airtable sync of {len(batch)} applications failed: {e}")
+            await self._reschedule(batch, str(e), e.retry_after)
+            return len(batch)
+
+        now = datetime.utcnow()
+        await self.db.applications.bulk_write(
+            [
+                UpdateOne(
+                    # An edit made during the upload dropped the claim; leave it queued
+                    {"id": application["id"], "sync_claim": application["sync_claim"]},
+                    {
+                        "$set": {
+                            "sync_status": SYNCED,
+                            "airtable_record_id": record_ids.get(application["id"]),
+                            "synced_at": now,
+                            "last_sync_error": None,
+                        },
+                        "$inc": {"sync_attempts": 1},
+                        "$unset": {"next_sync_at": "", "sync_claim": ""},
+                    },
+                )
+                for application in batch
+            ],
+            ordered=False,
+        )
+        self.synced += len(batch)
+        return len(batch)
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        now = datetime.utcnow()
+        due = {"sync_status": {"$in": UNSYNCED_STATES}, "next_sync_at": {"$lte": now}}
+        cursor = self.db.applications.find(due, {"_id": 0, "id": 1}).sort("next_sync_at", 1).limit(self.batch_size)
+        candidates = await cursor.to_list(self.batch_size)
+        if not candidates:
+            return []
+        ids = [candidate["id"] for candidate in candidates]
+        # Re-checking "due" in the update means another worker's claim wins cleanly;
+        # the claim token tells us which of the candidates we actually got
+        claim_token = str(uuid.uuid4())
+        await self.db.applications.update_many(
+            {"id": {"$in": ids}, **due},
+            {"$set": {
+                "sync_status": SYNC_CLAIMED,
+                "next_sync_at": now + timedelta(seconds=APPLICATION_SYNC_LEASE_SECONDS),
+                "sync_claim": claim_token,
+            }},
+        )
+        return await self.db.applications.find({"id": {"$in": ids}, "sync_claim": claim_token}, {"_id": 0}).to_list(self.batch_size)
+
+    async def _reschedule(self, batch: List[Dict[str, Any]], error: str, retry_after: Optional[float]):
+        now = datetime.utcnow()
+        updates = []
+        for application in batch:
+            attempts = application["sync_attempts"] + 1
+            if attempts >= self.max_attempts:
+                self.dead += 1
+                logger.error(f"Giving up on syncing application {application['id']} after {attempts} attempts: {error}")
+                update = {"$set": {"sync_status": SYNC_DEAD, "sync_attempts": attempts, "last_sync_error": error},
+                          "$unset": {"next_sync_at": "", "sync_claim": ""}}
+            else:
+                delay = retry_after or min(self.backoff_seconds * 2 ** (attempts - 1), APPLICATION_SYNC_MAX_BACKOFF_SECONDS)
+                update = {"$set": {
+                    "sync_status": SYNC_RETRYING,
+                    "sync_attempts": attempts,
+                    "next_sync_at": now + timedelta(seconds=delay),
+                    "last_sync_error": error,
+                }}
+            updates.append(UpdateOne({"id": application["id"], "sync_claim": application["sync_claim"]}, update))
+        await self.db.applications.bulk_write(updates, ordered=False)
+
+    async def _sync_loop(self):
+        while True:
+            try:
+                self.backlog = await self.db.applications.count_documents({"sync_status": {"$in": UNSYNCED_STATES}})
+                claimed = await self.sync_once()
+            except Exception as e:
+                logger.error(f"Application sync pass failed: {e}")
+                claimed = 0
+            if claimed:
+                # Stay under Airtable's per-base request rate
+                await asyncio.sleep(self.min_request_interval)
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sync_counts(self) -> Dict[str, int]:
+        counts = {state: 0 for state in UNSYNCED_STATES + [SYNCED, SYNC_DEAD]}
+        async for row in self.db.applications.aggregate([{"$group": {"_id": "$sync_status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "backend": self.airtable.__class__.__name__ if self.airtable is not None else None,
+            "backlog": self.backlog,
+            "max_backlog": self.max_backlog,
+            "synced": self.synced,
+            "failed_batches": self.failed_batches,
+            "dead": self.dead,
+            "last_error": self.last_error,
+        }
+
+
+def create_application_pipeline(db) -> ApplicationPipeline:
+    backend = os.environ.get('AIRTABLE_BACKEND') or ('airtable' if os.environ.get('AIRTABLE_API_KEY') else 'none')
+    if backend == "airtable":
+        airtable = AirtableClient(
+            os.environ['AIRTABLE_API_KEY'],
+            os.environ['AIRTABLE_BASE_ID'],
+            os.environ.get('AIRTABLE_TABLE_NAME', 'Investor_Applications'),
+        )
+    elif backend == "local":
+        airtable = LocalAirtable()
+    elif backend == "none":
+        airtable = None
+    else:
+        raise ValueError(f"Unknown AIRTABLE_BACKEND: {backend}")
+    return ApplicationPipeline(db, airtable)
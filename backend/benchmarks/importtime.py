@@ -0,0 +1,117 @@
+"""Startup profiling report: a digest of ``python -X importtime``.
+
+Imports the app in a fresh interpreter with ``-X importtime`` and folds the
+per-module lines into what is worth acting on:
+
+- total import time
+- the heaviest top-level packages, by self time summed over their modules
+- for each first-party module, the third-party packages it imports
+  directly and what they cost cumulatively, so a slow import can be
+  traced to the ``import`` line that pulled it in
+
+Run from the backend directory (the app reads MONGO_URL and DB_NAME at
+import time, so set them if .env doesn't):
+
+    python -m benchmarks.importtime --top 20
+    python -m benchmarks.importtime --module server --repeat 5 --max-ms 1000
+
+``--max-ms`` exits 1 when the total is over budget, for CI. Numbers vary
+with disk cache state, so the report uses the fastest of ``--repeat``
+runs (the first run after an install also compiles bytecode).
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+class ImportLine(NamedTuple):
+    self_us: int
+    cumulative_us: int
+    depth: int
+    module: str
+
+
+def run_importtime(module: str) -> List[ImportLine]:
+    env = {"MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "importtime", **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    lines = []
+    for raw in result.stderr.splitlines():
+        match = LINE.match(raw)
+        if match:
+            lines.append(ImportLine(int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+    return lines
+
+
+def first_party_modules() -> set:
+    return {path.stem for path in BACKEND_DIR.glob("*.py")} | {
+        path.name for path in BACKEND_DIR.iterdir() if (path / "__init__.py").exists()
+    }
+
+
+def direct_imports(lines: List[ImportLine], first_party: set) -> Dict[str, Dict[str, int]]:
+    """first-party module -> third-party top-level package -> cumulative us it caused"""
+    # -X importtime prints children before their parent, so walk backwards
+    # keeping the chain of open parents per depth
+    caused: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    parents: Dict[int, str] = {}
+    for line in reversed(lines):
+        parents[line.depth] = line.module
+        parent = parents.get(line.depth - 1)
+        if parent is None:
+            continue
+        parent_root, root = parent.split(".")[0], line.module.split(".")[0]
+        if parent_root in first_party and root not in first_party and root != parent_root:
+            caused[parent_root][root] += line.cumulative_us
+    return caused
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-ms", type=float, help="exit 1 when the total import time is over this")
+    args = parser.parse_args()
+
+    runs = [run_importtime(args.module) for _ in range(max(1, args.repeat))]
+    lines = min(runs, key=lambda run: sum(line.self_us for line in run))
+    total_ms = sum(line.self_us for line in lines) / 1000
+    print(f"import {args.module}: {total_ms:.0f} ms across {len(lines)} modules\n")
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for line in lines:
+        by_package[line.module.split(".")[0]] += line.self_us
+    print(f"{'self ms':>8}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{self_us / 1000:>8.1f}  {package}")
+
+    print(f"\n{'cum ms':>8}  first-party module -> third-party import")
+    rows = [
+        (cumulative_us, f"{module} -> {package}")
+        for module, packages in direct_imports(lines, first_party_modules()).items()
+        for package, cumulative_us in packages.items()
+    ]
+    for cumulative_us, label in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>8.1f}  {label}")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nimport time {total_ms:.0f} ms is over the {args.max_ms:.0f} ms budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Replayable in-process load suite for the API.
+
+Drives the ASGI app directly through httpx (no network, no remote preview
+URL) with the scenarios backend_test.py walks through one by one, replayed
+concurrently:
+
+- register_storm: concurrent sign-ups
+- login_mfa: password login, MFA code request and verify per user
+- auth_me_polling: dashboard polling of /api/auth/me with one token
+- admin_listing: paging through /api/admin/users at each --sizes user count
+
+MongoDB is mongomock-motor by default. Pass
+``--mongo-url`` to use a real, preferably ephemeral, mongod instead; the
+``--db-name`` database is dropped before each run. Results (p50/p95/p99 ms,
+req/s) are printed and written as JSON; ``--compare`` prints the change
+against an earlier results file.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_suite --sizes 1000 10000 --output bench.json
+    python -m benchmarks.load_suite --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BENCH_PASSWORD = "Bench@123456"
+
+
+def configure_environment(args):
+    # server.py reads its settings at import time
+    os.environ["MONGO_URL"] = args.mongo_url or "mongodb://localhost:27017"
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("MFA_STORE", "memory")
+    os.environ.setdefault("MONGO_INDEX_SELF_CHECK", "false")
+    # Every replayed request comes from one client IP
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("BCRYPT_ROUNDS", str(args.bcrypt_rounds))
+    os.environ.setdefault("MONGO_MIN_POOL_SIZE", "0")
+    if not args.mongo_url:
+        import mongomock_motor
+
+        import database
+
+        database.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+
+class CapturingProvider:
+    """Notification provider that hands MFA codes back to the benchmark"""
+
+    def __init__(self):
+        self.codes = {}
+
+    async def send_batch(self, notifications):
+        for notification in notifications:
+            self.codes[notification.verification_id] = notification.code
+        return [None] * len(notifications)
+
+    async def wait_for(self, verification_id, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while verification_id not in self.codes:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"MFA code for {verification_id} never delivered")
+            await asyncio.sleep(0.001)
+        return self.codes.pop(verification_id)
+
+
+def summarize(name, latencies, errors, wall_seconds, **extra):
+    latencies = sorted(latencies)
+
+    def percentile(fraction):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    result = {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "rps": round(len(latencies) / wall_seconds, 1) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(0.50), 2),
+        "p95_ms": round(percentile(0.95), 2),
+        "p99_ms": round(percentile(0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+    result.update(extra)
+    return result
+
+
+async def replay(total, concurrency, operation):
+    """Run ``operation(i)`` for i in range(total) over ``concurrency`` lanes; returns (latencies, errors, wall)"""
+    latencies, errors = [], 0
+    counter = iter(range(total))
+
+    async def lane():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(lane() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def expect(response, status_code=200):
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path}: {response.status_code}")
+    return response
+
+
+async def register_storm(client, ctx, args):
+    run_id = int(time.time())
+
+    async def register(i):
+        expect(await client.post("/api/auth/register", json={"email": f"storm{run_id}_{i}@bench.example.com", "password": BENCH_PASSWORD}))
+
+    return [summarize("register_storm", *await replay(args.registrations, args.concurrency, register))]
+
+
+async def login_mfa(client, ctx, args):
+    server = ctx["server"]
+    emails = [f"mfa{i}@bench.example.com" for i in range(args.mfa_users)]
+    await seed_users(server, emails, ctx["password_hash"], mfa_enabled=True)
+    provider = ctx["provider"]
+
+    async def flow(i):
+        email = emails[i % len(emails)]
+        login = expect(await client.post("/api/auth/login", json={"email": email, "password": BENCH_PASSWORD})).json()
+        if not login["requires_mfa"]:
+            raise RuntimeError("expected an MFA challenge")
+        sent = expect(await client.post("/api/mfa/send-code", json={"email": email, "method": "email"})).json()
+        code = await provider.wait_for(sent["verification_id"])
+        expect(await client.post("/api/mfa/verify-code", json={"email": email, "code": code}))
+
+    # Each flow reuses its user, so keep lanes from racing on one email's code
+    concurrency = min(args.concurrency, len(emails))
+    return [summarize("login_mfa", *await replay(args.logins, concurrency, flow))]
+
+
+async def auth_me_polling(client, ctx, args):
+    headers = ctx["admin_headers"]
+
+    async def poll(i):
+        expect(await client.get("/api/auth/me", headers=headers))
+
+    return [summarize("auth_me_polling", *await replay(args.polls, args.concurrency, poll))]
+
+
+async def admin_listing(client, ctx, args):
+    server = ctx["server"]
+    results = []
+    seeded = 0
+    for size in sorted(args.sizes):
+        emails = [f"list{i}@bench.example.com" for i in range(seeded, size)]
+        await seed_users(server, emails, ctx["password_hash"])
+        seeded = size
+
+        latencies = []
+        started = time.perf_counter()
+        after, listed = None, 0
+        while True:
+            params = {"limit": args.page_size}
+            if after:
+                params["after"] = after
+            request_started = time.perf_counter()
+            response = expect(await client.get("/api/admin/users", params=params, headers=ctx["admin_headers"]))
+            latencies.append(time.perf_counter() - request_started)
+            listed += len(response.json())
+            after = response.headers.get("x-next-after")
+            if not after:
+                break
+        results.append(summarize(
+            "admin_listing", latencies, 0, time.perf_counter() - started,
+            users=size, listed=listed, page_size=args.page_size,
+        ))
+
+        stream_started = time.perf_counter()
+        response = expect(await client.get("/api/admin/users", params={"format": "ndjson"}, headers=ctx["admin_headers"]))
+        stream_seconds = time.perf_counter() - stream_started
+        results.append(summarize(
+            "admin_listing_ndjson", [stream_seconds], 0, stream_seconds,
+            users=size, listed=response.text.count("\n"),
+        ))
+    return results
+
+
+async def seed_users(server, emails, password_hash, mfa_enabled=False):
+    # Straight into MongoDB: seeding shouldn't pay for bcrypt per user
+    batch = []
+    for email in emails:
+        user = server.User(email=email, hashed_password=password_hash, mfa_enabled=mfa_enabled, mfa_method="email" if mfa_enabled else None)
+        batch.append(user.dict())
+        if len(batch) == 5000:
+            await server.db.users.insert_many(batch)
+            batch = []
+    if batch:
+        await server.db.users.insert_many(batch)
+
+
+SCENARIOS = {
+    "register_storm": register_storm,
+    "login_mfa": login_mfa,
+    "auth_me_polling": auth_me_polling,
+    "admin_listing": admin_listing,
+}
+
+
+async def run_suite(args):
+    import httpx
+
+    import hashing_worker
+    import server
+
+    logging.getLogger().setLevel(logging.WARNING)
+    provider = CapturingProvider()
+    server.notification_queue.providers = {"email": provider, "sms": provider}
+
+    hashing_worker.init_worker()
+    ctx = {"server": server, "provider": provider, "password_hash": hashing_worker.hash_password(BENCH_PASSWORD)}
+    results = []
+    async with server.lifespan(server.app):
+        if args.mongo_url:
+            await server.db.client.drop_database(args.db_name)
+            from indexes import ensure_indexes
+
+            await ensure_indexes(server.db)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # The first registered user becomes the admin
+            token = expect(await client.post("/api/auth/register", json={"email": "admin@bench.example.com", "password": BENCH_PASSWORD})).json()["access_token"]
+            token = expect(await client.post("/api/auth/login", json={"email": "admin@bench.example.com", "password": BENCH_PASSWORD})).json()["access_token"]
+            ctx["admin_headers"] = {"Authorization": f"Bearer {token}"}
+
+            for name in args.scenarios:
+                print(f"Running {name}...", file=sys.stderr)
+                results.extend(await SCENARIOS[name](client, ctx, args))
+    return results
+
+
+def print_results(results, previous=None):
+    baseline = {}
+    for entry in previous or []:
+        baseline[(entry["scenario"], entry.get("users"))] = entry
+
+    print(f"{'scenario':<22} {'users':>7} {'reqs':>7} {'err':>4} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'p99 vs prev':>12}")
+    for entry in results:
+        before = baseline.get((entry["scenario"], entry.get("users")))
+        delta = ""
+        if before and before["p99_ms"]:
+            delta = f"{(entry['p99_ms'] - before['p99_ms']) / before['p99_ms'] * 100:+.1f}%"
+        print(
+            f"{entry['scenario']:<22} {entry.get('users', ''):>7} {entry['requests']:>7} {entry['errors']:>4} "
+            f"{entry['rps']:>9} {entry['p50_ms']:>8} {entry['p95_ms']:>8} {entry['p99_ms']:>8} {delta:>12}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="user counts for admin_listing")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--registrations", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--mfa-users", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--mongo-url", help="real MongoDB to use instead of mongomock-motor")
+    parser.add_argument("--db-name", default="nhalege_benchmark")
+    parser.add_argument("--output", default=f"bench-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = asyncio.run(run_suite(args))
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+    print_results(results, previous)
+
+    with open(args.output, "w") as f:
+        json.dump({
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "mongo": "real" if args.mongo_url else "mongomock",
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
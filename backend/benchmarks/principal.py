@@ -0,0 +1,121 @@
+"""Micro-benchmark: Pydantic ``User`` from the full document vs ``Principal``.
+
+Times what ``get_current_user`` does with the bytes MongoDB sends back, and
+how much memory that takes:
+
+- legacy: decode the whole user document, then ``User(**document)``
+- principal: decode the ``PRINCIPAL_PROJECTION`` fields, then
+  ``Principal.from_document``
+
+Both rows report:
+
+- CPU: microseconds per principal, best of ``--repeat``
+- alloc: bytes allocated while building one principal (tracemalloc peak)
+- retained: bytes per principal still alive afterwards, roughly what one
+  ``PrincipalCache`` entry costs
+
+Run from the backend directory:
+
+    python -m benchmarks.principal --count 20000 --repeat 5
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+
+from principal import PRINCIPAL_PROJECTION, Principal
+from server import User
+
+
+def make_user_document(index):
+    now = datetime.utcnow().replace(microsecond=0)
+    return {
+        "_id": ObjectId(),
+        "id": str(uuid.uuid4()),
+        "email": f"investor{index}@example.com",
+        "hashed_password": "$2b$12$" + "x" * 53,
+        "is_active": True,
+        "is_admin": False,
+        "mfa_enabled": True,
+        "mfa_method": "email",
+        "phone_number": f"+1555{index:07d}",
+        "created_at": now,
+        "last_login": now,
+        "token_version": 0,
+    }
+
+
+def legacy_path(raw):
+    return User(**bson.decode(raw))
+
+
+def principal_path(raw):
+    return Principal.from_document(bson.decode(raw))
+
+
+def cpu_us(fn, payloads, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for raw in payloads:
+            fn(raw)
+        timings.append(time.perf_counter() - started)
+    return min(timings) / len(payloads) * 1e6
+
+
+def allocation_bytes(fn, payloads):
+    """(peak bytes while building one principal, bytes retained per principal)"""
+    tracemalloc.start()
+    try:
+        peaks = []
+        for raw in payloads[:1000]:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            principal = fn(raw)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+            del principal
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept = [fn(raw) for raw in payloads]
+        retained = (tracemalloc.get_traced_memory()[0] - baseline) / len(kept)
+    finally:
+        tracemalloc.stop()
+    return sorted(peaks)[len(peaks) // 2], retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = [make_user_document(i) for i in range(args.count)]
+    projected = [{field: document[field] for field, keep in PRINCIPAL_PROJECTION.items() if keep} for document in documents]
+    full = [bson.encode(document) for document in documents]
+    slim = [bson.encode(document) for document in projected]
+
+    sample_user, sample_principal = legacy_path(full[0]), principal_path(slim[0])
+    for field in Principal.__slots__:
+        assert getattr(sample_user, field) == getattr(sample_principal, field), field
+
+    print(f"{'path':>10} {'CPU us':>8} {'alloc B':>8} {'retained B':>11}")
+    rows = [("legacy", legacy_path, full), ("principal", principal_path, slim)]
+    results = {}
+    for name, fn, payloads in rows:
+        cpu = cpu_us(fn, payloads, args.repeat)
+        peak, retained = allocation_bytes(fn, payloads)
+        results[name] = (cpu, peak, retained)
+        print(f"{name:>10} {cpu:>8.2f} {peak:>8} {retained:>11.0f}")
+
+    legacy, principal = results["legacy"], results["principal"]
+    print(
+        f"principal: {legacy[0] / principal[0]:.1f}x less CPU, "
+        f"{legacy[1] / principal[1]:.1f}x less allocated, {legacy[2] / principal[2]:.1f}x less retained"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark: legacy triple-encode path vs MongoJSONResponse.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from serialization import MongoJSONResponse
+
+
+class LegacyMongoJSONEncoder(json.JSONEncoder):
+    """The encoder server.py used before MongoJSONResponse"""
+
+    def default(self, obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+def make_user_documents(count):
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "email": f"investor{i}@example.com",
+            "is_active": True,
+            "is_admin": i == 0,
+            "mfa_enabled": i % 3 == 0,
+            "mfa_method": "email" if i % 3 == 0 else None,
+            "phone_number": f"+1555{i:07d}",
+            "created_at": now - timedelta(days=i % 365),
+            "last_login": now - timedelta(minutes=i % 1440),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_path(documents):
+    # dumps -> loads -> jsonable_encoder -> JSONResponse render
+    serialized = json.loads(json.dumps(documents, cls=LegacyMongoJSONEncoder))
+    return JSONResponse(jsonable_encoder(serialized)).body
+
+
+def fast_path(documents):
+    return MongoJSONResponse(documents).body
+
+
+def best_of(fn, documents, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(documents)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'documents':>10} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        documents = make_user_documents(size)
+        assert json.loads(legacy_path(documents)) == json.loads(fast_path(documents))
+        legacy = best_of(legacy_path, documents, args.repeat)
+        fast = best_of(fast_path, documents, args.repeat)
+        print(f"{size:>10} {legacy * 1000:>10.2f} {fast * 1000:>10.2f} {legacy / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
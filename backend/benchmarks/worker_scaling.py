@@ -0,0 +1,131 @@
+"""Load test: API throughput as the gunicorn worker count grows.
+
+Starts ``gunicorn -c gunicorn.conf.py server:app`` once per worker count,
+waits for the readiness probe, then drives it with keep-alive HTTP/1.1
+connections from several client processes. Needs MONGO_URL/DB_NAME pointing
+at a reachable MongoDB, exactly like the server itself.
+
+Run from the backend directory:
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from healthcheck import probe
+
+DEFAULT_PORT = 8101
+
+
+async def _connection_loop(host, port, path, deadline, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n".encode()
+    completed = 0
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            completed += 1
+    finally:
+        writer.close()
+    return completed
+
+
+def _client_process(host, port, path, connections, duration, results):
+    async def run():
+        latencies = []
+        deadline = time.monotonic() + duration
+        counts = await asyncio.gather(
+            *(_connection_loop(host, port, path, deadline, latencies) for _ in range(connections))
+        )
+        results.put((sum(counts), latencies))
+
+    asyncio.run(run())
+
+
+def drive_load(port, path, clients, connections, duration):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_client_process, args=("127.0.0.1", port, path, connections // clients, duration, results)
+        )
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    total, latencies = 0, []
+    for _ in processes:
+        count, client_latencies = results.get()
+        total += count
+        latencies.extend(client_latencies)
+    for process in processes:
+        process.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    return total / duration, p99
+
+
+def start_server(workers, port):
+    # Access logging off so the server isn't measuring its own log writes
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{port}", ACCESS_LOG="")
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "server:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if probe(url, timeout=1) is not None:
+            return True
+        time.sleep(0.25)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--path", default="/api/")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=2, help="load generator processes")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>10} {'p99 ms':>8} {'scaling':>8}")
+    baseline = None
+    for workers in args.workers:
+        server = start_server(workers, args.port)
+        try:
+            if not wait_until_ready(f"http://127.0.0.1:{args.port}/api/health/ready", timeout=60):
+                print(f"{workers:>8} server never became ready", file=sys.stderr)
+                continue
+            throughput, p99 = drive_load(args.port, args.path, args.clients, args.connections, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        baseline = baseline or throughput
+        print(f"{workers:>8} {throughput:>10.0f} {p99 * 1000:>8.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
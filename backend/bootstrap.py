@@ -0,0 +1,52 @@
+"""Race-free choice of the first registered user as admin, through a one-time ``app_settings`` claim."""
+import logging
+from datetime import datetime
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_ID = "admin_bootstrap"
+
+
+class AdminBootstrap:
+    def __init__(self, db):
+        self.db = db
+        self._claimed = False
+
+    async def reconcile(self):
+        """Mark the claim taken when users predate this document (existing deployments)"""
+        if await self.db.app_settings.find_one({"_id": BOOTSTRAP_ID}, {"_id": 1}) is not None:
+            self._claimed = True
+            return
+        existing_admin = await self.db.users.find_one({"is_admin": True}, {"_id": 0, "id": 1})
+        if existing_admin is None and await self.db.users.find_one({}, {"_id": 1}) is None:
+            return
+        await self._claim(existing_admin["id"] if existing_admin else None)
+        logger.info("Admin bootstrap marked as claimed for existing users")
+
+    async def claim(self, user_id: str) -> bool:
+        """True if ``user_id`` is the first registration and should become admin"""
+        if self._claimed:
+            return False
+        return await self._claim(user_id)
+
+    async def release(self, user_id: str):
+        """Give the claim back when the winning registration failed to insert"""
+        result = await self.db.app_settings.delete_one({"_id": BOOTSTRAP_ID, "admin_user_id": user_id})
+        if result.deleted_count:
+            self._claimed = False
+
+    async def _claim(self, user_id: Optional[str]) -> bool:
+        try:
+            result = await self.db.app_settings.update_one(
+                {"_id": BOOTSTRAP_ID},
+                {"$setOnInsert": {"admin_user_id": user_id, "claimed_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Lost a simultaneous upsert for the same _id
+            result = None
+        self._claimed = True
+        return result is not None and result.upserted_id is not None
@@ -0,0 +1,51 @@
+"""Worker cold-start timing (imports, then lifespan startup), reported by the readiness probe."""
+import os
+import time
+from typing import Any, Dict, Optional
+
+COLD_START_TARGET_SECONDS = float(os.environ.get('COLD_START_TARGET_SECONDS', 3))
+
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process started, or None off Linux"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # The command name may contain spaces; fields after it are positional
+            fields = stat.read().rsplit(")", 1)[1].split()
+        started_ticks = int(fields[19])  # starttime, field 22 of proc(5)
+        return time.clock_gettime(time.CLOCK_BOOTTIME) - started_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class ColdStart:
+    def __init__(self, target_seconds: float = COLD_START_TARGET_SECONDS):
+        self.target_seconds = target_seconds
+        age = _process_age()
+        self.measured_from = "process" if age is not None else "import"
+        self._started = time.monotonic() - (age or 0.0)
+        self.import_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+
+    def _elapsed(self) -> float:
+        return round(time.monotonic() - self._started, 3)
+
+    def mark_imported(self):
+        self.import_seconds = self._elapsed()
+
+    def mark_ready(self):
+        # Only the first startup of the process is a cold start
+        if self.ready_seconds is None:
+            self.ready_seconds = self._elapsed()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "measured_from": self.measured_from,
+            "import_seconds": self.import_seconds,
+            "ready_seconds": self.ready_seconds,
+            "target_seconds": self.target_seconds,
+            "within_target": None if self.ready_seconds is None else self.ready_seconds <= self.target_seconds,
+        }
+
+
+cold_start = ColdStart()
@@ -0,0 +1,146 @@
+"""Lifespan-managed Motor client, with pool settings from the environment and pool statistics."""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+from metrics import MongoCommandMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def _int_env(name: str, default: Optional[int] = None) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def client_settings() -> Dict[str, Any]:
+    settings = {
+        "maxPoolSize": _int_env('MONGO_MAX_POOL_SIZE', 100),
+        "minPoolSize": _int_env('MONGO_MIN_POOL_SIZE', 10),
+        "maxIdleTimeMS": _int_env('MONGO_MAX_IDLE_TIME_MS'),
+        "connectTimeoutMS": _int_env('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        "serverSelectionTimeoutMS": _int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        "socketTimeoutMS": _int_env('MONGO_SOCKET_TIMEOUT_MS'),
+        "waitQueueTimeoutMS": _int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS'),
+        # e.g. "zstd,snappy,zlib"; zstd and snappy need their python packages
+        "compressors": os.environ.get('MONGO_COMPRESSORS') or None,
+    }
+    return {key: value for key, value in settings.items() if value is not None}
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts pool events; pymongo has no public API for live pool usage"""
+
+    def __init__(self):
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def connection_created(self, event):
+        self.open_connections += 1
+
+    def connection_closed(self, event):
+        self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+class MongoDatabase:
+    def __init__(self, url: str, name: str):
+        self.url = url
+        self.name = name
+        self.settings = client_settings()
+        self.pool_monitor = PoolMonitor()
+        self.client: Optional[AsyncIOMotorClient] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._db is not None
+
+    async def connect(self):
+        self.client = AsyncIOMotorClient(
+            self.url, event_listeners=[self.pool_monitor, MongoCommandMetrics()], **self.settings
+        )
+        self._db = self.client[self.name]
+        try:
+            await self._db.command("ping")
+            await self.warm_pool()
+        except Exception:
+            self.close()
+            raise
+        logger.info(f"Connected to MongoDB database {self.name} ({self.pool_monitor.open_connections} pooled connections)")
+
+    async def warm_pool(self):
+        # Concurrent pings force the driver to open that many sockets up front
+        size = _int_env('MONGO_WARMUP_CONNECTIONS', self.settings.get("minPoolSize", 0))
+        if size > 0:
+            await asyncio.gather(*(self._db.command("ping") for _ in range(size)))
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self._db = None
+
+    def _require(self) -> AsyncIOMotorDatabase:
+        if self._db is None:
+            raise RuntimeError("MongoDB is not connected; the app lifespan has not started")
+        return self._db
+
+    def __getitem__(self, name: str):
+        return self._require()[name]
+
+    def __getattr__(self, name: str):
+        # Collections by attribute, as on a Motor database
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._require()[name]
+
+    async def command(self, *args, **kwargs):
+        return await self._require().command(*args, **kwargs)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "max_pool_size": self.settings.get("maxPoolSize"),
+            "min_pool_size": self.settings.get("minPoolSize"),
+            "open_connections": self.pool_monitor.open_connections,
+            "checked_out": self.pool_monitor.checked_out,
+            "wait_queue": self.pool_monitor.waiting,
+            "checkout_failures": self.pool_monitor.checkout_failures,
+            "pool_clears": self.pool_monitor.pool_clears,
+        }
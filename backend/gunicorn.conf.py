@@ -0,0 +1,50 @@
+"""Production launcher settings: ``gunicorn -c gunicorn.conf.py server:app``
+
+Send the master SIGHUP for a graceful rolling restart.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8001')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Every worker imports the app after the fork; a Motor client can't be shared across one
+preload_app = False
+
+timeout = int(os.environ.get('WORKER_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+accesslog = os.environ.get('ACCESS_LOG', '-') or None
+
+# Share the cores between web workers' bcrypt pools instead of each worker
+# spawning one hashing process per core
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+# Prometheus: workers write samples to a shared directory that the master
+# (METRICS_PORT) or any worker's /metrics merges
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-multiproc')
+METRICS_PORT = os.environ.get('METRICS_PORT')
+
+
+def on_starting(server):
+    # Samples from a previous run would be merged into this one
+    multiproc_dir = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for name in os.listdir(multiproc_dir):
+        os.remove(os.path.join(multiproc_dir, name))
+
+
+def when_ready(server):
+    if METRICS_PORT:
+        from prometheus_client import start_http_server
+
+        from metrics import metrics_registry
+
+        start_http_server(int(METRICS_PORT), registry=metrics_registry())
+        server.log.info(f"Serving merged worker metrics on port {METRICS_PORT}")
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
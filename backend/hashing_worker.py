@@ -0,0 +1,35 @@
+"""Functions run inside the bcrypt worker processes, which import passlib but not the API."""
+import os
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# Cost factor for new hashes; existing hashes verify at whatever cost they were made with
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+
+# Each worker process builds its own context in init_worker
+_worker_context: Optional["CryptContext"] = None
+
+
+def init_worker():
+    from passlib.context import CryptContext
+
+    global _worker_context
+    _worker_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return _worker_context.hash(password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    return [_worker_context.hash(password) for password in passwords]
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _worker_context.verify(plain_password, hashed_password)
+
+
+def noop():
+    return None
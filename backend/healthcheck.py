@@ -0,0 +1,61 @@
+"""Readiness probe: exits 0 once ``/api/health/ready`` answers 200.
+
+``--wait`` keeps polling until a deadline; ``--max-cold-start`` fails a worker that started too slowly.
+"""
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+DEFAULT_URL = "http://127.0.0.1:8001/api/health/ready"
+
+
+def probe(url: str, timeout: float) -> Optional[Dict[str, Any]]:
+    """The readiness body when the backend answers 200, otherwise None"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            if response.status != 200:
+                return None
+            return json.loads(response.read() or b"{}")
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def check_cold_start(report: Dict[str, Any], max_seconds: Optional[float]) -> int:
+    ready_seconds = report.get("ready_seconds")
+    if ready_seconds is None:
+        return 0
+    limit = max_seconds if max_seconds is not None else report.get("target_seconds")
+    print(f"Worker cold start {ready_seconds:.2f}s (imports {report.get('import_seconds')}s, target {limit}s)")
+    if limit is None or ready_seconds <= limit:
+        return 0
+    print(f"Cold start {ready_seconds:.2f}s is over the {limit}s target", file=sys.stderr)
+    return 1 if max_seconds is not None else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wait for the API to report ready")
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--wait", type=float, default=0, help="seconds to keep polling before giving up")
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--max-cold-start", type=float, help="exit 1 when the worker took longer than this to start")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    deadline = started + args.wait
+    while True:
+        body = probe(args.url, timeout=args.interval * 4)
+        if body is not None:
+            print(f"Backend ready after {time.monotonic() - started:.1f}s")
+            return check_cold_start(body.get("cold_start") or {}, args.max_cold_start)
+        if time.monotonic() >= deadline:
+            print(f"Backend not ready at {args.url}", file=sys.stderr)
+            return 1
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""MongoDB index declarations, created at startup, and an ``explain()`` check of the hot queries."""
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from mfa_store import MFA_AUDIT_RETENTION_DAYS
+from status_telemetry import STATUS_RAW_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Recently changed users for the stateless-auth token version map
+        IndexModel([("claims_changed_at", ASCENDING)], name="claims_changed_at", sparse=True),
+    ],
+    "mfa_verifications": [
+        # Equality fields first, then the sort key, then the expires_at range
+        IndexModel(
+            [("email", ASCENDING), ("purpose", ASCENDING), ("verified", ASCENDING), ("created_at", DESCENDING), ("expires_at", ASCENDING)],
+            name="email_purpose_verified_created_at",
+        ),
+        # Lets the server reap codes once they expire
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "mfa_audit": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Time-ordered paging for the admin MFA log viewer
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    ],
+    "sessions": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING), ("last_used_at", DESCENDING)], name="user_id_last_used_at"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "signing_keys": [
+        IndexModel([("kid", ASCENDING)], name="kid_unique", unique=True),
+        # One key per rotation slot, however many workers try to create it
+        IndexModel([("slot", ASCENDING), ("alg", ASCENDING)], name="slot_alg_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "status_minutes": [
+        IndexModel([("client_name", ASCENDING), ("minute", ASCENDING)], name="client_name_minute_unique", unique=True),
+        # Summary windows across all clients
+        IndexModel([("minute", ASCENDING)], name="minute"),
+    ],
+    "applications": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("idempotency_key", ASCENDING)], name="idempotency_key_unique", unique=True),
+        # Airtable sync claims: due records in any unsynced state, oldest first
+        IndexModel([("sync_status", ASCENDING), ("next_sync_at", ASCENDING)], name="sync_status_next_sync_at"),
+        # Admin lead listing: each sort, alone and behind the status filter
+        IndexModel([("lead_score", DESCENDING), ("id", DESCENDING)], name="lead_score_id"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("investment_value", DESCENDING), ("id", DESCENDING)], name="investment_value_id"),
+        IndexModel([("status", ASCENDING), ("lead_score", DESCENDING), ("id", DESCENDING)], name="status_lead_score_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at_id"),
+        IndexModel([("status", ASCENDING), ("investment_value", DESCENDING), ("id", DESCENDING)], name="status_investment_value_id"),
+        # Prefix search over names and email
+        IndexModel([("search_terms", ASCENDING)], name="search_terms"),
+    ],
+    "notification_deliveries": [
+        IndexModel([("verification_id", ASCENDING)], name="verification_id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("updated_at", DESCENDING)], name="status_updated_at"),
+    ],
+}
+
+# Superseded indexes, dropped at startup so writes stop maintaining them
+OBSOLETE_INDEXES: Dict[str, List[str]] = {
+    "mfa_verifications": ["email_verified_created_at"],
+}
+
+if MFA_AUDIT_RETENTION_DAYS:
+    INDEXES["mfa_audit"].append(IndexModel(
+        [("created_at", ASCENDING)], name="created_at_ttl",
+        expireAfterSeconds=MFA_AUDIT_RETENTION_DAYS * 24 * 3600,
+    ))
+
+if STATUS_RAW_RETENTION_DAYS:
+    # Raw heartbeats only back the per-minute buckets; opt in to aging them out
+    INDEXES["status_checks"] = [
+        IndexModel(
+            [("timestamp", ASCENDING)], name="timestamp_ttl",
+            expireAfterSeconds=STATUS_RAW_RETENTION_DAYS * 24 * 3600,
+        ),
+    ]
+
+
+def hot_queries() -> List[Dict[str, Any]]:
+    """The query shapes server.py issues on every login, MFA check or authenticated request"""
+    now = datetime.utcnow()
+    return [
+        {"collection": "users", "filter": {"email": "probe@example.com"}},
+        {"collection": "users", "filter": {"id": "probe"}},
+        {
+            "collection": "mfa_verifications",
+            "filter": {"email": "probe@example.com", "purpose": "login", "verified": False, "expires_at": {"$gt": now}},
+            "sort": [("created_at", DESCENDING)],
+        },
+    ]
+
+
+async def ensure_indexes(db):
+    for collection_name, models in INDEXES.items():
+        try:
+            created = await db[collection_name].create_indexes(models)
+            logger.info(f"Indexes ensured on {collection_name}: {', '.join(created)}")
+        except OperationFailure as e:
+            # Most likely duplicate data under a unique index or an index
+            # that exists with different options; keep serving and say so
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+    for collection_name, names in OBSOLETE_INDEXES.items():
+        try:
+            existing = await db[collection_name].index_information()
+            for name in set(names) & set(existing):
+                await db[collection_name].drop_index(name)
+                logger.info(f"Dropped obsolete index {name} on {collection_name}")
+        except OperationFailure as e:
+            logger.error(f"Could not drop obsolete indexes on {collection_name}: {e}")
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage")] if plan.get("stage") else []
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def report_collection_scans(db) -> List[Dict[str, Any]]:
+    """Explain each hot query and return (and log) the ones that scan the whole collection"""
+    offenders = []
+    for query in hot_queries():
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        try:
+            explanation = await cursor.limit(1).explain()
+        except OperationFailure as e:
+            logger.warning(f"Could not explain query on {query['collection']}: {e}")
+            continue
+
+        winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning_plan)
+        if "COLLSCAN" in stages:
+            offenders.append({"collection": query["collection"], "filter": list(query["filter"]), "stages": stages})
+            logger.warning(f"COLLSCAN on {query['collection']} for filter fields {list(query['filter'])}")
+    return offenders
@@ -0,0 +1,149 @@
+"""Lead scoring, prefix search and keyset-paged listing over investor applications."""
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same scoring as airtableService.js, so Airtable rows keep their meaning
+CAPACITY_SCORES = [
+    ("1000000+", 100),
+    ("500000-1000000", 90),
+    ("250000-500000", 80),
+    ("100000-250000", 70),
+    ("50000-100000", 60),
+    ("25000-50000", 50),
+]
+# Midpoints the view sorts "Investment Amount" by
+CAPACITY_VALUES = {
+    "1000000+": 1000000,
+    "500000-1000000": 750000,
+    "250000-500000": 375000,
+    "100000-250000": 175000,
+    "50000-100000": 75000,
+    "25000-50000": 37500,
+}
+EXPERIENCE_SCORES = {"expert": 20, "experienced": 15, "intermediate": 10}
+SOURCE_SCORES = {"inner-circle-application": 25, "referral": 20}
+ACCREDITED_SCORE = 30
+MAX_LEAD_SCORE = 200
+SCORING_FIELDS = ("investment_capacity", "accredited_status", "investment_experience", "source")
+
+LEAD_STATUSES = ["New Application", "Reviewing", "Contacted", "Approved", "Declined"]
+NEW_LEAD_STATUS = "New Application"
+# ?sort= value -> stored field, all descending
+LEAD_SORTS = {"score": "lead_score", "recent": "created_at", "investment": "investment_value"}
+LEADS_PAGE_SIZE = 24
+LEADS_MAX_PAGE_SIZE = 200
+MAX_SEARCH_WORDS = 4
+# Columns the lead cards render; notes and sync state stay out of the listing
+LEAD_LIST_FIELDS = [
+    "id", "first_name", "last_name", "email", "phone", "investment_capacity", "accredited_status",
+    "investment_experience", "source", "additional_info", "lead_score", "priority", "interest_level",
+    "investment_value", "status", "follow_up_required", "created_at",
+]
+
+_WORD = re.compile(r"[^\W_]+(?:[.'-][^\W_]+)*")
+
+
+def lead_score(application: Dict[str, Any]) -> int:
+    capacity = application.get("investment_capacity") or ""
+    score = next((points for marker, points in CAPACITY_SCORES if marker in capacity), 0)
+    if application.get("accredited_status") == "yes":
+        score += ACCREDITED_SCORE
+    score += EXPERIENCE_SCORES.get(application.get("investment_experience"), 0)
+    score += SOURCE_SCORES.get(application.get("source"), 0)
+    return min(score, MAX_LEAD_SCORE)
+
+
+def interest_level(capacity: str) -> str:
+    if "1000000+" in capacity:
+        return "Ultra High"
+    if "500000" in capacity or "250000" in capacity:
+        return "High"
+    if "100000" in capacity:
+        return "Medium-High"
+    if "50000" in capacity:
+        return "Medium"
+    return "Standard"
+
+
+def priority(score: int) -> str:
+    if score >= 150:
+        return "Immediate"
+    if score >= 120:
+        return "High"
+    if score >= 90:
+        return "Medium"
+    return "Standard"
+
+
+def search_terms(first_name: str, last_name: str, email: str) -> List[str]:
+    email = email.lower()
+    local_part, _, domain = email.rpartition("@")
+    terms = set(_WORD.findall(f"{first_name} {last_name} {local_part}".lower()))
+    terms.update((email, domain))
+    return sorted(terms)
+
+
+def lead_fields(application: Dict[str, Any]) -> Dict[str, Any]:
+    """The derived fields stored on an application so the lead view can query them"""
+    score = lead_score(application)
+    return {
+        "lead_score": score,
+        "priority": priority(score),
+        "interest_level": interest_level(application["investment_capacity"]),
+        "investment_value": CAPACITY_VALUES.get(application["investment_capacity"], 0),
+        "search_terms": search_terms(application["first_name"], application["last_name"], application["email"]),
+    }
+
+
+def lead_query(status: Optional[str] = None, follow_up: Optional[bool] = None, q: Optional[str] = None) -> Dict[str, Any]:
+    clauses: List[Dict[str, Any]] = []
+    if status is not None:
+        clauses.append({"status": status})
+    if follow_up is not None:
+        clauses.append({"follow_up_required": follow_up})
+    if q:
+        words = _WORD.findall(q.lower())[:MAX_SEARCH_WORDS]
+        clauses.extend({"search_terms": {"$regex": f"^{re.escape(word)}"}} for word in words)
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def encode_lead_cursor(lead: Dict[str, Any], sort: str) -> str:
+    value = lead[LEAD_SORTS[sort]]
+    return f"{value.isoformat() if isinstance(value, datetime) else value}|{lead['id']}"
+
+
+def decode_lead_cursor(cursor: str, sort: str) -> Dict[str, Any]:
+    """Raises ValueError for a cursor that doesn't fit ``sort``"""
+    raw_value, lead_id = cursor.rsplit("|", 1)
+    field = LEAD_SORTS[sort]
+    value: Any = datetime.fromisoformat(raw_value) if field == "created_at" else int(raw_value)
+    # Descending order, with the id breaking ties
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "id": {"$lt": lead_id}},
+    ]}
+
+
+async def update_lead(db, lead_id: str, changes: Dict[str, Any], updated_by: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Apply admin edits to one lead, rescoring it only when a scoring input changed.
+
+    Returns the updated lead and the status it had before.
+    """
+    update: Dict[str, Any] = dict(changes)
+    if any(field in changes for field in SCORING_FIELDS):
+        lead = await db.applications.find_one({"id": lead_id}, {"_id": 0})
+        if lead is None:
+            return None, None
+        update.update(lead_fields({**lead, **changes}))
+    update.update({"updated_at": datetime.utcnow(), "updated_by": updated_by})
+    before = await db.applications.find_one_and_update(
+        {"id": lead_id},
+        {"$set": update},
+        projection={"_id": 0, **{field: 1 for field in LEAD_LIST_FIELDS}},
+    )
+    if before is None:
+        return None, None
+    return {**before, **{field: value for field, value in update.items() if field in LEAD_LIST_FIELDS}}, before.get("status")
@@ -0,0 +1,250 @@
+"""Pending MFA codes with atomic verification (Redis, MongoDB or in memory), and the ``mfa_audit`` trail."""
+import abc
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+MFA_MAX_ATTEMPTS = int(os.environ.get('MFA_MAX_ATTEMPTS', 3))
+MFA_AUDIT_RETENTION_DAYS = int(os.environ.get('MFA_AUDIT_RETENTION_DAYS') or 0) or None
+
+# Outcomes of MFAStore.verify
+MFA_MISSING = "missing"
+MFA_TOO_MANY_ATTEMPTS = "too_many_attempts"
+MFA_INVALID = "invalid"
+MFA_VERIFIED = "verified"
+
+
+class MongoAuditSink:
+    """Fire-and-forget audit trail of MFA codes in ``mfa_audit``"""
+
+    def __init__(self, db):
+        self.db = db
+        self._tasks: Set[asyncio.Task] = set()
+
+    def issued(self, verification: Dict[str, Any]):
+        record = {key: value for key, value in verification.items() if key not in ("code", "_id")}
+        self._spawn(self.db.mfa_audit.insert_one(record))
+
+    def attempted(self, verification_id: str, outcome: str):
+        update: Dict[str, Any] = {"$inc": {"attempts": 1}}
+        if outcome == MFA_VERIFIED:
+            update["$set"] = {"verified": True}
+        self._spawn(self.db.mfa_audit.update_one({"id": verification_id}, update))
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"MFA audit write failed: {task.exception()}")
+
+    async def drain(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class MFAStore(abc.ABC):
+    """Interface for MFA code storage; one pending code per (purpose, email)"""
+
+    def __init__(self, max_attempts: int = MFA_MAX_ATTEMPTS, audit: Optional[MongoAuditSink] = None):
+        self.max_attempts = max_attempts
+        self.audit = audit
+
+    async def save(self, verification: Dict[str, Any]):
+        """Store a freshly issued code, replacing any pending one for the same purpose and email"""
+        await self._save({**verification, "email": normalize_email(verification["email"])})
+
+    async def verify(self, email: str, purpose: str, code: str) -> Tuple[str, Optional[str]]:
+        """Count one attempt and check ``code``; returns (outcome, verification id)"""
+        return await self._verify(normalize_email(email), purpose, code)
+
+    @abc.abstractmethod
+    async def _save(self, verification: Dict[str, Any]):
+        """``save`` with the email already normalized"""
+
+    @abc.abstractmethod
+    async def _verify(self, email: str, purpose: str, code: str) -> Tuple[str, Optional[str]]:
+        """``verify`` with the email already normalized"""
+
+    async def close(self):
+        if self.audit is not None:
+            await self.audit.drain()
+
+    def _audit_issued(self, verification: Dict[str, Any]):
+        if self.audit is not None:
+            self.audit.issued(verification)
+
+    def _audit_attempted(self, verification_id: Optional[str], outcome: str):
+        if self.audit is not None and verification_id is not None:
+            self.audit.attempted(verification_id, outcome)
+
+
+def _ttl_seconds(verification: Dict[str, Any]) -> float:
+    return (verification["expires_at"] - datetime.utcnow()).total_seconds()
+
+
+class InMemoryMFAStore(MFAStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # (purpose, email) -> (expires_at monotonic, id, code, attempts)
+        self._codes: Dict[Tuple[str, str], list] = {}
+
+    async def _save(self, verification: Dict[str, Any]):
+        key = (verification["purpose"], verification["email"])
+        expires_at = time.monotonic() + _ttl_seconds(verification)
+        self._codes[key] = [expires_at, verification["id"], verification["code"], 0]
+        self._audit_issued(verification)
+
+    async def _verify(self, email: str, purpose: str, code: str) -> Tuple[str, Optional[str]]:
+        key = (purpose, email)
+        entry = self._codes.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._codes.pop(key, None)
+            return MFA_MISSING, None
+
+        entry[3] += 1
+        verification_id = entry[1]
+        if entry[3] > self.max_attempts:
+            outcome = MFA_TOO_MANY_ATTEMPTS
+        elif entry[2] != code:
+            outcome = MFA_INVALID
+        else:
+            outcome = MFA_VERIFIED
+            del self._codes[key]
+        self._audit_attempted(verification_id, outcome)
+        return outcome, verification_id
+
+
+# KEYS[1] = code hash, ARGV[1] = submitted code, ARGV[2] = max attempts
+REDIS_VERIFY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {'missing', false}
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+local id = redis.call('HGET', KEYS[1], 'id')
+if attempts > tonumber(ARGV[2]) then
+    return {'too_many_attempts', id}
+end
+if redis.call('HGET', KEYS[1], 'code') ~= ARGV[1] then
+    return {'invalid', id}
+end
+redis.call('DEL', KEYS[1])
+return {'verified', id}
+"""
+
+
+class RedisMFAStore(MFAStore):
+    def __init__(self, redis_client, key_prefix: str = "mfa", **kwargs):
+        super().__init__(**kwargs)
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._verify_script = redis_client.register_script(REDIS_VERIFY_SCRIPT)
+
+    def _key(self, purpose: str, email: str) -> str:
+        return f"{self.key_prefix}:{purpose}:{email}"
+
+    async def _save(self, verification: Dict[str, Any]):
+        key = self._key(verification["purpose"], verification["email"])
+        ttl_ms = max(1, int(_ttl_seconds(verification) * 1000))
+        # MULTI/EXEC pipeline: replace, populate and expire in one round trip
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={"id": verification["id"], "code": verification["code"], "attempts": 0})
+            pipe.pexpire(key, ttl_ms)
+            await pipe.execute()
+        self._audit_issued(verification)
+
+    async def _verify(self, email: str, purpose: str, code: str) -> Tuple[str, Optional[str]]:
+        outcome, verification_id = await self._verify_script(
+            keys=[self._key(purpose, email)], args=[code, self.max_attempts]
+        )
+        if isinstance(outcome, bytes):
+            outcome = outcome.decode()
+        if isinstance(verification_id, bytes):
+            verification_id = verification_id.decode()
+        verification_id = verification_id or None
+        self._audit_attempted(verification_id, outcome)
+        return outcome, verification_id
+
+    async def close(self):
+        await super().close()
+        await self.redis.aclose()
+
+
+class MongoMFAStore(MFAStore):
+    def __init__(self, db, **kwargs):
+        super().__init__(**kwargs)
+        self.db = db
+
+    async def _save(self, verification: Dict[str, Any]):
+        # insert_one adds _id to the dict it is given; keep the audit copy clean
+        await self.db.mfa_verifications.insert_one(dict(verification))
+        self._audit_issued(verification)
+
+    async def _verify(self, email: str, purpose: str, code: str) -> Tuple[str, Optional[str]]:
+        # Count the attempt, compare the code and mark it verified in one atomic
+        # update; a concurrent correct submission then no longer matches verified: False
+        verification_doc = await self.db.mfa_verifications.find_one_and_update(
+            {
+                "email": email,
+                "purpose": purpose,
+                "verified": False,
+                "expires_at": {"$gt": datetime.utcnow()},
+            },
+            [
+                {"$set": {"attempts": {"$add": ["$attempts", 1]}}},
+                {"$set": {"verified": {"$and": [
+                    {"$eq": ["$code", code]},
+                    {"$lte": ["$attempts", self.max_attempts]},
+                ]}}},
+            ],
+            sort=[("created_at", -1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if verification_doc is None:
+            return MFA_MISSING, None
+
+        verification_id = verification_doc["id"]
+        if verification_doc["verified"]:
+            outcome = MFA_VERIFIED
+        elif verification_doc["attempts"] > self.max_attempts:
+            outcome = MFA_TOO_MANY_ATTEMPTS
+        else:
+            outcome = MFA_INVALID
+        self._audit_attempted(verification_id, outcome)
+        return outcome, verification_id
+
+
+def create_mfa_store(db) -> MFAStore:
+    """Build the store selected by MFA_STORE (redis, mongo or memory)"""
+    redis_url = os.environ.get('REDIS_URL')
+    backend = os.environ.get('MFA_STORE', 'redis' if redis_url else 'mongo')
+    audit = None
+    if os.environ.get('MFA_AUDIT_TO_MONGO', 'true').lower() == 'true':
+        audit = MongoAuditSink(db)
+
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        logger.info("Using Redis MFA store")
+        return RedisMFAStore(redis.from_url(redis_url or "redis://localhost:6379/0"), audit=audit)
+    if backend == "memory":
+        logger.info("Using in-memory MFA store")
+        return InMemoryMFAStore(audit=audit)
+    if backend == "mongo":
+        return MongoMFAStore(db, audit=audit)
+    raise ValueError(f"Unknown MFA_STORE backend: {backend}")
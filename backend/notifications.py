@@ -0,0 +1,288 @@
+"""Background delivery queue for outbound MFA email and SMS, with retries and dead-lettering."""
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+from pymongo import UpdateOne
+from tenacity import AsyncRetrying, RetryError, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from metrics import MFA_DELIVERIES, MFA_DELIVERY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_WORKERS = int(os.environ.get('NOTIFICATION_WORKERS', 2))
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 50))
+NOTIFICATION_MAX_QUEUE = int(os.environ.get('NOTIFICATION_MAX_QUEUE', 1000))
+NOTIFICATION_MAX_ATTEMPTS = int(os.environ.get('NOTIFICATION_MAX_ATTEMPTS', 5))
+NOTIFICATION_BACKOFF_SECONDS = float(os.environ.get('NOTIFICATION_BACKOFF_SECONDS', 0.5))
+NOTIFICATION_SHUTDOWN_GRACE_SECONDS = 10
+
+# Delivery states
+QUEUED = "queued"
+SENT = "sent"
+RETRYING = "retrying"
+DEAD = "dead"
+
+
+class Notification:
+    __slots__ = ("verification_id", "channel", "recipient", "code", "attempts", "last_error")
+
+    def __init__(self, verification_id: str, channel: str, recipient: str, code: str):
+        self.verification_id = verification_id
+        self.channel = channel
+        self.recipient = recipient
+        self.code = code
+        self.attempts = 0
+        self.last_error: Optional[str] = None
+
+
+class DeliveryError(Exception):
+    pass
+
+
+class LoggingProvider:
+    """Mock provider - replace with SendGrid (email) and Twilio (sms) integrations"""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+
+    async def send_batch(self, notifications: List[Notification]) -> List[Optional[Exception]]:
+        for notification in notifications:
+            logger.info(f"[MOCK] Sending {self.channel} MFA code {notification.code} to {notification.recipient}")
+        return [None] * len(notifications)
+
+
+class FakeProvider:
+    """Local stand-in that records deliveries and fails the first ``failures_per_recipient`` sends"""
+
+    def __init__(self, channel: str, failures_per_recipient: int = 1, latency_seconds: float = 0.05):
+        self.channel = channel
+        self.failures_per_recipient = failures_per_recipient
+        self.latency_seconds = latency_seconds
+        self.delivered: List[Dict[str, str]] = []
+        self.batches = 0
+        self._failures: Dict[str, int] = {}
+
+    async def send_batch(self, notifications: List[Notification]) -> List[Optional[Exception]]:
+        self.batches += 1
+        await asyncio.sleep(self.latency_seconds)
+        results: List[Optional[Exception]] = []
+        for notification in notifications:
+            failed = self._failures.get(notification.recipient, 0)
+            if failed < self.failures_per_recipient:
+                self._failures[notification.recipient] = failed + 1
+                results.append(DeliveryError(f"simulated {self.channel} outage"))
+            else:
+                self.delivered.append({"recipient": notification.recipient, "code": notification.code})
+                results.append(None)
+        return results
+
+
+class NotificationQueue:
+    def __init__(
+        self,
+        providers: Dict[str, Any],
+        db=None,
+        workers: int = NOTIFICATION_WORKERS,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        max_queue: int = NOTIFICATION_MAX_QUEUE,
+        max_attempts: int = NOTIFICATION_MAX_ATTEMPTS,
+        backoff_seconds: float = NOTIFICATION_BACKOFF_SECONDS,
+    ):
+        self.providers = providers
+        # Delivery records go to db.notification_deliveries; None keeps them in memory only
+        self.db = db
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_queue = max_queue
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._status_writes: Set[asyncio.Task] = set()
+        # Latest known status per verification id, bounded so it can't grow forever
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Notification queue started with {self.workers} workers")
+
+    async def stop(self):
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=NOTIFICATION_SHUTDOWN_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dropping {self._queue.qsize()} undelivered notifications on shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.drain_status_writes()
+
+    async def drain_status_writes(self):
+        if self._status_writes:
+            await asyncio.gather(*self._status_writes, return_exceptions=True)
+
+    def enqueue(self, notification: Notification):
+        if notification.channel not in self.providers:
+            raise ValueError(f"No provider for channel {notification.channel}")
+        if self._queue is None:
+            raise RuntimeError("Notification queue is not running")
+        try:
+            self._queue.put_nowait(notification)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Notification service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        entry = self._remember(notification, QUEUED)
+        if self.db is not None:
+            task = asyncio.create_task(self._record_queued(entry))
+            self._status_writes.add(task)
+            task.add_done_callback(self._status_writes.discard)
+
+    async def get_status(self, verification_id: str) -> Optional[Dict[str, Any]]:
+        if verification_id in self._recent:
+            return self._recent[verification_id]
+        if self.db is not None:
+            return await self.db.notification_deliveries.find_one({"verification_id": verification_id}, {"_id": 0})
+        return None
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        if self.db is None:
+            return [entry for entry in self._recent.values() if entry["status"] == DEAD][:limit]
+        cursor = self.db.notification_deliveries.find({"status": DEAD}, {"_id": 0}).sort("updated_at", -1)
+        return await cursor.to_list(limit)
+
+    def _remember(self, notification: Notification, delivery_status: str) -> Dict[str, Any]:
+        entry = {
+            "verification_id": notification.verification_id,
+            "channel": notification.channel,
+            "recipient": notification.recipient,
+            "status": delivery_status,
+            "attempts": notification.attempts,
+            "last_error": notification.last_error,
+            "updated_at": datetime.utcnow(),
+        }
+        self._recent[notification.verification_id] = entry
+        self._recent.move_to_end(notification.verification_id)
+        while len(self._recent) > self.max_queue:
+            self._recent.popitem(last=False)
+        return entry
+
+    async def _next_batch(self) -> List[Notification]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _worker(self, worker_id: int):
+        while True:
+            batch = await self._next_batch()
+            try:
+                by_channel: Dict[str, List[Notification]] = {}
+                for notification in batch:
+                    by_channel.setdefault(notification.channel, []).append(notification)
+                for channel, notifications in by_channel.items():
+                    await self._deliver(channel, notifications)
+            except Exception as e:
+                logger.error(f"Notification worker {worker_id} failed a batch: {e}")
+                # Nothing in the batch may be left looking in flight
+                unfinished = [n for n in batch if self._recent.get(n.verification_id, {}).get("status") not in (SENT, DEAD)]
+                for notification in unfinished:
+                    notification.last_error = notification.last_error or f"{e.__class__.__name__}: {e}"
+                    MFA_DELIVERIES.labels(notification.channel, DEAD).inc()
+                await self._record([self._remember(notification, DEAD) for notification in unfinished])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, channel: str, notifications: List[Notification]):
+        provider = self.providers[channel]
+        pending = notifications
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential(multiplier=self.backoff_seconds, max=30),
+            retry=retry_if_exception_type(DeliveryError),
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    try:
+                        with MFA_DELIVERY_SECONDS.labels(channel).time():
+                            results = await provider.send_batch(pending)
+                        if len(results) != len(pending):
+                            raise DeliveryError(f"provider returned {len(results)} results for {len(pending)} sends")
+                    except Exception as e:
+                        # A provider bug or outage fails the whole batch, retryably
+                        results = [e] * len(pending)
+                    failed = []
+                    entries = []
+                    for notification, error in zip(pending, results):
+                        notification.attempts += 1
+                        if error is None:
+                            notification.last_error = None
+                            entries.append(self._remember(notification, SENT))
+                            MFA_DELIVERIES.labels(channel, SENT).inc()
+                        else:
+                            notification.last_error = f"{error.__class__.__name__}: {error}"
+                            entries.append(self._remember(notification, RETRYING))
+                            failed.append(notification)
+                    await self._record(entries)
+                    pending = failed
+                    if pending:
+                        raise DeliveryError(f"{len(pending)} {channel} notifications failed")
+        except RetryError:
+            for notification in pending:
+                logger.error(
+                    f"Dead-lettering {channel} notification {notification.verification_id} "
+                    f"after {notification.attempts} attempts: {notification.last_error}"
+                )
+                MFA_DELIVERIES.labels(channel, DEAD).inc()
+            await self._record([self._remember(notification, DEAD) for notification in pending])
+
+    async def _record(self, entries: List[Dict[str, Any]]):
+        if self.db is None or not entries:
+            return
+        try:
+            await self.db.notification_deliveries.bulk_write(
+                [UpdateOne({"verification_id": e["verification_id"]}, {"$set": e}, upsert=True) for e in entries],
+                ordered=False,
+            )
+        except Exception as e:
+            # The in-memory status still answers on this worker
+            logger.error(f"Writing {len(entries)} notification delivery states failed: {e}")
+
+    async def _record_queued(self, entry: Dict[str, Any]):
+        try:
+            await self.db.notification_deliveries.update_one(
+                {"verification_id": entry["verification_id"]}, {"$setOnInsert": entry}, upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Writing queued state of notification {entry['verification_id']} failed: {e}")
+
+
+def create_notification_queue(db) -> NotificationQueue:
+    provider = os.environ.get('NOTIFICATION_PROVIDER', 'mock')
+    if provider == "fake":
+        providers = {"email": FakeProvider("email"), "sms": FakeProvider("sms")}
+    elif provider == "mock":
+        providers = {"email": LoggingProvider("email"), "sms": LoggingProvider("sms")}
+    else:
+        raise ValueError(f"Unknown NOTIFICATION_PROVIDER: {provider}")
+    return NotificationQueue(providers, db=db)
@@ -0,0 +1,148 @@
+"""Bounded process pool for bcrypt password hashing."""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from hashing_worker import hash_password, hash_passwords, init_worker, noop, verify_password
+from metrics import PASSWORD_HASH_REJECTED, PASSWORD_HASH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 64))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+# Passwords per worker task in hash_many; smaller chunks let logins interleave sooner
+PASSWORD_HASH_BULK_CHUNK = int(os.environ.get('PASSWORD_HASH_BULK_CHUNK', 8))
+
+class HashingStats:
+    """Latency counters for one kind of hashing call"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def observe(self, seconds: float):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 2),
+            "last_ms": round(self.last_seconds * 1000, 2),
+        }
+
+
+class PasswordHasher:
+    """Runs bcrypt in worker processes with admission control.
+
+    At most ``workers + max_queue`` calls may be in flight. Further calls are
+    rejected with 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self.rejected = 0
+        self.stats = {"hash": HashingStats(), "verify": HashingStats(), "bulk_hash": HashingStats()}
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+        return self._executor
+
+    async def start(self):
+        executor = self._ensure_executor()
+        # Spawn every worker now so the first logins don't pay process startup
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, noop) for _ in range(self.workers)))
+        logger.info(f"Password hashing pool started with {self.workers} workers")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit("verify", verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str], chunk_size: int = PASSWORD_HASH_BULK_CHUNK) -> List[str]:
+        """Hash a batch on every worker at once, in chunks to cut per-call IPC.
+
+        Bulk work waits for a worker instead of being rejected, and never has
+        more than one chunk per worker queued, so interactive logins still
+        get through between chunks.
+        """
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        slots = asyncio.Semaphore(self.workers)
+
+        async def run(chunk: List[str]) -> List[str]:
+            async with slots:
+                return await self._submit("bulk_hash", hash_passwords, chunk, admit=False)
+
+        hashed_chunks = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        return [hashed for chunk in hashed_chunks for hashed in chunk]
+
+    async def _submit(self, operation: str, fn: Callable, *args, admit: bool = True):
+        if admit and self.in_flight >= self.capacity:
+            self.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            logger.warning(f"Password hashing pool saturated, rejecting {operation}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+            )
+        executor = self._ensure_executor()
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            elapsed = time.perf_counter() - started
+            self.stats[operation].observe(elapsed)
+            PASSWORD_HASH_SECONDS.labels(operation).observe(elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "hash": self.stats["hash"].as_dict(),
+            "verify": self.stats["verify"].as_dict(),
+            "bulk_hash": self.stats["bulk_hash"].as_dict(),
+        }
+
+
+password_hasher = PasswordHasher()
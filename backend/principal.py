@@ -0,0 +1,73 @@
+"""The authenticated caller as request handlers see it, read from the user document without validation."""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Everything a handler reads off the caller, plus is_active for the checks
+PRINCIPAL_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "email": 1,
+    "is_active": 1,
+    "is_admin": 1,
+    "mfa_enabled": 1,
+    "mfa_method": 1,
+    "phone_number": 1,
+    "last_login": 1,
+    "token_version": 1,
+}
+
+
+class Principal:
+    __slots__ = ("id", "email", "is_admin", "mfa_enabled", "mfa_method", "phone_number", "last_login", "token_version")
+
+    def __init__(
+        self,
+        id: str,
+        email: str,
+        is_admin: bool = False,
+        mfa_enabled: bool = False,
+        mfa_method: Optional[str] = None,
+        phone_number: Optional[str] = None,
+        last_login: Optional[datetime] = None,
+        token_version: int = 0,
+    ):
+        self.id = id
+        self.email = email
+        self.is_admin = is_admin
+        self.mfa_enabled = mfa_enabled
+        self.mfa_method = mfa_method
+        self.phone_number = phone_number
+        self.last_login = last_login
+        self.token_version = token_version
+
+    @classmethod
+    def from_document(cls, user: Dict[str, Any]) -> "Principal":
+        """From a stored user document; extra fields are ignored"""
+        return cls(
+            user["id"],
+            user["email"],
+            user.get("is_admin", False),
+            user.get("mfa_enabled", False),
+            user.get("mfa_method"),
+            user.get("phone_number"),
+            user.get("last_login"),
+            user.get("token_version", 0),
+        )
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> "Principal":
+        """From the claims of a verified stateless access token"""
+        last_login = payload.get("last_login")
+        return cls(
+            payload["user_id"],
+            payload["sub"],
+            payload.get("is_admin", False),
+            payload["mfa_enabled"],
+            payload.get("mfa_method"),
+            payload.get("phone_number"),
+            datetime.fromisoformat(last_login) if last_login else None,
+            payload.get("tv", 0),
+        )
+
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, email={self.email!r}, is_admin={self.is_admin!r})"
@@ -0,0 +1,188 @@
+"""Token-bucket throttling for the login, MFA and token refresh endpoints, in Redis or per process."""
+import abc
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
+
+# route -> scope -> default rule
+DEFAULT_RULES = {
+    "login": {"ip": "30/60", "email": "10/300"},
+    "mfa_send": {"ip": "10/60", "email": "5/600"},
+    "mfa_verify": {"ip": "30/60", "email": "10/300"},
+    "refresh": {"ip": "60/60"},
+    "applications": {"ip": "10/3600", "email": "3/3600"},
+}
+
+
+def parse_rule(rule: str) -> Tuple[int, float]:
+    """``"10/60"`` -> (capacity 10, refill 10/60 tokens per second)"""
+    requests, seconds = rule.split("/")
+    capacity = int(requests)
+    return capacity, capacity / float(seconds)
+
+
+def load_rules() -> Dict[str, Dict[str, Tuple[int, float]]]:
+    rules = {}
+    for route, scopes in DEFAULT_RULES.items():
+        rules[route] = {}
+        for scope, default in scopes.items():
+            # e.g. RATE_LIMIT_LOGIN_EMAIL=5/300; an empty value turns the rule off
+            rule = os.environ.get(f'RATE_LIMIT_{route.upper()}_{scope.upper()}', default)
+            if rule:
+                rules[route][scope] = parse_rule(rule)
+    return rules
+
+
+class RateLimiter(abc.ABC):
+    """Token buckets keyed by (route, scope, value)"""
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Tuple[int, float]]]] = None, enabled: bool = RATE_LIMIT_ENABLED):
+        self.rules = load_rules() if rules is None else rules
+        self.enabled = enabled
+        self.rejected = 0
+
+    @abc.abstractmethod
+    async def take(self, buckets: List[Tuple[str, int, float]]) -> float:
+        """Draw a token from each (key, capacity, refill rate) bucket if all have one.
+
+        Returns 0 when the tokens were drawn, otherwise the seconds until
+        every bucket would allow one; nothing is drawn in that case.
+        """
+
+    async def enforce(self, route: str, **identities: Optional[str]):
+        """Raise 429 if ``route`` is over its limit for any identity, e.g. ``ip=..., email=...``"""
+        if not self.enabled:
+            return
+        buckets = []
+        for scope, (capacity, refill_rate) in self.rules.get(route, {}).items():
+            value = identities.get(scope)
+            if value:
+                buckets.append((f"{route}:{scope}:{value.lower()}", capacity, refill_rate))
+        if not buckets:
+            return
+
+        retry_after = await self.take(buckets)
+        if retry_after > 0:
+            self.rejected += 1
+            RATE_LIMITED.labels(route).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    async def close(self):
+        pass
+
+
+class InMemoryRateLimiter(RateLimiter):
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, **kwargs):
+        super().__init__(**kwargs)
+        self.max_keys = max_keys
+        # key -> [tokens, updated_at monotonic], least recently used first
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def take(self, buckets: List[Tuple[str, int, float]]) -> float:
+        now = time.monotonic()
+        retry_after = 0.0
+        refilled = []
+        for key, capacity, refill_rate in buckets:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(capacity), now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                bucket[1] = now
+            if bucket[0] < 1:
+                retry_after = max(retry_after, (1 - bucket[0]) / refill_rate)
+            refilled.append(bucket)
+        if retry_after == 0:
+            for bucket in refilled:
+                bucket[0] -= 1
+        # An evicted bucket just starts full again
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+# KEYS = bucket keys, ARGV = capacity and refill rate per key, in key order
+REDIS_TAKE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local retry_after = 0
+local tokens = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local ts = tonumber(state[2]) or now
+    tokens[i] = math.min(capacity, (tonumber(state[1]) or capacity) + math.max(0, now - ts) * rate)
+    if tokens[i] < 1 then
+        retry_after = math.max(retry_after, (1 - tokens[i]) / rate)
+    end
+end
+-- Draw from every bucket or from none
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    if retry_after == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call('HSET', key, 'tokens', tokens[i], 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+-- Lua numbers come back as truncated integers; send the string instead
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    def __init__(self, redis_client, key_prefix: str = "ratelimit", **kwargs):
+        super().__init__(**kwargs)
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._take_script = redis_client.register_script(REDIS_TAKE_SCRIPT)
+
+    async def take(self, buckets: List[Tuple[str, int, float]]) -> float:
+        keys, args = [], []
+        for key, capacity, refill_rate in buckets:
+            keys.append(f"{self.key_prefix}:{key}")
+            args.extend([capacity, refill_rate])
+        try:
+            retry_after = await self._take_script(keys=keys, args=args)
+        except Exception as e:
+            # Fail open: a Redis outage shouldn't lock every user out of login
+            logger.error(f"Rate limiter unavailable, allowing request: {e}")
+            return 0.0
+        return float(retry_after)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter selected by RATE_LIMIT_BACKEND (redis or memory)"""
+    redis_url = os.environ.get('REDIS_URL')
+    backend = os.environ.get('RATE_LIMIT_BACKEND', 'redis' if redis_url else 'memory')
+
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        logger.info("Using Redis rate limiter")
+        return RedisRateLimiter(redis.from_url(redis_url or "redis://localhost:6379/0"))
+    if backend == "memory":
+        return InMemoryRateLimiter()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
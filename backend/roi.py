@@ -0,0 +1,170 @@
+"""Vectorized ROI projections over a term table stored in ``app_settings``."""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import ReturnDocument
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ROI_TERMS_REFRESH_SECONDS = float(os.environ.get('ROI_TERMS_REFRESH_SECONDS', 30))
+ROI_MAX_SCENARIOS = int(os.environ.get('ROI_MAX_SCENARIOS', 10000))
+ROI_MAX_AMOUNT = float(os.environ.get('ROI_MAX_AMOUNT', 1e12))
+ROI_MAX_TERM_MONTHS = int(os.environ.get('ROI_MAX_TERM_MONTHS', 600))
+# Caps multiplier and compound_bonus, so amount * growth stays far from inf
+ROI_MAX_MULTIPLIER = 100.0
+ROI_TERMS_ID = "roi_terms"
+
+# Same values as termOptions in EnhancedROICalculator.js
+DEFAULT_ROI_TERMS = {
+    "terms": [
+        {"months": 6, "multiplier": 1.25, "min_investment": 500},
+        {"months": 9, "multiplier": 1.5, "min_investment": 1000},
+        {"months": 12, "multiplier": 2.0, "min_investment": 2000},
+    ],
+    "compound_bonus": 1.05,
+}
+
+
+class TermTable:
+    """One immutable version of the term table, as sorted NumPy columns"""
+
+    def __init__(self, terms: Sequence[Dict[str, Any]], compound_bonus: float, version: int = 0):
+        ordered = sorted(terms, key=lambda term: term["months"])
+        self.terms = [dict(term) for term in ordered]
+        self.compound_bonus = float(compound_bonus)
+        self.version = version
+        self._columns: Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = None
+
+    def columns(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """(months, multiplier, min_investment), built on first use"""
+        if self._columns is None:
+            import numpy as np
+
+            self._columns = (
+                np.array([term["months"] for term in self.terms], dtype=np.int64),
+                np.array([term["multiplier"] for term in self.terms], dtype=np.float64),
+                np.array([term["min_investment"] for term in self.terms], dtype=np.float64),
+            )
+        return self._columns
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "terms": self.terms, "compound_bonus": self.compound_bonus}
+
+
+def project(table: TermTable, amounts: "np.ndarray", terms: "np.ndarray", compound: "np.ndarray") -> Dict[str, "np.ndarray"]:
+    """Project every scenario at once; all inputs are equal-length 1-D arrays"""
+    import numpy as np
+
+    months, multiplier, min_investment = table.columns()
+    index = np.searchsorted(months, terms)
+    # Terms past the last entry land on len(months); clip so the gather stays in bounds
+    clipped = np.minimum(index, len(months) - 1)
+    known_term = (index < len(months)) & (months[clipped] == terms)
+    eligible = known_term & (amounts >= min_investment[clipped])
+
+    growth = multiplier[clipped] * np.where(compound, table.compound_bonus, 1.0)
+    final_amount = np.where(eligible, np.round(amounts * growth, 2), 0.0)
+    profit = np.where(eligible, np.round(final_amount - amounts, 2), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_percentage = np.where(eligible & (amounts > 0), np.round(profit / amounts * 100, 2), 0.0)
+    return {
+        "final_amount": final_amount,
+        "profit": profit,
+        "profit_percentage": profit_percentage,
+        "eligible": eligible,
+        "known_term": known_term,
+    }
+
+
+class ROIEngine:
+    def __init__(self, db, refresh_seconds: float = ROI_TERMS_REFRESH_SECONDS):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self.table = TermTable(DEFAULT_ROI_TERMS["terms"], DEFAULT_ROI_TERMS["compound_bonus"])
+        self.projections = 0
+        self.scenarios = 0
+        self._loaded_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        await self.reload()
+        self._task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"ROI engine started with term table version {self.table.version}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def project(self, amounts: List[float], terms: List[int], compound: List[bool]) -> Dict[str, Any]:
+        import numpy as np
+
+        # Read the table once so a concurrent reload can't mix two versions in one batch
+        table = self.table
+        result = project(
+            table,
+            np.asarray(amounts, dtype=np.float64),
+            np.asarray(terms, dtype=np.int64),
+            np.asarray(compound, dtype=bool),
+        )
+        self.projections += 1
+        self.scenarios += len(amounts)
+        return {"terms_version": table.version, "count": len(amounts), **result}
+
+    async def reload(self):
+        """Pick up the stored table if its version differs from the one in memory"""
+        stored = await self.db.app_settings.find_one({"_id": ROI_TERMS_ID}, {"_id": 0})
+        # Deleting the stored table falls back to the defaults
+        source = stored or {**DEFAULT_ROI_TERMS, "version": 0}
+        if source["version"] != self.table.version:
+            self.table = TermTable(source["terms"], source["compound_bonus"], source["version"])
+            logger.info(f"ROI term table reloaded at version {self.table.version}")
+        self._loaded_at = datetime.utcnow()
+
+    async def update_terms(self, terms: List[Dict[str, Any]], compound_bonus: float, updated_by: str) -> TermTable:
+        stored = await self.db.app_settings.find_one_and_update(
+            {"_id": ROI_TERMS_ID},
+            {
+                "$set": {"terms": terms, "compound_bonus": compound_bonus, "updated_by": updated_by, "updated_at": datetime.utcnow()},
+                "$inc": {"version": 1},
+            },
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        # This worker switches now; the others within one refresh interval
+        self.table = TermTable(stored["terms"], stored["compound_bonus"], stored["version"])
+        self._loaded_at = datetime.utcnow()
+        return self.table
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.reload()
+            except Exception as e:
+                # Keep projecting with the last table
+                logger.error(f"ROI term table refresh failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "terms_version": self.table.version,
+            "loaded_at": self._loaded_at,
+            "refresh_seconds": self.refresh_seconds,
+            "projections": self.projections,
+            "scenarios": self.scenarios,
+        }
@@ -0,0 +1,36 @@
+"""Single-pass orjson serialization for MongoDB documents."""
+from datetime import date, datetime
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    # orjson handles datetime natively; this only sees what it doesn't know
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_line(content: Any) -> bytes:
+    """Serialize one NDJSON record, newline included"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response that understands ObjectId and datetime without an extra encode pass"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,52 +1,139 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, Header, Query, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
+import io
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import secrets
 import jwt
-from passlib.context import CryptContext
 import asyncio
-import json
-from bson import ObjectId
-
-# Custom JSON encoder to handle MongoDB ObjectId
-class MongoJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 
 ROOT_DIR = Path(__file__).parent
+# Before the first-party imports: they read their settings at import time
 load_dotenv(ROOT_DIR / '.env')
 
-# Security setup
-SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-here')
-ALGORITHM = "HS256"
+import analytics
+from analytics import ANALYTICS_MAX_HOURLY_SPAN, APPLICATION_STAGE_COUNTERS, AnalyticsRollups
+from applications import create_application_pipeline
+from auth_cache import principal_cache
+from bootstrap import AdminBootstrap
+from cold_start import cold_start
+from database import MongoDatabase
+from indexes import ensure_indexes, report_collection_scans
+from jwt_keys import KeyRing
+from leads import (
+    LEAD_LIST_FIELDS, LEAD_SORTS, LEAD_STATUSES, LEADS_MAX_PAGE_SIZE, LEADS_PAGE_SIZE,
+    decode_lead_cursor, encode_lead_cursor, lead_query, update_lead,
+)
+from metrics import JWT_SECONDS, PrometheusMiddleware, render_latest
+from mfa_store import MFA_MISSING, MFA_TOO_MANY_ATTEMPTS, MFA_VERIFIED, create_mfa_store, normalize_email
+from notifications import Notification, create_notification_queue
+from password_hashing import password_hasher
+from principal import PRINCIPAL_PROJECTION, Principal
+from rate_limit import create_rate_limiter
+from roi import ROI_MAX_AMOUNT, ROI_MAX_MULTIPLIER, ROI_MAX_SCENARIOS, ROI_MAX_TERM_MONTHS, ROIEngine
+from serialization import MongoJSONResponse, dumps_line
+from status_telemetry import StatusTelemetry
+from sessions import SESSION_GRACE, SESSION_REUSED, SESSION_ROTATED, SessionStore
+from token_versions import CLAIMS_REVOKED, CLAIMS_VALID, TokenVersionMap
+from user_import import check_utf8, import_users, iter_csv_rows, iter_ndjson_rows
+
+# Security setup (JWT signing keys: jwt_keys.py)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 MFA_TOKEN_EXPIRE_MINUTES = 10
+# Serve identity-and-role routes from verified token claims, without MongoDB
+STATELESS_AUTH = os.environ.get('STATELESS_AUTH', 'false').lower() == 'true'
+
+# Admin listing paging
+ADMIN_USERS_PAGE_SIZE = 100
+ADMIN_USERS_MAX_PAGE_SIZE = 1000
+ADMIN_USERS_STREAM_BATCH_SIZE = 500
+MFA_LOGS_PAGE_SIZE = 100
+MFA_LOGS_MAX_PAGE_SIZE = 500
+# Columns the admin MFA log viewer may request; the plaintext code is never one of them
+MFA_LOG_FIELDS = ["id", "email", "method", "purpose", "created_at", "expires_at", "verified", "attempts"]
+READINESS_PING_TIMEOUT_SECONDS = 2
+STATUS_LIST_LIMIT = 1000
+STATUS_SUMMARY_DEFAULT_WINDOW = timedelta(hours=1)
+ANALYTICS_DEFAULT_WINDOW = timedelta(days=7)
+# Windows up to this long default to hourly buckets, longer ones to daily
+ANALYTICS_HOURLY_UP_TO = timedelta(hours=48)
+# Counter for each MFA delivery method
+MFA_SENT_COUNTERS = {"email": analytics.MFA_SENT_EMAIL, "sms": analytics.MFA_SENT_SMS}
+# Shorter than JWT_KEY_ACTIVATION_DELAY_SECONDS so caches see new keys before they sign
+JWKS_MAX_AGE_SECONDS = 120
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection (opened and closed by the app lifespan)
+db = MongoDatabase(os.environ['MONGO_URL'], os.environ['DB_NAME'])
+INDEX_SELF_CHECK = os.environ.get('MONGO_INDEX_SELF_CHECK', 'true').lower() == 'true'
+mfa_store = create_mfa_store(db)
+notification_queue = create_notification_queue(db)
+rate_limiter = create_rate_limiter()
+session_store = SessionStore(db)
+admin_bootstrap = AdminBootstrap(db)
+status_telemetry = StatusTelemetry(db)
+roi_engine = ROIEngine(db)
+application_pipeline = create_application_pipeline(db)
+analytics_rollups = AnalyticsRollups(db)
+key_ring = KeyRing(db, max_token_lifetime=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+token_versions = TokenVersionMap(db, max_token_lifetime=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.connect()
+    # The bcrypt workers spawn while the MongoDB steps below wait on the network
+    hasher_started = asyncio.create_task(password_hasher.start())
+    await ensure_indexes(db)
+    if INDEX_SELF_CHECK:
+        await report_collection_scans(db)
+    await key_ring.start()
+    await admin_bootstrap.reconcile()
+    await hasher_started
+    await notification_queue.start()
+    await status_telemetry.start()
+    await roi_engine.start()
+    await application_pipeline.start()
+    await analytics_rollups.start()
+    if STATELESS_AUTH:
+        await token_versions.start()
+    cold_start.mark_ready()
+    logger.info(f"Ready {cold_start.ready_seconds}s after process start (target {cold_start.target_seconds}s)")
+    try:
+        yield
+    finally:
+        await token_versions.stop()
+        await roi_engine.stop()
+        await application_pipeline.stop()
+        await analytics_rollups.stop()
+        await key_ring.stop()
+        await notification_queue.stop()
+        await status_telemetry.stop()
+        await mfa_store.close()
+        await rate_limiter.close()
+        password_hasher.shutdown()
+        # Close the client last so the steps above can still flush to MongoDB
+        db.close()
 
 # Create the main app without a prefix
-app = FastAPI(title="Nhalege Capital API", version="1.0.0")
+app = FastAPI(
+    title="Nhalege Capital API",
+    version="1.0.0",
+    default_response_class=MongoJSONResponse,
+    lifespan=lifespan,
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -73,6 +160,7 @@ class User(BaseModel):
     phone_number: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_login: Optional[datetime] = None
+    token_version: int = 0
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -88,7 +176,62 @@ class UserUpdate(BaseModel):
     mfa_method: Optional[str] = None
     phone_number: Optional[str] = None
 
+# Admin bulk operations
+MFA_METHODS = ["email", "sms", "both"]
+BULK_USER_ACTIONS = ["enable_mfa", "disable_mfa", "activate", "deactivate"]
+BULK_USER_MAX_OPERATIONS = 1000
+
+class UserImportRow(UserCreate):
+    mfa_enabled: bool = False
+    mfa_method: Optional[str] = None
+
+class BulkUserOperation(BaseModel):
+    user_id: Optional[str] = None
+    email: Optional[EmailStr] = None
+    action: str  # one of BULK_USER_ACTIONS
+    mfa_method: Optional[str] = None
+
+class BulkUserRequest(BaseModel):
+    operations: List[BulkUserOperation]
+
 # MFA Models
+class ROIScenario(BaseModel):
+    amount: float = Field(..., ge=0, le=ROI_MAX_AMOUNT, allow_inf_nan=False)
+    term: int = Field(..., gt=0, le=ROI_MAX_TERM_MONTHS)
+    compound: bool = False
+
+class ROIProjectionRequest(BaseModel):
+    scenarios: List[ROIScenario] = Field(..., min_length=1, max_length=ROI_MAX_SCENARIOS)
+
+class ROITerm(BaseModel):
+    months: int = Field(..., gt=0, le=ROI_MAX_TERM_MONTHS)
+    multiplier: float = Field(..., gt=0, le=ROI_MAX_MULTIPLIER)
+    min_investment: float = Field(0, ge=0, le=ROI_MAX_AMOUNT)
+
+class ROITermsUpdate(BaseModel):
+    terms: List[ROITerm] = Field(..., min_length=1)
+    compound_bonus: float = Field(1.0, gt=0, le=ROI_MAX_MULTIPLIER)
+
+class ApplicationCreate(BaseModel):
+    first_name: str = Field(..., min_length=1, max_length=100)
+    last_name: str = Field(..., min_length=1, max_length=100)
+    email: EmailStr
+    phone: Optional[str] = Field(None, max_length=40)
+    investment_capacity: str = Field(..., min_length=1, max_length=50)
+    accredited_status: str = Field(..., pattern="^(yes|no)$")
+    investment_experience: Optional[str] = Field(None, max_length=50)
+    hear_about_us: Optional[str] = Field(None, max_length=200)
+    additional_info: Optional[str] = Field(None, max_length=5000)
+    source: str = Field("website", max_length=100)
+
+class LeadUpdate(BaseModel):
+    status: Optional[str] = None
+    follow_up_required: Optional[bool] = None
+    follow_up_notes: Optional[str] = Field(None, max_length=5000)
+    investment_capacity: Optional[str] = Field(None, min_length=1, max_length=50)
+    accredited_status: Optional[str] = Field(None, pattern="^(yes|no)$")
+    investment_experience: Optional[str] = Field(None, max_length=50)
+
 class MFARequest(BaseModel):
     email: EmailStr
     method: str  # 'email' or 'sms'
@@ -113,18 +256,17 @@ class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
     requires_mfa: bool = False
+    refresh_token: Optional[str] = None
 
-class TokenData(BaseModel):
-    email: Optional[str] = None
-    user_id: Optional[str] = None
-    is_admin: bool = False
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # Utility Functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -132,42 +274,110 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    with JWT_SECONDS.labels("encode").time():
+        encoded_jwt = key_ring.sign(to_encode)
     return encoded_jwt
 
+def access_token_claims(user: Principal) -> dict:
+    """Claims for a full access token; with STATELESS_AUTH they also cover /auth/me"""
+    claims = {"sub": user.email, "user_id": user.id, "is_admin": user.is_admin, "tv": user.token_version}
+    if STATELESS_AUTH:
+        claims.update({
+            "mfa_enabled": user.mfa_enabled,
+            "mfa_method": user.mfa_method,
+            "phone_number": user.phone_number,
+            "last_login": user.last_login.isoformat() if user.last_login else None,
+        })
+    return claims
+
+async def issue_session_tokens(user: Principal, request: Request) -> Token:
+    """Access token plus a refresh token for a new device session, after a full login"""
+    access_token = create_access_token(
+        data=access_token_claims(user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    refresh_token = await session_store.create(user.id, request.headers.get("user-agent"), client_ip(request))
+    return Token(access_token=access_token, requires_mfa=False, refresh_token=refresh_token)
+
+def client_ip(request: Request) -> Optional[str]:
+    # uvicorn resolves X-Forwarded-For from trusted proxies (FORWARDED_ALLOW_IPS)
+    return request.client.host if request.client else None
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored datetimes are naive UTC; bring query-string ones with an offset into line"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
 def generate_mfa_code():
     """Generate a 6-digit MFA code"""
     return str(secrets.randbelow(900000) + 100000)
 
+async def decode_access_token(token: str) -> dict:
+    try:
+        with JWT_SECONDS.labels("decode").time():
+            return await key_ring.decode(token)
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        user_id: str = payload.get("user_id")
-        is_admin: bool = payload.get("is_admin", False)
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email, user_id=user_id, is_admin=is_admin)
-    except jwt.PyJWTError:
+    token = credentials.credentials
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    payload = await decode_access_token(token)
+    email: str = payload.get("sub")
+    if email is None:
         raise credentials_exception
     
-    user = await db.users.find_one({"email": token_data.email})
-    if user is None:
+    user = await db.users.find_one({"email": email}, PRINCIPAL_PROJECTION)
+    if user is None or not user.get("is_active", True):
+        raise credentials_exception
+    
+    # Tokens issued before the last revocation
+    if payload.get("tv", 0) < user.get("token_version", 0):
         raise credentials_exception
     
     # Ensure admin status is correctly set from token
-    if token_data.is_admin:
+    if payload.get("is_admin", False):
         user["is_admin"] = True
         
-    return User(**user)
+    current_user = Principal.from_document(user)
+    principal_cache.put(token, current_user.id, current_user, payload.get("exp"))
+    return current_user
 
-async def get_admin_user(current_user: User = Depends(get_current_user)):
+async def get_token_principal(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Identity and role only; from claims alone when STATELESS_AUTH is on"""
+    if not STATELESS_AUTH:
+        return await get_current_user(credentials)
+
+    payload = await decode_access_token(credentials.credentials)
+    # Tokens from before stateless mode (or MFA-pending ones) lack the claims
+    if "tv" in payload and "mfa_enabled" in payload and payload.get("user_id"):
+        verdict = token_versions.check(payload["user_id"], payload["tv"], payload.get("iat"))
+        if verdict == CLAIMS_REVOKED:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if verdict == CLAIMS_VALID:
+            return Principal.from_claims(payload)
+    # Stale claims: the token is still good, but the profile comes from MongoDB
+    return await get_current_user(credentials)
+
+async def get_admin_user(current_user: Principal = Depends(get_token_principal)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -175,25 +385,27 @@ async def get_admin_user(current_user: User = Depends(get_current_user)):
         )
     return current_user
 
-# Mock MFA Service Functions (replace with real integrations later)
-async def send_email_mfa_code(email: str, code: str):
-    """Mock email sending - replace with SendGrid integration"""
-    logger.info(f"[MOCK] Sending email MFA code {code} to {email}")
-    # In production, integrate with SendGrid here
-    return {"status": "sent", "message": f"Code sent to {email}"}
+async def find_user_by_email(email: str, projection: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Users are stored under normalize_email; older accounts may keep the case they signed up with"""
+    normalized = normalize_email(email)
+    user = await db.users.find_one({"email": normalized}, projection)
+    if user is None and email != normalized:
+        user = await db.users.find_one({"email": email}, projection)
+    return user
+
+# MFA delivery goes through the background queue in notifications.py
+def send_email_mfa_code(verification_id: str, email: str, code: str):
+    notification_queue.enqueue(Notification(verification_id, "email", email, code))
 
-async def send_sms_mfa_code(phone: str, code: str):
-    """Mock SMS sending - replace with Twilio integration"""
-    logger.info(f"[MOCK] Sending SMS MFA code {code} to {phone}")
-    # In production, integrate with Twilio here
-    return {"status": "sent", "message": f"Code sent to {phone}"}
+def send_sms_mfa_code(verification_id: str, phone: str, code: str):
+    notification_queue.enqueue(Notification(verification_id, "sms", phone, code))
 
 
 # Authentication Endpoints
 @api_router.post("/auth/register", response_model=Token)
-async def register_user(user_data: UserCreate):
+async def register_user(user_data: UserCreate, request: Request):
     # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
+    existing_user = await find_user_by_email(user_data.email, {"_id": 1})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -201,49 +413,60 @@ async def register_user(user_data: UserCreate):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    
-    # Check if this is the first user (will be admin)
-    is_first_user = await db.users.count_documents({}) == 0
+    hashed_password = await get_password_hash(user_data.password)
     
     user = User(
-        email=user_data.email,
+        email=normalize_email(user_data.email),
         hashed_password=hashed_password,
-        phone_number=user_data.phone_number,
-        is_admin=is_first_user
+        phone_number=user_data.phone_number
     )
+    # The first user becomes admin; one atomic claim instead of counting users
+    user.is_admin = await admin_bootstrap.claim(user.id)
     
-    await db.users.insert_one(user.dict())
-    
-    # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email, "user_id": user.id}, 
-        expires_delta=access_token_expires
-    )
+    user_doc = user.dict()
+    try:
+        await db.users.insert_one(user_doc)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup for the same email
+        if user.is_admin:
+            await admin_bootstrap.release(user.id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    return Token(access_token=access_token, requires_mfa=False)
+    analytics_rollups.record(analytics.REGISTRATIONS)
+    return await issue_session_tokens(Principal.from_document(user_doc), request)
 
 @api_router.post("/auth/login", response_model=Token)
-async def login_user(login_data: UserLogin):
+async def login_user(login_data: UserLogin, request: Request):
+    # Throttle before the bcrypt verify and user lookup
+    await rate_limiter.enforce("login", ip=client_ip(request), email=login_data.email)
+    
     # Verify user credentials
-    user_doc = await db.users.find_one({"email": login_data.email})
-    if not user_doc or not verify_password(login_data.password, user_doc["hashed_password"]):
+    user_doc = await find_user_by_email(login_data.email, {**PRINCIPAL_PROJECTION, "hashed_password": 1})
+    # Deactivated accounts are refused before paying for bcrypt
+    if not user_doc or not user_doc.get("is_active", True) or not await verify_password(login_data.password, user_doc["hashed_password"]):
+        analytics_rollups.record(analytics.LOGIN_FAILURES)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    user = User(**user_doc)
+    user = Principal.from_document(user_doc)
     
     # Update last login
+    user.last_login = datetime.utcnow()
     await db.users.update_one(
         {"id": user.id},
-        {"$set": {"last_login": datetime.utcnow()}}
+        {"$set": {"last_login": user.last_login}}
     )
+    principal_cache.invalidate_user(user.id)
+    analytics_rollups.record(analytics.LOGINS)
     
     # Check if MFA is enabled
     if user.mfa_enabled:
+        analytics_rollups.record(analytics.LOGINS_MFA_REQUIRED)
         # Create temporary token that requires MFA completion
         access_token = create_access_token(
             data={"sub": user.email, "user_id": user.id, "mfa_pending": True},
@@ -251,16 +474,59 @@ async def login_user(login_data: UserLogin):
         )
         return Token(access_token=access_token, requires_mfa=True)
     else:
-        # Create full access token
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.email, "user_id": user.id, "is_admin": user.is_admin}, 
-            expires_delta=access_token_expires
+        return await issue_session_tokens(user, request)
+
+@api_router.post("/auth/refresh", response_model=Token)
+async def refresh_access_token(refresh_data: RefreshRequest, request: Request):
+    # No password check here; rotation replaces the refresh token on every use,
+    # except a retry inside the grace window, which gets no new refresh token
+    await rate_limiter.enforce("refresh", ip=client_ip(request))
+    outcome, user_id, refresh_token = await session_store.rotate(refresh_data.refresh_token)
+    
+    if outcome == SESSION_REUSED:
+        # A rotated token came back: assume it leaked and cut off its access tokens too
+        await token_versions.revoke(user_id)
+        principal_cache.invalidate_user(user_id)
+    
+    user_doc = await db.users.find_one({"id": user_id}, PRINCIPAL_PROJECTION) if outcome in (SESSION_ROTATED, SESSION_GRACE) else None
+    if user_doc is None or not user_doc.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+    
+    user = Principal.from_document(user_doc)
+    access_token = create_access_token(
+        data=access_token_claims(user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return Token(access_token=access_token, requires_mfa=False, refresh_token=refresh_token)
+
+@api_router.post("/auth/logout")
+async def logout_session(refresh_data: RefreshRequest):
+    # The secret has to match, or anyone who saw a session id could end it
+    if not await session_store.revoke_token(refresh_data.refresh_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+    return {"message": "Logged out"}
+
+@api_router.get("/auth/sessions")
+async def list_sessions(current_user: Principal = Depends(get_token_principal)):
+    return await session_store.list_active(current_user.id)
+
+@api_router.delete("/auth/sessions/{session_id}")
+async def revoke_session(session_id: str, current_user: Principal = Depends(get_token_principal)):
+    if not await session_store.revoke(session_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
         )
-        return Token(access_token=access_token, requires_mfa=False)
+    return {"message": "Session revoked"}
 
 @api_router.get("/auth/me")
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_token_principal)):
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -272,16 +538,18 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     }
 # MFA Endpoints
 @api_router.post("/mfa/send-code")
-async def send_mfa_code(mfa_request: MFARequest):
+async def send_mfa_code(mfa_request: MFARequest, request: Request):
+    await rate_limiter.enforce("mfa_send", ip=client_ip(request), email=mfa_request.email)
+    
     # Get user
-    user_doc = await db.users.find_one({"email": mfa_request.email})
+    user_doc = await find_user_by_email(mfa_request.email, PRINCIPAL_PROJECTION)
     if not user_doc:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    user = User(**user_doc)
+    user = Principal.from_document(user_doc)
     
     # Generate MFA code
     code = generate_mfa_code()
@@ -295,91 +563,85 @@ async def send_mfa_code(mfa_request: MFARequest):
         purpose="login",
         expires_at=expires_at
     )
-    await db.mfa_verifications.insert_one(verification.dict())
+    await mfa_store.save(verification.dict())
     
     # Send code via requested method
     if mfa_request.method == "email":
-        result = await send_email_mfa_code(mfa_request.email, code)
+        send_email_mfa_code(verification.id, mfa_request.email, code)
     elif mfa_request.method == "sms":
         if not user.phone_number:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="No phone number registered for SMS"
             )
-        result = await send_sms_mfa_code(user.phone_number, code)
+        send_sms_mfa_code(verification.id, user.phone_number, code)
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid MFA method"
         )
     
+    analytics_rollups.record(MFA_SENT_COUNTERS[mfa_request.method])
     return {
         "message": f"MFA code sent via {mfa_request.method}",
-        "expires_in_minutes": MFA_TOKEN_EXPIRE_MINUTES
+        "expires_in_minutes": MFA_TOKEN_EXPIRE_MINUTES,
+        "verification_id": verification.id
     }
 
 @api_router.post("/mfa/verify-code", response_model=Token)
-async def verify_mfa_code(mfa_verify: MFAVerify):
-    # Find the most recent unverified code for this email
-    verification_doc = await db.mfa_verifications.find_one({
-        "email": mfa_verify.email,
-        "verified": False,
-        "expires_at": {"$gt": datetime.utcnow()}
-    }, sort=[("created_at", -1)])
-    
-    if not verification_doc:
+async def verify_mfa_code(mfa_verify: MFAVerify, request: Request):
+    await rate_limiter.enforce("mfa_verify", ip=client_ip(request), email=mfa_verify.email)
+    
+    # Count the attempt and check the code in one atomic store call
+    outcome, _ = await mfa_store.verify(mfa_verify.email, "login", mfa_verify.code)
+    analytics_rollups.record(analytics.MFA_VERIFIED if outcome == MFA_VERIFIED else analytics.MFA_REJECTED)
+    
+    if outcome == MFA_MISSING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No valid verification code found or code expired"
         )
     
-    verification = MFAVerification(**verification_doc)
-    
-    # Increment attempts
-    await db.mfa_verifications.update_one(
-        {"id": verification.id},
-        {"$inc": {"attempts": 1}}
-    )
-    
-    # Check if too many attempts
-    if verification.attempts >= 3:
-        await db.mfa_verifications.update_one(
-            {"id": verification.id},
-            {"$set": {"verified": False}}
-        )
+    if outcome == MFA_TOO_MANY_ATTEMPTS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Too many verification attempts. Please request a new code."
         )
     
-    # Verify code
-    if verification.code != mfa_verify.code:
+    if outcome != MFA_VERIFIED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid verification code"
         )
     
-    # Mark as verified
-    await db.mfa_verifications.update_one(
-        {"id": verification.id},
-        {"$set": {"verified": True}}
-    )
-    
-    # Get user info
-    user_doc = await db.users.find_one({"email": mfa_verify.email})
-    user = User(**user_doc)
-    
-    # Create full access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email, "user_id": user.id, "is_admin": user.is_admin}, 
-        expires_delta=access_token_expires
-    )
+    # Same normalization as the code lookup above
+    user_doc = await find_user_by_email(mfa_verify.email, PRINCIPAL_PROJECTION)
+    if user_doc is None or not user_doc.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account not available"
+        )
     
-    return Token(access_token=access_token, requires_mfa=False)
+    return await issue_session_tokens(Principal.from_document(user_doc), request)
+
+@api_router.get("/mfa/delivery/{verification_id}")
+async def get_mfa_delivery_status(verification_id: str):
+    delivery = await notification_queue.get_status(verification_id)
+    if delivery is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown verification id"
+        )
+    # Recipients stay private; callers only learn how delivery went
+    return {
+        "verification_id": verification_id,
+        "status": delivery["status"],
+        "attempts": delivery["attempts"],
+        "updated_at": delivery["updated_at"]
+    }
 
 @api_router.post("/mfa/send-admin-code")
-async def send_admin_mfa_code(mfa_request: MFARequest, current_user: User = Depends(get_current_user)):
+async def send_admin_mfa_code(mfa_request: MFARequest, current_user: Principal = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -398,57 +660,54 @@ async def send_admin_mfa_code(mfa_request: MFARequest, current_user: User = Depe
         purpose="admin_access",
         expires_at=expires_at
     )
-    await db.mfa_verifications.insert_one(verification.dict())
+    await mfa_store.save(verification.dict())
     
     # Send code
     if mfa_request.method == "email":
-        result = await send_email_mfa_code(mfa_request.email, code)
+        send_email_mfa_code(verification.id, mfa_request.email, code)
     elif mfa_request.method == "sms" and current_user.phone_number:
-        result = await send_sms_mfa_code(current_user.phone_number, code)
+        send_sms_mfa_code(verification.id, current_user.phone_number, code)
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid MFA method or missing phone number"
         )
     
+    analytics_rollups.record(MFA_SENT_COUNTERS[mfa_request.method])
     return {
         "message": f"Admin MFA code sent via {mfa_request.method}",
-        "expires_in_minutes": MFA_TOKEN_EXPIRE_MINUTES
+        "expires_in_minutes": MFA_TOKEN_EXPIRE_MINUTES,
+        "verification_id": verification.id
     }
 
 @api_router.post("/mfa/verify-admin-code")
-async def verify_admin_mfa_code(mfa_verify: MFAVerify, current_user: User = Depends(get_current_user)):
+async def verify_admin_mfa_code(mfa_verify: MFAVerify, current_user: Principal = Depends(get_current_user)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
     
-    # Find admin verification code
-    verification_doc = await db.mfa_verifications.find_one({
-        "email": mfa_verify.email,
-        "purpose": "admin_access",
-        "verified": False,
-        "expires_at": {"$gt": datetime.utcnow()}
-    }, sort=[("created_at", -1)])
+    outcome, _ = await mfa_store.verify(mfa_verify.email, "admin_access", mfa_verify.code)
+    analytics_rollups.record(analytics.MFA_VERIFIED if outcome == MFA_VERIFIED else analytics.MFA_REJECTED)
     
-    if not verification_doc or verification_doc["code"] != mfa_verify.code:
+    if outcome == MFA_TOO_MANY_ATTEMPTS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid or expired admin verification code"
+            detail="Too many verification attempts. Please request a new code."
         )
     
-    # Mark as verified
-    await db.mfa_verifications.update_one(
-        {"id": verification_doc["id"]},
-        {"$set": {"verified": True}}
-    )
+    if outcome != MFA_VERIFIED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired admin verification code"
+        )
     
     return {"message": "Admin access verified", "verified": True}
 
 # User Settings Endpoints
 @api_router.put("/user/settings")
-async def update_user_settings(settings: UserUpdate, current_user: User = Depends(get_current_user)):
+async def update_user_settings(settings: UserUpdate, current_user: Principal = Depends(get_current_user)):
     update_data = {}
     
     if settings.mfa_enabled is not None:
@@ -470,40 +729,480 @@ async def update_user_settings(settings: UserUpdate, current_user: User = Depend
             {"id": current_user.id},
             {"$set": update_data}
         )
+        principal_cache.invalidate_user(current_user.id)
+        # Tokens carrying the old MFA settings stop being served from claims
+        await token_versions.claims_changed(current_user.id)
     
     return {"message": "Settings updated successfully"}
 
 # Admin Endpoints
+async def stream_ndjson(cursor):
+    """Serialize documents one line at a time straight off a Motor cursor"""
+    async for document in cursor:
+        yield dumps_line(document)
+
+def validate_import_row(row: Dict[str, Any]) -> UserImportRow:
+    user = UserImportRow(**row)
+    user.email = normalize_email(user.email)
+    if user.mfa_method is not None and user.mfa_method not in MFA_METHODS:
+        raise ValueError(f"Invalid MFA method {user.mfa_method}")
+    return user
+
+def build_imported_user(row: UserImportRow, hashed_password: str) -> Dict[str, Any]:
+    return User(
+        email=row.email,
+        hashed_password=hashed_password,
+        phone_number=row.phone_number,
+        mfa_enabled=row.mfa_enabled,
+        mfa_method=row.mfa_method,
+    ).dict()
+
+@api_router.post("/admin/users/import")
+async def import_users_file(
+    file: UploadFile = File(...),
+    input_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    admin_user: Principal = Depends(get_admin_user)
+):
+    """CSV (header row) or NDJSON of email, password, phone_number, mfa_enabled, mfa_method; streams NDJSON progress"""
+    file_format = input_format or ("ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv")
+    # FastAPI closes the upload when the handler returns, before the stream below runs
+    raw = await file.read()
+    try:
+        check_utf8(raw)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    content = io.BytesIO(raw)
+    rows = iter_ndjson_rows(content) if file_format == "ndjson" else iter_csv_rows(content)
+
+    async def progress():
+        async for event in import_users(db, password_hasher, rows, validate_import_row, build_imported_user):
+            yield dumps_line(event)
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+@api_router.post("/admin/users/bulk")
+async def bulk_update_users(bulk_request: BulkUserRequest, admin_user: Principal = Depends(get_admin_user)):
+    if len(bulk_request.operations) > BULK_USER_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BULK_USER_MAX_OPERATIONS} operations per request"
+        )
+    
+    now = datetime.utcnow()
+    requests, errors = [], []
+    for index, operation in enumerate(bulk_request.operations):
+        if operation.user_id:
+            query = {"id": operation.user_id}
+        elif operation.email:
+            query = {"email": normalize_email(operation.email)}
+        else:
+            errors.append({"index": index, "error": "user_id or email is required"})
+            continue
+        
+        # Every action changes a claim, so older tokens fall back to MongoDB (token_versions.py)
+        changes = {"claims_changed_at": now}
+        update = {"$set": changes}
+        if operation.action == "enable_mfa":
+            if operation.mfa_method not in MFA_METHODS:
+                errors.append({"index": index, "error": "Invalid MFA method"})
+                continue
+            changes.update({"mfa_enabled": True, "mfa_method": operation.mfa_method})
+        elif operation.action == "disable_mfa":
+            changes["mfa_enabled"] = False
+        elif operation.action == "activate":
+            changes["is_active"] = True
+        elif operation.action == "deactivate":
+            changes["is_active"] = False
+            # Also invalidates every access token already issued
+            update["$inc"] = {"token_version": 1}
+        else:
+            errors.append({"index": index, "error": f"Unknown action; expected one of {', '.join(BULK_USER_ACTIONS)}"})
+            continue
+        requests.append(UpdateOne(query, update))
+    
+    matched = modified = 0
+    if requests:
+        result = await db.users.bulk_write(requests, ordered=False)
+        matched, modified = result.matched_count, result.modified_count
+        
+        # One lookup resolves every touched user for cache and session cleanup
+        touched = await db.users.find(
+            {"$or": [{"id": {"$in": [op.user_id for op in bulk_request.operations if op.user_id]}},
+                     {"email": {"$in": [normalize_email(op.email) for op in bulk_request.operations if op.email]}}]},
+            {"_id": 0, "id": 1, "is_active": 1}
+        ).to_list(None)
+        for user_doc in touched:
+            principal_cache.invalidate_user(user_doc["id"])
+        deactivated = [user_doc["id"] for user_doc in touched if not user_doc.get("is_active", True)]
+        if deactivated:
+            await session_store.revoke_users(deactivated, reason="deactivated")
+        if token_versions.running:
+            await token_versions.refresh()
+    
+    return {
+        "requested": len(bulk_request.operations),
+        "applied": len(requests),
+        "matched": matched,
+        "modified": modified,
+        "errors": errors
+    }
+
 @api_router.get("/admin/users")
-async def get_all_users(admin_user: User = Depends(get_admin_user)):
-    users = await db.users.find({}, {"hashed_password": 0}).to_list(1000)
-    # Convert to JSON-serializable format
-    serialized_users = json.loads(json.dumps(users, cls=MongoJSONEncoder))
-    return serialized_users
+async def get_all_users(
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=ADMIN_USERS_MAX_PAGE_SIZE),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    admin_user: Principal = Depends(get_admin_user),
+):
+    # Keyset pagination on the unique, indexed user id keeps the order stable
+    query = {"id": {"$gt": after}} if after else {}
+    cursor = db.users.find(query, {"hashed_password": 0}).sort("id", 1)
+
+    if output_format == "ndjson":
+        # Without a limit this streams every remaining user in constant memory
+        if limit:
+            cursor = cursor.limit(limit)
+        cursor = cursor.batch_size(ADMIN_USERS_STREAM_BATCH_SIZE)
+        return StreamingResponse(stream_ndjson(cursor), media_type="application/x-ndjson")
+
+    page_size = limit or ADMIN_USERS_PAGE_SIZE
+    # Fetch one extra document to learn whether another page exists
+    users = await cursor.limit(page_size + 1).to_list(page_size + 1)
+    headers = {}
+    if len(users) > page_size:
+        users = users[:page_size]
+        next_after = users[-1]["id"]
+        headers["X-Next-After"] = next_after
+        headers["Link"] = f'</api/admin/users?after={next_after}&limit={page_size}>; rel="next"'
+    return MongoJSONResponse(users, headers=headers)
+
+def encode_mfa_log_cursor(log: dict) -> str:
+    return f"{log['created_at'].isoformat()}|{log['id']}"
+
+def decode_mfa_log_cursor(cursor: str) -> dict:
+    try:
+        created_at, log_id = cursor.split("|", 1)
+        created_at = datetime.fromisoformat(created_at)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    # Newest first, with the id breaking ties between identical timestamps
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": log_id}},
+    ]}
 
 @api_router.get("/admin/mfa-logs")
-async def get_mfa_logs(admin_user: User = Depends(get_admin_user)):
-    logs = await db.mfa_verifications.find({}).sort("created_at", -1).to_list(100)
-    # Convert to JSON-serializable format
-    serialized_logs = json.loads(json.dumps(logs, cls=MongoJSONEncoder))
-    return serialized_logs
+async def get_mfa_logs(
+    email: Optional[str] = None,
+    purpose: Optional[str] = None,
+    method: Optional[str] = None,
+    verified: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = Query(MFA_LOGS_PAGE_SIZE, ge=1, le=MFA_LOGS_MAX_PAGE_SIZE),
+    admin_user: Principal = Depends(get_admin_user),
+):
+    query: Dict[str, Any] = {}
+    # MFA stores keep emails normalized
+    email = normalize_email(email) if email is not None else None
+    for field, value in (("email", email), ("purpose", purpose), ("method", method), ("verified", verified)):
+        if value is not None:
+            query[field] = value
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    if before:
+        query = {"$and": [query, decode_mfa_log_cursor(before)]} if query else decode_mfa_log_cursor(before)
+
+    # Only project the columns the console renders
+    selected = MFA_LOG_FIELDS
+    if fields:
+        selected = [field for field in fields.split(",") if field in MFA_LOG_FIELDS]
+    projection = {field: 1 for field in selected}
+    projection.update({"_id": 0, "id": 1, "created_at": 1})
+
+    logs = await (
+        db.mfa_audit.find(query, projection)
+        .sort([("created_at", -1), ("id", -1)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    headers = {}
+    if len(logs) > limit:
+        logs = logs[:limit]
+        headers["X-Next-Before"] = encode_mfa_log_cursor(logs[-1])
+    return MongoJSONResponse(logs, headers=headers)
+
+@api_router.get("/admin/notifications/dead-letters")
+async def get_notification_dead_letters(
+    limit: int = Query(100, ge=1, le=1000),
+    admin_user: Principal = Depends(get_admin_user),
+):
+    return MongoJSONResponse(await notification_queue.dead_letters(limit))
+
+@api_router.get("/admin/db-pool")
+async def get_db_pool_stats(admin_user: Principal = Depends(get_admin_user)):
+    return db.pool_stats()
+
+@api_router.get("/admin/password-hashing")
+async def get_password_hashing_stats(admin_user: Principal = Depends(get_admin_user)):
+    return password_hasher.snapshot()
+
+@api_router.get("/admin/principal-cache")
+async def get_principal_cache_stats(admin_user: Principal = Depends(get_admin_user)):
+    return principal_cache.snapshot()
+
+@api_router.get("/admin/jwt-keys")
+async def get_jwt_key_ring(admin_user: Principal = Depends(get_admin_user)):
+    return key_ring.snapshot()
+
+@api_router.get("/admin/token-versions")
+async def get_token_version_stats(admin_user: Principal = Depends(get_admin_user)):
+    return token_versions.snapshot()
+
+@api_router.post("/admin/users/{user_id}/revoke-tokens")
+async def revoke_user_tokens(user_id: str, admin_user: Principal = Depends(get_admin_user)):
+    token_version = await token_versions.revoke(user_id)
+    if token_version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    sessions_revoked = await session_store.revoke_users([user_id])
+    principal_cache.invalidate_user(user_id)
+    return {"message": "Tokens revoked", "token_version": token_version, "sessions_revoked": sessions_revoked}
+
+# Investor applications (storage and Airtable sync: applications.py)
+@api_router.post("/applications", status_code=status.HTTP_202_ACCEPTED)
+async def submit_application(
+    application: ApplicationCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+):
+    await rate_limiter.enforce("applications", ip=client_ip(request), email=application.email)
+    application_data = application.dict()
+    application_data["email"] = application_data["email"].lower()
+    stored, created = await application_pipeline.submit(application_data, idempotency_key, client_ip(request))
+    if created:
+        analytics_rollups.record(analytics.APPLICATIONS_SUBMITTED)
+    return MongoJSONResponse(
+        # Scored here, so the browser needs no copy of the scoring rules
+        {"id": stored["id"], "status": "received", "duplicate": not created,
+         "lead_score": stored.get("lead_score"), "priority": stored.get("priority")},
+        status_code=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK,
+    )
+
+# Lead search over applications (scoring, search terms and cursors: leads.py)
+@api_router.get("/admin/leads")
+async def get_leads(
+    lead_status: Optional[str] = Query(None, alias="status"),
+    follow_up: Optional[bool] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: str = Query("score", pattern=f"^({'|'.join(LEAD_SORTS)})$"),
+    after: Optional[str] = None,
+    limit: int = Query(LEADS_PAGE_SIZE, ge=1, le=LEADS_MAX_PAGE_SIZE),
+    admin_user: Principal = Depends(get_admin_user),
+):
+    query = lead_query(lead_status, follow_up, q)
+    if after:
+        try:
+            page_filter = decode_lead_cursor(after, sort)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = {"$and": [query, page_filter]} if query else page_filter
+
+    projection = {field: 1 for field in LEAD_LIST_FIELDS}
+    projection["_id"] = 0
+    leads = await (
+        db.applications.find(query, projection)
+        .sort([(LEAD_SORTS[sort], -1), ("id", -1)])
+        .limit(limit + 1)
+        .to_list(limit + 1)
+    )
+    headers = {}
+    if len(leads) > limit:
+        leads = leads[:limit]
+        headers["X-Next-After"] = encode_lead_cursor(leads[-1], sort)
+    return MongoJSONResponse(leads, headers=headers)
+
+@api_router.patch("/admin/leads/{lead_id}")
+async def patch_lead(lead_id: str, lead_update: LeadUpdate, admin_user: Principal = Depends(get_admin_user)):
+    # Null means "leave as is"; none of these fields may be stored as null
+    changes = lead_update.model_dump(exclude_none=True)
+    if "status" in changes and changes["status"] not in LEAD_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"status must be one of: {', '.join(LEAD_STATUSES)}"
+        )
+    lead, previous_status = await update_lead(db, lead_id, changes, admin_user.id)
+    if lead is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lead not found"
+        )
+    if lead["status"] != previous_status and lead["status"] in APPLICATION_STAGE_COUNTERS:
+        analytics_rollups.record(APPLICATION_STAGE_COUNTERS[lead["status"]])
+    # Push the edit to the Airtable row as well
+    await application_pipeline.requeue(lead_id)
+    return MongoJSONResponse(lead)
+
+# Conversion analytics from pre-aggregated rollups (analytics.py)
+@api_router.get("/admin/analytics")
+async def get_analytics(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    granularity: Optional[str] = Query(None, pattern="^(hour|day)$"),
+    admin_user: Principal = Depends(get_admin_user),
+):
+    until = naive_utc(until) or datetime.utcnow()
+    since = naive_utc(since) or until - ANALYTICS_DEFAULT_WINDOW
+    if since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must be before until"
+        )
+    granularity = granularity or ("hour" if until - since <= ANALYTICS_HOURLY_UP_TO else "day")
+    if granularity == "hour" and until - since > ANALYTICS_MAX_HOURLY_SPAN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Hourly analytics cover at most {ANALYTICS_MAX_HOURLY_SPAN.days} days"
+        )
+    return MongoJSONResponse(await analytics_rollups.summary(since, until, granularity))
+
+@api_router.post("/admin/analytics/backfill", status_code=status.HTTP_202_ACCEPTED)
+async def backfill_analytics(since: Optional[datetime] = None, admin_user: Principal = Depends(get_admin_user)):
+    """Fill in the rollup counters stored data can vouch for; poll /admin/analytics-rollups for progress"""
+    if not await analytics_rollups.start_backfill(naive_utc(since)):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An analytics backfill is already running"
+        )
+    return {"message": "Analytics backfill started"}
+
+@api_router.get("/admin/analytics-rollups")
+async def get_analytics_rollup_stats(admin_user: Principal = Depends(get_admin_user)):
+    return analytics_rollups.snapshot()
+
+@api_router.get("/admin/applications/sync")
+async def get_application_sync_stats(admin_user: Principal = Depends(get_admin_user)):
+    return {**application_pipeline.snapshot(), "counts": await application_pipeline.sync_counts()}
+
+# ROI projections (math and term table: roi.py)
+@api_router.post("/roi/project")
+async def project_roi(request: ROIProjectionRequest):
+    """Project a batch of scenarios; results are columns in scenario order"""
+    scenarios = request.scenarios
+    projection = roi_engine.project(
+        [scenario.amount for scenario in scenarios],
+        [scenario.term for scenario in scenarios],
+        [scenario.compound for scenario in scenarios],
+    )
+    return MongoJSONResponse(projection)
+
+@api_router.get("/roi/terms")
+async def get_roi_terms():
+    return roi_engine.table.as_dict()
+
+@api_router.put("/admin/roi/terms")
+async def update_roi_terms(update: ROITermsUpdate, admin_user: Principal = Depends(get_admin_user)):
+    months = [term.months for term in update.terms]
+    if len(set(months)) != len(months):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each term length may only appear once"
+        )
+    table = await roi_engine.update_terms(
+        [term.dict() for term in update.terms], update.compound_bonus, admin_user.id
+    )
+    return table.as_dict()
+
+@api_router.get("/admin/roi-engine")
+async def get_roi_engine_stats(admin_user: Principal = Depends(get_admin_user)):
+    return roi_engine.snapshot()
 
 # Original endpoints (keeping for compatibility)
 @api_router.get("/")
 async def root():
     return {"message": "Nhalege Capital API - MFA Ready"}
 
+# Public verification keys, so other services can check access tokens themselves
+@api_router.get("/.well-known/jwks.json")
+async def jwks():
+    return MongoJSONResponse(key_ring.jwks(), headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE_SECONDS}"})
+
+# Health probes used by entrypoint.sh and the container HEALTHCHECK
+@api_router.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+@api_router.get("/health/ready")
+async def readiness():
+    checks = {
+        "jwt_keys": "ok" if key_ring.ready else "starting",
+        "password_hasher": "ok" if password_hasher.running else "starting",
+        "notification_queue": "ok" if notification_queue.running else "starting",
+        "status_telemetry": "ok" if status_telemetry.running else "starting",
+        "roi_engine": "ok" if roi_engine.running else "starting",
+        "application_sync": "ok" if application_pipeline.running else "starting",
+        "analytics": "ok" if analytics_rollups.running else "starting",
+    }
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=READINESS_PING_TIMEOUT_SECONDS)
+        checks["mongo"] = "ok"
+    except Exception as e:
+        checks["mongo"] = f"unavailable: {e.__class__.__name__}"
+
+    ready = all(check == "ok" for check in checks.values())
+    return MongoJSONResponse(
+        # cold_start is informational; a slow start doesn't fail the probe
+        {"status": "ready" if ready else "unavailable", "checks": checks, "cold_start": cold_start.snapshot()},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    # Buffered; status_telemetry.py writes it with the next batch
+    status_telemetry.record(status_obj.dict())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
 async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+    # Stored checks already have the StatusCheck shape; skip re-validating each one
+    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(STATUS_LIST_LIMIT)
+    return MongoJSONResponse(status_checks)
+
+@api_router.get("/status/summary")
+async def get_status_summary(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None
+):
+    """Heartbeat counts per client from the per-minute buckets; defaults to the last hour"""
+    until = naive_utc(until) or datetime.utcnow()
+    since = naive_utc(since) or until - STATUS_SUMMARY_DEFAULT_WINDOW
+    if since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must be before until"
+        )
+    return await status_telemetry.summary(since, until, client_name)
+
+@api_router.get("/admin/status-telemetry")
+async def get_status_telemetry_stats(admin_user: Principal = Depends(get_admin_user)):
+    return status_telemetry.snapshot()
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -514,7 +1213,16 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the admin console read pagination cursors cross-origin
+    expose_headers=["X-Next-After", "X-Next-Before", "Link"],
 )
+app.add_middleware(PrometheusMiddleware)
+
+# Scraped by Prometheus; outside /api so nginx doesn't expose it publicly
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = render_latest()
+    return Response(content=content, media_type=content_type)
 
 # Configure logging
 logging.basicConfig(
@@ -523,6 +1231,4 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+cold_start.mark_imported()
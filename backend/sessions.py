@@ -0,0 +1,153 @@
+"""Per-device login sessions backed by rotating refresh tokens."""
+import hashlib
+import logging
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get('REFRESH_TOKEN_EXPIRE_DAYS', 14))
+REFRESH_TOKEN_REUSE_GRACE_SECONDS = int(os.environ.get('REFRESH_TOKEN_REUSE_GRACE_SECONDS', 10))
+# Attempts when concurrent refreshes of one session race on the rotation
+ROTATION_RETRIES = 3
+
+# Outcomes of SessionStore.rotate
+SESSION_ROTATED = "rotated"
+# Previous secret inside the grace window: access token only, no new refresh token
+SESSION_GRACE = "grace"
+SESSION_INVALID = "invalid"
+SESSION_REUSED = "reused"
+
+
+def _hash_secret(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _split_token(refresh_token: str) -> Tuple[Optional[str], Optional[str]]:
+    session_id, _, secret = refresh_token.partition(".")
+    if not session_id or not secret:
+        return None, None
+    return session_id, secret
+
+
+class SessionStore:
+    def __init__(self, db, lifetime: timedelta = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+                 reuse_grace: timedelta = timedelta(seconds=REFRESH_TOKEN_REUSE_GRACE_SECONDS)):
+        self.db = db
+        self.lifetime = lifetime
+        self.reuse_grace = reuse_grace
+
+    async def create(self, user_id: str, user_agent: Optional[str] = None, ip: Optional[str] = None) -> str:
+        """Open a session for a freshly authenticated device; returns its refresh token"""
+        now = datetime.utcnow()
+        session_id = str(uuid.uuid4())
+        secret = secrets.token_urlsafe(32)
+        await self.db.sessions.insert_one({
+            "id": session_id,
+            "user_id": user_id,
+            "token_hash": _hash_secret(secret),
+            "previous_hash": None,
+            "rotated_at": None,
+            "generation": 0,
+            "user_agent": user_agent,
+            "ip": ip,
+            "created_at": now,
+            "last_used_at": now,
+            "expires_at": now + self.lifetime,
+            "revoked": False,
+        })
+        return f"{session_id}.{secret}"
+
+    async def rotate(self, refresh_token: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Swap a refresh token for its successor; returns (outcome, user id, new refresh token).
+
+        The new refresh token is None for ``SESSION_GRACE``.
+        """
+        session_id, secret = _split_token(refresh_token)
+        if session_id is None:
+            return SESSION_INVALID, None, None
+        presented_hash = _hash_secret(secret)
+
+        for _ in range(ROTATION_RETRIES):
+            now = datetime.utcnow()
+            session = await self.db.sessions.find_one({"id": session_id}, {"_id": 0})
+            if session is None or session["revoked"] or session["expires_at"] <= now:
+                return SESSION_INVALID, None, None
+
+            # Two tabs refreshing at once: the one holding the previous secret gets
+            # an access token, and the secret isn't rotated again under the other tab
+            in_grace = (
+                presented_hash == session["previous_hash"]
+                and session["rotated_at"] is not None
+                and now - session["rotated_at"] <= self.reuse_grace
+            )
+            if in_grace:
+                return SESSION_GRACE, session["user_id"], None
+            if presented_hash != session["token_hash"]:
+                await self.revoke(session_id, reason="reuse")
+                logger.warning(f"Refresh token reuse on session {session_id}; session revoked")
+                return SESSION_REUSED, session["user_id"], None
+
+            new_secret = secrets.token_urlsafe(32)
+            # Compare-and-set on the current hash so racing refreshes can't both win
+            result = await self.db.sessions.update_one(
+                {"id": session_id, "token_hash": session["token_hash"], "revoked": False},
+                {
+                    "$set": {
+                        "token_hash": _hash_secret(new_secret),
+                        "previous_hash": session["token_hash"],
+                        "rotated_at": now,
+                        "last_used_at": now,
+                    },
+                    "$inc": {"generation": 1},
+                },
+            )
+            if result.modified_count == 1:
+                return SESSION_ROTATED, session["user_id"], f"{session_id}.{new_secret}"
+        return SESSION_INVALID, None, None
+
+    async def revoke(self, session_id: str, user_id: Optional[str] = None, reason: str = "logout") -> bool:
+        query: Dict[str, Any] = {"id": session_id, "revoked": False}
+        if user_id is not None:
+            query["user_id"] = user_id
+        result = await self.db.sessions.update_one(
+            query, {"$set": {"revoked": True, "revoked_at": datetime.utcnow(), "revoked_reason": reason}}
+        )
+        return result.modified_count == 1
+
+    async def revoke_token(self, refresh_token: str) -> bool:
+        """Revoke the session ``refresh_token`` belongs to, only if its secret is one ``rotate`` would accept"""
+        session_id, secret = _split_token(refresh_token)
+        if session_id is None:
+            return False
+        presented_hash = _hash_secret(secret)
+        now = datetime.utcnow()
+        result = await self.db.sessions.update_one(
+            {
+                "id": session_id,
+                "revoked": False,
+                "$or": [
+                    {"token_hash": presented_hash},
+                    {"previous_hash": presented_hash, "rotated_at": {"$gte": now - self.reuse_grace}},
+                ],
+            },
+            {"$set": {"revoked": True, "revoked_at": now, "revoked_reason": "logout"}},
+        )
+        return result.modified_count == 1
+
+    async def revoke_users(self, user_ids: List[str], reason: str = "revoked") -> int:
+        result = await self.db.sessions.update_many(
+            {"user_id": {"$in": user_ids}, "revoked": False},
+            {"$set": {"revoked": True, "revoked_at": datetime.utcnow(), "revoked_reason": reason}},
+        )
+        return result.modified_count
+
+    async def list_active(self, user_id: str) -> List[Dict[str, Any]]:
+        cursor = self.db.sessions.find(
+            {"user_id": user_id, "revoked": False, "expires_at": {"$gt": datetime.utcnow()}},
+            {"_id": 0, "id": 1, "user_agent": 1, "ip": 1, "created_at": 1, "last_used_at": 1, "expires_at": 1},
+        ).sort("last_used_at", -1)
+        return await cursor.to_list(100)
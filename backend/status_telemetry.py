@@ -0,0 +1,177 @@
+"""Write-behind ingestion and per-minute rollups for status-check heartbeats."""
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+STATUS_FLUSH_SECONDS = float(os.environ.get('STATUS_FLUSH_SECONDS', 1.0))
+STATUS_FLUSH_BATCH_SIZE = int(os.environ.get('STATUS_FLUSH_BATCH_SIZE', 1000))
+STATUS_MAX_PENDING = int(os.environ.get('STATUS_MAX_PENDING', 50000))
+# Unset keeps raw checks forever; deleting history is an operator's call
+STATUS_RAW_RETENTION_DAYS = int(os.environ.get('STATUS_RAW_RETENTION_DAYS') or 0) or None
+
+
+def minute_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(second=0, microsecond=0)
+
+
+class StatusTelemetry:
+    def __init__(
+        self,
+        db,
+        flush_seconds: float = STATUS_FLUSH_SECONDS,
+        batch_size: int = STATUS_FLUSH_BATCH_SIZE,
+        max_pending: int = STATUS_MAX_PENDING,
+    ):
+        self.db = db
+        self.flush_seconds = flush_seconds
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max_pending
+        self.flushed = 0
+        self.rejected = 0
+        self.bucket_failures = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info("Status telemetry buffer started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Whatever is still buffered goes out before the client closes
+        await self.flush()
+
+    def record(self, status_check: Dict[str, Any]):
+        if self._task is None:
+            raise RuntimeError("Status telemetry is not running")
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Status ingestion is busy, please retry shortly",
+                headers={"Retry-After": str(max(1, round(self.flush_seconds)))},
+            )
+        self._pending.append(status_check)
+        if len(self._pending) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            while self._pending:
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        buckets: Dict[Tuple[str, datetime], List[Any]] = {}
+        for check in batch:
+            key = (check["client_name"], minute_bucket(check["timestamp"]))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [1, check["timestamp"], check["timestamp"]]
+            else:
+                bucket[0] += 1
+                bucket[1] = min(bucket[1], check["timestamp"])
+                bucket[2] = max(bucket[2], check["timestamp"])
+
+        try:
+            await self.db.status_checks.insert_many(batch, ordered=False)
+        except Exception as e:
+            # Dropped rather than retried forever; heartbeats are periodic anyway
+            logger.error(f"Status telemetry flush of {len(batch)} checks failed: {e}")
+            return
+
+        # The raw checks are stored now, so the buckets must follow or the
+        # summaries undercount them; one retry covers a transient failure
+        requests = [
+            UpdateOne(
+                {"client_name": client_name, "minute": minute},
+                {"$inc": {"count": count}, "$min": {"first_seen": first_seen}, "$max": {"last_seen": last_seen}},
+                upsert=True,
+            )
+            for (client_name, minute), (count, first_seen, last_seen) in buckets.items()
+        ]
+        for _ in range(2):
+            try:
+                await self.db.status_minutes.bulk_write(requests, ordered=False)
+                break
+            except BulkWriteError as e:
+                # Unordered, so the rest were applied; only the failed upserts
+                # go round again, or $inc would count them twice
+                failed = {write_error["index"] for write_error in e.details.get("writeErrors", [])}
+                requests = [request for index, request in enumerate(requests) if index in failed]
+                if not requests:
+                    break
+                error = e
+            except Exception as e:
+                error = e
+        else:
+            self.bucket_failures += 1
+            logger.error(f"Status telemetry stored {len(batch)} checks but not their minute buckets: {error}")
+        self.flushed += len(batch)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    async def summary(self, since: datetime, until: datetime, client_name: Optional[str] = None) -> Dict[str, Any]:
+        match: Dict[str, Any] = {"minute": {"$gte": minute_bucket(since), "$lte": until}}
+        if client_name is not None:
+            match["client_name"] = client_name
+        cursor = self.db.status_minutes.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": "$client_name",
+                "checks": {"$sum": "$count"},
+                "active_minutes": {"$sum": 1},
+                "first_seen": {"$min": "$first_seen"},
+                "last_seen": {"$max": "$last_seen"},
+            }},
+            {"$sort": {"last_seen": -1}},
+        ])
+        clients = [
+            {"client_name": row.pop("_id"), **row}
+            async for row in cursor
+        ]
+        return {
+            "since": since,
+            "until": until,
+            "total_checks": sum(client["checks"] for client in clients),
+            "clients": clients,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "rejected": self.rejected,
+            "bucket_failures": self.bucket_failures,
+        }
@@ -0,0 +1,53 @@
+"""Shared fixtures: an in-memory MongoDB (mongomock-motor), the app on top of it, and anyio on asyncio.
+
+Run from the backend directory with ``python -m pytest -q``; the modules
+under test are imported from there as top-level modules, as server.py does.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Read at import time by server.py and the modules it pulls in
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("JWT_ALLOW_UNENCRYPTED_KEYS", "true")
+os.environ.setdefault("MONGO_MIN_POOL_SIZE", "0")
+os.environ.setdefault("MONGO_INDEX_SELF_CHECK", "false")
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["test"]
+
+
+@pytest.fixture
+async def client(db, monkeypatch):
+    """The app, lifespan included, on the in-memory database"""
+    import database
+    import httpx
+    import server
+    from bootstrap import AdminBootstrap
+    from rate_limit import InMemoryRateLimiter
+    from token_versions import TokenVersionMap
+
+    monkeypatch.setattr(database, "AsyncIOMotorClient", lambda *args, **kwargs: db.client)
+    monkeypatch.setattr(server, "rate_limiter", InMemoryRateLimiter())
+    # Each test's first registration becomes the admin
+    monkeypatch.setattr(server, "admin_bootstrap", AdminBootstrap(server.db))
+    monkeypatch.setattr(server, "token_versions", TokenVersionMap(server.db, server.token_versions.max_token_lifetime))
+    server.principal_cache.clear()
+    async with server.lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
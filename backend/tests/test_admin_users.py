@@ -0,0 +1,52 @@
+import orjson
+import pytest
+
+from tests.test_auth_api import bearer, register
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def admin(client, db):
+    tokens = await register(client, "admin@example.com")
+    await db.users.insert_many([
+        {"id": f"user-{index:02d}", "email": f"user{index}@example.com", "hashed_password": "hash", "is_active": True}
+        for index in range(7)
+    ])
+    return bearer(tokens["access_token"])
+
+
+async def test_pages_follow_the_next_cursor_over_every_user(client, db, admin):
+    seen, url = [], "/api/admin/users?limit=3"
+    while url:
+        response = await client.get(url, headers=admin)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 3
+        assert all("hashed_password" not in user for user in page)
+        seen.extend(user["id"] for user in page)
+        next_after = response.headers.get("X-Next-After")
+        url = f"/api/admin/users?after={next_after}&limit=3" if next_after else None
+
+    all_ids = sorted([user["id"] async for user in db.users.find({}, {"id": 1})])
+    assert seen == all_ids
+
+
+async def test_last_page_has_no_next_link(client, admin):
+    response = await client.get("/api/admin/users?after=user-04&limit=10", headers=admin)
+    assert [user["id"] for user in response.json()] == ["user-05", "user-06"]
+    assert "X-Next-After" not in response.headers and "Link" not in response.headers
+
+
+async def test_ndjson_streams_one_user_per_line(client, admin):
+    response = await client.get("/api/admin/users?format=ndjson&after=user-01&limit=3", headers=admin)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [orjson.loads(line) for line in response.text.splitlines()]
+    assert [user["id"] for user in lines] == ["user-02", "user-03", "user-04"]
+
+    response = await client.get("/api/admin/users?format=ndjson", headers=admin)
+    assert len(response.text.splitlines()) == 8
+
+
+async def test_page_size_is_capped(client, admin):
+    assert (await client.get("/api/admin/users?limit=1001", headers=admin)).status_code == 422
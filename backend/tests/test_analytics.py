@@ -0,0 +1,162 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from analytics import (
+    APPLICATIONS_SUBMITTED, LOGIN_FAILURES, LOGINS, MFA_SENT_EMAIL, MFA_VERIFIED, REGISTRATIONS,
+    AnalyticsRollups, day_bucket, hour_bucket,
+)
+
+pytestmark = pytest.mark.anyio
+
+HOUR = hour_bucket(datetime.utcnow() - timedelta(hours=3))
+
+
+async def rollup(db, collection, bucket):
+    doc = await db[collection].find_one({"_id": bucket})
+    return doc["counts"] if doc else {}
+
+
+async def seed_live(db, counts):
+    """Counts a live flush already wrote for HOUR"""
+    rollups = AnalyticsRollups(db)
+    rollups._pending = {HOUR: Counter(counts)}
+    rollups._pending_daily = {day_bucket(HOUR): Counter(counts)}
+    await rollups.flush()
+
+
+async def add_users(db, count, at=HOUR):
+    await db.users.insert_many([
+        {"id": f"u{at:%H}-{index}", "created_at": at + timedelta(minutes=index)} for index in range(count)
+    ])
+
+
+async def test_flush_and_summary(db):
+    rollups = AnalyticsRollups(db)
+    for counter, count in [(LOGINS, 3), (LOGIN_FAILURES, 1), (MFA_SENT_EMAIL, 4), (MFA_VERIFIED, 2)]:
+        rollups.record(counter, count)
+    rollups.record(APPLICATIONS_SUBMITTED, 4)
+    rollups.record("applications_reviewing", 1)
+    await rollups.flush()
+    await rollups.flush()
+
+    now = datetime.utcnow()
+    assert (await rollup(db, "analytics_daily", day_bucket(now)))[LOGINS] == 3
+    summary = await rollups.summary(now - timedelta(hours=1), now + timedelta(hours=1), "hour")
+    assert summary["rates"] == {"login_success_rate": 75.0, "mfa_verify_success_rate": 100.0, "mfa_completion_rate": 50.0}
+    assert [stage["count"] for stage in summary["funnel"]] == [4, 1, 0, 0]
+    assert summary["funnel"][1]["conversion_rate"] == 25.0
+
+
+class FailsOnce:
+    """A collection whose next ``bulk_write`` raises"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.failed = False
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, requests, ordered=True):
+        if not self.failed:
+            self.failed = True
+            raise ConnectionError("primary stepped down")
+        return await self.collection.bulk_write(requests, ordered=ordered)
+
+
+class Database:
+    def __init__(self, db, **collections):
+        self.db = db
+        self.collections = collections
+
+    def __getattr__(self, name):
+        return self.collections.get(name) or self.db[name]
+
+
+@pytest.mark.parametrize("failing", ["analytics_hourly", "analytics_daily"])
+async def test_partial_flush_failure_never_double_counts(db, failing):
+    rollups = AnalyticsRollups(Database(db, **{failing: FailsOnce(db[failing])}))
+    for _ in range(5):
+        rollups.record(LOGINS)
+    await rollups.flush()
+    assert rollups.snapshot()["flushes"] == 0
+    await rollups.flush()
+    await rollups.flush()
+
+    for collection in ("analytics_hourly", "analytics_daily"):
+        assert sum([doc["counts"][LOGINS] async for doc in db[collection].find({})]) == 5
+    assert rollups.snapshot()["flushes"] == 1
+
+
+async def test_backfill_fills_hours_with_no_rollup(db):
+    await add_users(db, 3)
+    await db.applications.insert_one({"id": "a1", "created_at": HOUR + timedelta(minutes=5)})
+    await AnalyticsRollups(db).backfill()
+
+    assert await rollup(db, "analytics_hourly", HOUR) == {REGISTRATIONS: 3, APPLICATIONS_SUBMITTED: 1}
+    assert await rollup(db, "analytics_daily", day_bucket(HOUR)) == {REGISTRATIONS: 3, APPLICATIONS_SUBMITTED: 1}
+
+
+async def test_backfill_never_lowers_live_counts(db):
+    # Live counts higher than the documents show, e.g. after users were deleted
+    await seed_live(db, {REGISTRATIONS: 10, LOGINS: 7, MFA_VERIFIED: 4})
+    await add_users(db, 3)
+    await AnalyticsRollups(db).backfill()
+
+    expected = {REGISTRATIONS: 10, LOGINS: 7, MFA_VERIFIED: 4}
+    assert await rollup(db, "analytics_hourly", HOUR) == expected
+    assert await rollup(db, "analytics_daily", day_bucket(HOUR)) == expected
+
+
+async def test_backfill_raises_partial_live_counts_and_is_idempotent(db):
+    # Deployed mid-hour: only the last registration was counted live
+    await seed_live(db, {REGISTRATIONS: 1})
+    await add_users(db, 4)
+    rollups = AnalyticsRollups(db)
+    await rollups.backfill()
+    await rollups.backfill()
+
+    assert (await rollup(db, "analytics_hourly", HOUR))[REGISTRATIONS] == 4
+    assert (await rollup(db, "analytics_daily", day_bucket(HOUR)))[REGISTRATIONS] == 4
+    assert rollups.backfill_state["status"] == "done"
+
+
+async def test_backfill_leaves_mfa_and_stage_counters_alone(db):
+    await seed_live(db, {MFA_SENT_EMAIL: 1})
+    await db.mfa_verifications.insert_many([
+        {"method": "email", "verified": True, "created_at": HOUR + timedelta(minutes=index)} for index in range(5)
+    ])
+    await db.applications.insert_one(
+        {"id": "a1", "status": "Approved", "created_at": HOUR, "updated_at": HOUR + timedelta(minutes=1)}
+    )
+    await AnalyticsRollups(db).backfill()
+
+    assert await rollup(db, "analytics_hourly", HOUR) == {MFA_SENT_EMAIL: 1, APPLICATIONS_SUBMITTED: 1}
+
+
+async def test_backfill_skips_the_current_hour_and_respects_since(db):
+    await add_users(db, 2, at=hour_bucket(datetime.utcnow()))
+    await add_users(db, 2, at=HOUR - timedelta(days=2))
+    await add_users(db, 1)
+    await AnalyticsRollups(db).backfill(since=HOUR - timedelta(days=1))
+
+    assert [doc["_id"] async for doc in db.analytics_hourly.find({})] == [HOUR]
+
+
+async def test_get_analytics_accepts_timezone_aware_bounds(db, monkeypatch):
+    await seed_live(db, {LOGINS: 2})
+    monkeypatch.setattr(server, "analytics_rollups", AnalyticsRollups(db))
+    admin = server.Principal("admin-1", "admin@example.com", True)
+    plus_two = timezone(timedelta(hours=2))
+
+    response = await server.get_analytics(
+        since=(HOUR - timedelta(hours=1)).replace(tzinfo=timezone.utc).astimezone(plus_two),
+        until=datetime.now(timezone.utc),
+        granularity=None,
+        admin_user=admin,
+    )
+    assert response.status_code == 200
+    assert b'"logins":2' in response.body
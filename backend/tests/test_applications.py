@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from applications import (
+    SYNC_CLAIMED, SYNC_DEAD, SYNC_PENDING, SYNC_RETRYING, SYNCED,
+    AirtableError, ApplicationPipeline, LocalAirtable, create_application_pipeline,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def application(index):
+    return {
+        "first_name": "Ada",
+        "last_name": f"Investor{index}",
+        "email": f"investor{index}@example.com",
+        "investment_capacity": "100k-250k",
+        "accredited_status": "yes",
+        "source": "website",
+    }
+
+
+class RateLimitedAirtable(LocalAirtable):
+    async def upsert(self, records):
+        self.requests += 1
+        raise AirtableError("rate limited", retry_after=30)
+
+
+async def submit_all(pipeline, count):
+    # submit() wakes the worker; tests drive sync_once() by hand instead
+    pipeline._wake = asyncio.Event()
+    return [(await pipeline.submit(application(index)))[0] for index in range(count)]
+
+
+async def states(db):
+    return sorted([doc["sync_status"] async for doc in db.applications.find({}, {"sync_status": 1})])
+
+
+async def test_resubmitting_returns_the_original(db):
+    pipeline = ApplicationPipeline(db, LocalAirtable())
+    pipeline._wake = asyncio.Event()
+    first, created = await pipeline.submit(application(0))
+    again, created_again = await pipeline.submit(application(0))
+    assert (created, created_again) == (True, False)
+    assert again["id"] == first["id"]
+    assert await db.applications.count_documents({}) == 1
+
+
+async def test_syncs_in_batches_of_the_airtable_limit(db):
+    airtable = LocalAirtable()
+    pipeline = ApplicationPipeline(db, airtable)
+    await submit_all(pipeline, 25)
+
+    claimed = [await pipeline.sync_once() for _ in range(4)]
+    assert claimed == [10, 10, 5, 0]
+    assert airtable.requests == 3
+    assert len(airtable.records) == 25
+    async for doc in db.applications.find({}):
+        assert doc["sync_status"] == SYNCED
+        assert doc["airtable_record_id"] == airtable.records[doc["id"]]["id"]
+        assert "sync_claim" not in doc
+
+
+async def test_claims_are_exclusive_until_the_lease_runs_out(db):
+    pipeline = ApplicationPipeline(db, LocalAirtable(), batch_size=3)
+    await submit_all(pipeline, 5)
+
+    first = await pipeline._claim()
+    second = await pipeline._claim()
+    assert len(first) == 3 and len(second) == 2
+    assert not {doc["id"] for doc in first} & {doc["id"] for doc in second}
+    assert await pipeline._claim() == []
+    assert await states(db) == [SYNC_CLAIMED] * 5
+
+    # A worker that died holding a claim gives it up when the lease expires
+    await db.applications.update_many({}, {"$set": {"next_sync_at": datetime.utcnow() - timedelta(seconds=1)}})
+    assert len(await pipeline._claim()) == 3
+
+
+async def test_failed_batch_backs_off_then_syncs(db):
+    airtable = LocalAirtable(failure_rate=1.0)
+    pipeline = ApplicationPipeline(db, airtable, backoff_seconds=60)
+    await submit_all(pipeline, 2)
+
+    assert await pipeline.sync_once() == 2
+    assert await states(db) == [SYNC_RETRYING] * 2
+    doc = await db.applications.find_one({})
+    assert doc["sync_attempts"] == 1
+    assert "simulated outage" in doc["last_sync_error"]
+    assert doc["next_sync_at"] > datetime.utcnow() + timedelta(seconds=50)
+    # Not due yet
+    assert await pipeline.sync_once() == 0
+
+    airtable.failure_rate = 0.0
+    await db.applications.update_many({}, {"$set": {"next_sync_at": datetime.utcnow()}})
+    assert await pipeline.sync_once() == 2
+    assert await states(db) == [SYNCED] * 2
+    assert (await db.applications.find_one({}))["sync_attempts"] == 2
+
+
+async def test_rate_limit_waits_as_airtable_asks(db):
+    pipeline = ApplicationPipeline(db, RateLimitedAirtable(), backoff_seconds=1)
+    await submit_all(pipeline, 1)
+    await pipeline.sync_once()
+    doc = await db.applications.find_one({})
+    assert doc["next_sync_at"] > datetime.utcnow() + timedelta(seconds=25)
+
+
+async def test_dead_letters_after_max_attempts(db):
+    pipeline = ApplicationPipeline(db, LocalAirtable(failure_rate=1.0), max_attempts=3, backoff_seconds=0)
+    await submit_all(pipeline, 1)
+
+    for _ in range(3):
+        await db.applications.update_many({}, {"$set": {"next_sync_at": datetime.utcnow()}})
+        await pipeline.sync_once()
+    doc = await db.applications.find_one({})
+    assert doc["sync_status"] == SYNC_DEAD
+    assert doc["sync_attempts"] == 3
+    assert "next_sync_at" not in doc
+    assert pipeline.snapshot()["dead"] == 1
+    assert await pipeline.sync_once() == 0
+
+
+async def test_edit_during_upload_stays_queued(db):
+    pipeline = ApplicationPipeline(db, LocalAirtable())
+    [stored] = await submit_all(pipeline, 1)
+
+    class EditingAirtable(LocalAirtable):
+        async def upsert(self, records):
+            await pipeline.requeue(stored["id"])
+            return await super().upsert(records)
+
+    pipeline.airtable = EditingAirtable()
+    await pipeline.sync_once()
+    assert await states(db) == [SYNC_PENDING]
+
+
+async def test_without_a_backend_records_stay_pending(db, monkeypatch):
+    monkeypatch.delenv("AIRTABLE_BACKEND", raising=False)
+    monkeypatch.delenv("AIRTABLE_API_KEY", raising=False)
+    pipeline = create_application_pipeline(db)
+    assert pipeline.airtable is None
+
+    pipeline.max_backlog = 1
+    await pipeline.start()
+    await pipeline.submit(application(0))
+    await pipeline.submit(application(1))
+    assert await pipeline.sync_once() == 0
+    await pipeline.stop()
+
+    assert await states(db) == [SYNC_PENDING] * 2
+    assert pipeline.snapshot()["backend"] is None
+
+
+async def test_local_backend_is_opt_in(db, monkeypatch):
+    monkeypatch.setenv("AIRTABLE_BACKEND", "local")
+    assert isinstance(create_application_pipeline(db).airtable, LocalAirtable)
+    monkeypatch.setenv("AIRTABLE_BACKEND", "carrier-pigeon")
+    with pytest.raises(ValueError):
+        create_application_pipeline(db)
+
+
+async def test_submission_returns_the_server_side_score(client):
+    application = {
+        "first_name": "Rosa", "last_name": "Diaz", "email": "rosa@example.com",
+        "investment_capacity": "1000000+", "accredited_status": "yes", "source": "referral",
+    }
+    response = await client.post("/api/applications", json=application)
+    assert response.status_code == 202
+    body = response.json()
+    assert (body["lead_score"], body["priority"]) == (150, "Immediate")
+
+    duplicate = await client.post("/api/applications", json=application)
+    assert duplicate.status_code == 200
+    assert duplicate.json()["duplicate"] and duplicate.json()["lead_score"] == 150
@@ -0,0 +1,59 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def register(client, email, password="s3cret-pass", phone_number=None):
+    response = await client.post("/api/auth/register", json={
+        "email": email, "password": password, "phone_number": phone_number,
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def login_code(db, email):
+    verification = await db.mfa_verifications.find_one({"email": email, "purpose": "login"}, sort=[("created_at", -1)])
+    return verification["code"]
+
+
+async def test_mixed_case_email_signs_in_through_mfa(client, db):
+    tokens = await register(client, "Alice@Example.com")
+    assert (await client.get("/api/auth/me", headers=bearer(tokens["access_token"]))).json()["email"] == "alice@example.com"
+
+    response = await client.post("/api/auth/login", json={"email": "ALICE@example.com", "password": "s3cret-pass"})
+    assert response.status_code == 200
+    assert (await client.post("/api/mfa/send-code", json={"email": "Alice@Example.com", "method": "email"})).status_code == 200
+
+    response = await client.post("/api/mfa/verify-code", json={
+        "email": "alice@example.com", "code": await login_code(db, "alice@example.com"),
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()["refresh_token"]
+
+
+async def test_email_registered_in_another_case_is_taken(client):
+    await register(client, "bob@example.com")
+    response = await client.post("/api/auth/register", json={"email": "Bob@Example.com", "password": "x"})
+    assert response.status_code == 400
+
+
+async def test_verified_code_for_a_missing_account_is_refused(client, db):
+    await register(client, "carol@example.com")
+    await client.post("/api/mfa/send-code", json={"email": "carol@example.com", "method": "email"})
+    code = await login_code(db, "carol@example.com")
+    await db.users.delete_one({"email": "carol@example.com"})
+
+    response = await client.post("/api/mfa/verify-code", json={"email": "carol@example.com", "code": code})
+    assert response.status_code == 401
+
+
+async def test_logout_with_a_forged_secret_is_rejected(client):
+    tokens = await register(client, "dave@example.com")
+    session_id = tokens["refresh_token"].partition(".")[0]
+
+    assert (await client.post("/api/auth/logout", json={"refresh_token": f"{session_id}.forged"})).status_code == 401
+    assert (await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).status_code == 200
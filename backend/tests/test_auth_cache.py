@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+import server
+from auth_cache import PrincipalCache
+from tests.test_auth_api import bearer, register
+
+pytestmark = pytest.mark.anyio
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = PrincipalCache(ttl_seconds=30)
+    cache.put("token", "u1", "principal")
+
+    now[0] += 29
+    assert cache.get("token") == "principal"
+    now[0] += 2
+    assert cache.get("token") is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_entries_never_outlive_the_token():
+    cache = PrincipalCache(ttl_seconds=30)
+    cache.put("expired", "u1", "principal", token_exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache.put("expiring", "u1", "principal", token_exp=time.time() + 5)
+    assert cache._entries["expiring"][0] <= time.monotonic() + 5
+
+
+def test_least_recently_used_entries_go_first():
+    cache = PrincipalCache(ttl_seconds=30, max_entries=2)
+    cache.put("a", "u1", "A")
+    cache.put("b", "u2", "B")
+    cache.get("a")
+    cache.put("c", "u3", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_invalidate_user_drops_every_token_of_that_user():
+    cache = PrincipalCache(ttl_seconds=30)
+    cache.put("laptop", "u1", "principal")
+    cache.put("phone", "u1", "principal")
+    cache.put("other", "u2", "principal")
+
+    cache.invalidate_user("u1")
+    assert cache.get("laptop") is None and cache.get("phone") is None
+    assert cache.get("other") == "principal"
+
+
+async def cached_me(client, headers):
+    """Load the principal into the cache and check the second read is a hit"""
+    await client.get("/api/auth/me", headers=headers)
+    hits = server.principal_cache.hits
+    response = await client.get("/api/auth/me", headers=headers)
+    assert server.principal_cache.hits == hits + 1
+    return response.json()
+
+
+async def test_settings_change_evicts_before_the_ttl(client):
+    headers = bearer((await register(client, "mia@example.com"))["access_token"])
+    assert (await cached_me(client, headers))["mfa_enabled"] is False
+
+    await client.put("/api/user/settings", headers=headers, json={"mfa_enabled": True, "mfa_method": "sms", "phone_number": "+15550100"})
+    me = (await client.get("/api/auth/me", headers=headers)).json()
+    assert (me["mfa_enabled"], me["mfa_method"], me["phone_number"]) == (True, "sms", "+15550100")
+
+
+async def test_deactivation_evicts_before_the_ttl(client, db):
+    admin = bearer((await register(client, "admin@example.com"))["access_token"])
+    headers = bearer((await register(client, "ned@example.com"))["access_token"])
+    await cached_me(client, headers)
+
+    response = await client.post("/api/admin/users/bulk", headers=admin, json={
+        "operations": [{"email": "ned@example.com", "action": "deactivate"}],
+    })
+    assert response.json()["modified"] == 1
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
+
+
+async def test_token_revocation_evicts_before_the_ttl(client, db):
+    admin = bearer((await register(client, "admin@example.com"))["access_token"])
+    headers = bearer((await register(client, "olga@example.com"))["access_token"])
+    await cached_me(client, headers)
+    user_id = (await db.users.find_one({"email": "olga@example.com"}))["id"]
+
+    assert (await client.post(f"/api/admin/users/{user_id}/revoke-tokens", headers=admin)).status_code == 200
+    assert (await client.get("/api/auth/me", headers=headers)).status_code == 401
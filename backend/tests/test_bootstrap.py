@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import server
+from bootstrap import BOOTSTRAP_ID, AdminBootstrap
+from tests.test_auth_api import register
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_only_the_first_claim_wins(db):
+    bootstrap = AdminBootstrap(db)
+    assert await bootstrap.claim("first")
+    assert not await bootstrap.claim("second")
+    # Another worker, which has not seen the claim yet
+    assert not await AdminBootstrap(db).claim("third")
+    assert (await db.app_settings.find_one({"_id": BOOTSTRAP_ID}))["admin_user_id"] == "first"
+
+
+async def test_concurrent_claims_from_several_workers(db):
+    workers = [AdminBootstrap(db) for _ in range(8)]
+    results = await asyncio.gather(*(worker.claim(f"user-{index}") for index, worker in enumerate(workers)))
+    assert results.count(True) == 1
+
+
+class RacingAppSettings:
+    """Another worker's upsert lands first, so ours hits the _id index"""
+
+    async def update_one(self, *args, **kwargs):
+        raise DuplicateKeyError("E11000 duplicate key error")
+
+
+class RacingDatabase:
+    app_settings = RacingAppSettings()
+
+
+async def test_losing_an_upsert_race_is_not_a_win():
+    bootstrap = AdminBootstrap(RacingDatabase())
+    assert not await bootstrap.claim("user-1")
+    assert not await bootstrap.claim("user-2")
+
+
+async def test_release_hands_the_claim_to_the_next_signup(db):
+    bootstrap = AdminBootstrap(db)
+    assert await bootstrap.claim("failed-insert")
+    await bootstrap.release("someone-else")
+    assert not await bootstrap.claim("next")
+
+    await bootstrap.release("failed-insert")
+    assert await bootstrap.claim("next")
+
+
+async def test_reconcile_marks_existing_deployments_claimed(db):
+    await db.users.insert_one({"id": "old-admin", "email": "old@example.com", "is_admin": True})
+    bootstrap = AdminBootstrap(db)
+    await bootstrap.reconcile()
+    assert not await bootstrap.claim("new")
+    assert (await db.app_settings.find_one({"_id": BOOTSTRAP_ID}))["admin_user_id"] == "old-admin"
+
+
+async def test_reconcile_leaves_an_empty_database_unclaimed(db):
+    bootstrap = AdminBootstrap(db)
+    await bootstrap.reconcile()
+    assert await bootstrap.claim("first")
+
+
+async def test_registration_that_fails_to_insert_releases_the_claim(client, db, monkeypatch):
+    # A concurrent signup for the same email gets in between the lookup and the insert
+    async def not_found(email, projection):
+        return None
+
+    monkeypatch.setattr(server, "find_user_by_email", not_found)
+    await db.users.insert_one({"id": "racer", "email": "race@example.com"})
+
+    response = await client.post("/api/auth/register", json={"email": "race@example.com", "password": "pass"})
+    assert response.status_code == 400
+    assert await db.app_settings.find_one({"_id": BOOTSTRAP_ID}) is None
+
+    await register(client, "next@example.com")
+    assert (await db.users.find_one({"email": "next@example.com"}))["is_admin"]
@@ -0,0 +1,25 @@
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+from indexes import ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_mfa_lookup_index_leads_with_email_and_purpose(db):
+    await ensure_indexes(db)
+    index = (await db.mfa_verifications.index_information())["email_purpose_verified_created_at"]
+    assert list(index["key"]) == [
+        ("email", ASCENDING), ("purpose", ASCENDING), ("verified", ASCENDING),
+        ("created_at", DESCENDING), ("expires_at", ASCENDING),
+    ]
+
+
+async def test_superseded_mfa_index_is_dropped(db):
+    await db.mfa_verifications.create_index(
+        [("email", ASCENDING), ("verified", ASCENDING), ("created_at", DESCENDING), ("expires_at", ASCENDING)],
+        name="email_verified_created_at",
+    )
+    await ensure_indexes(db)
+    await ensure_indexes(db)
+    assert "email_verified_created_at" not in await db.mfa_verifications.index_information()
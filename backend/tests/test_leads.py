@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from applications import ApplicationPipeline
+from leads import (
+    LEAD_LIST_FIELDS, LEAD_SORTS, decode_lead_cursor, encode_lead_cursor, lead_fields, lead_query, update_lead,
+)
+from server import LeadUpdate
+
+pytestmark = pytest.mark.anyio
+
+CAPACITIES = ["25000-50000", "50000-100000", "100000-250000", "250000-500000", "1000000+"]
+NOW = datetime(2026, 3, 2, 12, 0, 0, 123000)
+
+
+def make_lead(index):
+    application = {
+        "id": f"lead-{index:03d}",
+        "first_name": "Ada",
+        "last_name": f"Lovelace{index}",
+        "email": f"ada.{index}@example.com",
+        "investment_capacity": CAPACITIES[index % len(CAPACITIES)],
+        "accredited_status": "yes" if index % 2 else "no",
+        "source": "website",
+        "status": "New Application",
+        "follow_up_required": True,
+        # Every third lead shares a timestamp, so the id has to break ties
+        "created_at": NOW - timedelta(minutes=index // 3),
+    }
+    return {**application, **lead_fields(application)}
+
+
+@pytest.fixture
+async def leads(db):
+    await db.applications.insert_many([make_lead(index) for index in range(23)])
+    return db
+
+
+async def page_through(db, sort, query=None, limit=5):
+    projection = {"_id": 0, **{field: 1 for field in LEAD_LIST_FIELDS}}
+    seen, after = [], None
+    while True:
+        page_query = dict(query or {})
+        if after:
+            cursor_filter = decode_lead_cursor(after, sort)
+            page_query = {"$and": [page_query, cursor_filter]} if page_query else cursor_filter
+        page = await db.applications.find(page_query, projection).sort(
+            [(LEAD_SORTS[sort], -1), ("id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+        seen.extend(page[:limit])
+        if len(page) <= limit:
+            return seen
+        after = encode_lead_cursor(page[limit - 1], sort)
+
+
+@pytest.mark.parametrize("sort", list(LEAD_SORTS))
+async def test_cursor_pages_cover_every_lead_once_in_order(leads, sort):
+    field = LEAD_SORTS[sort]
+    seen = await page_through(leads, sort)
+    assert len(seen) == 23
+    assert len({lead["id"] for lead in seen}) == 23
+    keys = [(lead[field], lead["id"]) for lead in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def test_cursor_pages_respect_the_filter(leads):
+    seen = await page_through(leads, "score", lead_query(q="ada lovelace1"))
+    assert sorted(lead["id"] for lead in seen) == ["lead-001"] + [f"lead-{index:03d}" for index in range(10, 20)]
+
+
+def test_cursor_round_trips_microseconds():
+    lead = make_lead(0)
+    assert decode_lead_cursor(encode_lead_cursor(lead, "recent"), "recent")["$or"][0] == {"created_at": {"$lt": NOW}}
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "not-a-number|lead-001", "|"])
+def test_bad_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_lead_cursor(cursor, "score")
+
+
+def test_lead_query_shapes():
+    assert lead_query() == {}
+    assert lead_query(status="Approved") == {"status": "Approved"}
+    assert lead_query(q="Ada (Lovelace)") == {"$and": [
+        {"search_terms": {"$regex": "^ada"}},
+        {"search_terms": {"$regex": "^lovelace"}},
+    ]}
+
+
+async def test_update_lead_rescores_only_when_scoring_inputs_change(leads):
+    before = await leads.applications.find_one({"id": "lead-000"})
+    lead, previous_status = await update_lead(leads, "lead-000", {"investment_capacity": "1000000+"}, "admin")
+    assert previous_status == "New Application"
+    assert lead["lead_score"] == before["lead_score"] + 50
+    assert lead["investment_value"] == 1000000
+
+    lead, _ = await update_lead(leads, "lead-000", {"status": "Contacted"}, "admin")
+    assert (lead["status"], lead["lead_score"]) == ("Contacted", before["lead_score"] + 50)
+    assert await update_lead(leads, "missing", {"status": "Contacted"}, "admin") == (None, None)
+
+
+@pytest.fixture
+def patch_server(leads, monkeypatch):
+    pipeline = ApplicationPipeline(leads, None)
+    pipeline._wake = asyncio.Event()
+    monkeypatch.setattr(server, "db", leads)
+    monkeypatch.setattr(server, "application_pipeline", pipeline)
+    return leads
+
+
+async def patch(lead_id, body):
+    return await server.patch_lead(lead_id, LeadUpdate(**body), server.Principal("admin-1", "admin@example.com", True))
+
+
+@pytest.mark.parametrize("body", [{"investment_capacity": None}, {"status": None}, {"status": None, "follow_up_notes": None}])
+async def test_patch_lead_ignores_nulls(patch_server, body):
+    before = await patch_server.applications.find_one({"id": "lead-001"}, {"_id": 0})
+    response = await patch("lead-001", body)
+    assert response.status_code == 200
+    after = await patch_server.applications.find_one({"id": "lead-001"}, {"_id": 0})
+    assert after["status"] == before["status"] == "New Application"
+    assert after["investment_capacity"] == before["investment_capacity"]
+    assert "follow_up_notes" not in after
+
+
+async def test_patch_lead_validates_status_and_requeues_sync(patch_server):
+    with pytest.raises(HTTPException) as rejected:
+        await patch("lead-001", {"status": "Bribed"})
+    assert rejected.value.status_code == 400
+
+    await patch("lead-001", {"status": "Approved", "follow_up_notes": "Call Tuesday"})
+    after = await patch_server.applications.find_one({"id": "lead-001"})
+    assert (after["status"], after["follow_up_notes"], after["sync_status"]) == ("Approved", "Call Tuesday", "pending")
+
+    with pytest.raises(HTTPException) as missing:
+        await patch("missing", {"status": "Approved"})
+    assert missing.value.status_code == 404
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.test_auth_api import bearer, register
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2026, 1, 1, 12, 0)
+
+
+@pytest.fixture
+async def admin(client, db):
+    tokens = await register(client, "admin@example.com")
+    await db.mfa_audit.insert_many([
+        {
+            "id": f"log-{index}",
+            "email": "pat@example.com" if index % 2 else "quinn@example.com",
+            "method": "email",
+            "purpose": "login" if index < 4 else "admin",
+            "verified": index % 3 == 0,
+            "attempts": 0,
+            # log-2 and log-3 share a timestamp, so the id breaks the tie
+            "created_at": START + timedelta(minutes=min(index, 2) if index < 4 else index),
+            "expires_at": START + timedelta(minutes=10 + index),
+        }
+        for index in range(6)
+    ])
+    return bearer(tokens["access_token"])
+
+
+async def all_pages(client, admin, query):
+    ids, before = [], None
+    while True:
+        url = f"/api/admin/mfa-logs?{query}" + (f"&before={before}" if before else "")
+        response = await client.get(url, headers=admin)
+        assert response.status_code == 200
+        ids.extend(log["id"] for log in response.json())
+        before = response.headers.get("X-Next-Before")
+        if before is None:
+            return ids
+
+
+async def test_pages_run_newest_first_without_gaps(client, admin):
+    assert await all_pages(client, admin, "limit=2") == ["log-5", "log-4", "log-3", "log-2", "log-1", "log-0"]
+
+
+async def test_filters_and_time_range(client, admin):
+    assert await all_pages(client, admin, "email=Pat@Example.com&limit=1") == ["log-5", "log-3", "log-1"]
+    assert await all_pages(client, admin, "purpose=login&verified=true") == ["log-3", "log-0"]
+    since, until = (START + timedelta(minutes=1)).isoformat(), (START + timedelta(minutes=5)).isoformat()
+    assert await all_pages(client, admin, f"since={since}&until={until}") == ["log-4", "log-3", "log-2", "log-1"]
+
+
+async def test_fields_limit_the_projection(client, admin):
+    response = await client.get("/api/admin/mfa-logs?fields=email,code,hashed_password&limit=1", headers=admin)
+    assert set(response.json()[0]) == {"id", "created_at", "email"}
+
+
+async def test_invalid_cursor_is_a_bad_request(client, admin):
+    assert (await client.get("/api/admin/mfa-logs?before=garbage", headers=admin)).status_code == 400
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+
+from indexes import INDEXES
+from mfa_store import (
+    MFA_INVALID,
+    MFA_MISSING,
+    MFA_TOO_MANY_ATTEMPTS,
+    MFA_VERIFIED,
+    InMemoryMFAStore,
+    MFAStore,
+    MongoAuditSink,
+    MongoMFAStore,
+    RedisMFAStore,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def verification(code="123456", email="Investor@Example.com", minutes=10):
+    now = datetime.utcnow()
+    return {
+        "id": f"v-{code}",
+        "email": email,
+        "code": code,
+        "method": "email",
+        "purpose": "login",
+        "created_at": now,
+        "expires_at": now + timedelta(minutes=minutes),
+        "verified": False,
+        "attempts": 0,
+    }
+
+
+def make_store(backend, db, **kwargs):
+    if backend == "memory":
+        return InMemoryMFAStore(max_attempts=3, **kwargs)
+    if backend == "mongo":
+        return MongoMFAStore(db, max_attempts=3, **kwargs)
+    return RedisMFAStore(fakeredis.FakeAsyncRedis(), max_attempts=3, **kwargs)
+
+
+@pytest.fixture(params=["memory", "mongo", "redis"])
+def store(request, db):
+    return make_store(request.param, db)
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        MFAStore()
+
+
+async def test_verifies_once(store):
+    await store.save(verification())
+
+    assert await store.verify("investor@example.com", "login", "123456") == (MFA_VERIFIED, "v-123456")
+    assert (await store.verify("investor@example.com", "login", "123456"))[0] == MFA_MISSING
+
+
+async def test_email_case_is_ignored_by_every_store(store):
+    await store.save(verification(email="investor@example.com"))
+
+    assert (await store.verify("  INVESTOR@example.COM", "login", "123456"))[0] == MFA_VERIFIED
+
+
+async def test_wrong_codes_use_up_attempts(store):
+    await store.save(verification())
+
+    for _ in range(3):
+        assert (await store.verify("investor@example.com", "login", "000000"))[0] == MFA_INVALID
+    # The right code no longer helps once the attempts are spent
+    assert (await store.verify("investor@example.com", "login", "123456"))[0] == MFA_TOO_MANY_ATTEMPTS
+
+
+async def test_expired_code_is_missing(store):
+    await store.save(verification(minutes=-1))
+    # Redis keeps an already expired code for its 1 ms minimum TTL
+    await asyncio.sleep(0.01)
+
+    assert (await store.verify("investor@example.com", "login", "123456"))[0] == MFA_MISSING
+
+
+async def test_purposes_are_separate(store):
+    await store.save(verification())
+
+    assert (await store.verify("investor@example.com", "admin_access", "123456"))[0] == MFA_MISSING
+
+
+async def test_concurrent_correct_submissions_verify_once(store):
+    await store.save(verification())
+
+    outcomes = await asyncio.gather(*(store.verify("investor@example.com", "login", "123456") for _ in range(5)))
+
+    assert [outcome for outcome, _ in outcomes].count(MFA_VERIFIED) == 1
+
+
+async def test_mongo_store_marks_the_document_verified(db):
+    store = MongoMFAStore(db, max_attempts=3)
+    await store.save(verification())
+    await store.verify("investor@example.com", "login", "123456")
+
+    stored = await db.mfa_verifications.find_one({"id": "v-123456"})
+    assert stored["email"] == "investor@example.com"
+    assert stored["verified"] is True
+    assert stored["attempts"] == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "mongo", "redis"])
+async def test_audit_trail_outlives_the_code(db, backend):
+    store = make_store(backend, db, audit=MongoAuditSink(db))
+    await store.save(verification())
+    await store.verify("investor@example.com", "login", "000000")
+    await store.verify("investor@example.com", "login", "123456")
+    await store.close()
+
+    record = await db.mfa_audit.find_one({"id": "v-123456"}, {"_id": 0})
+    assert "code" not in record
+    assert (record["email"], record["verified"], record["attempts"]) == ("investor@example.com", True, 2)
+    # Nothing in mfa_audit is reaped when the code expires
+    assert all(index.document.get("expireAfterSeconds") is None for index in INDEXES["mfa_audit"])
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from notifications import DEAD, QUEUED, SENT, FakeProvider, Notification, NotificationQueue
+
+pytestmark = pytest.mark.anyio
+
+
+class BrokenProvider:
+    """Raises something other than DeliveryError, ``failures`` times"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def send_batch(self, notifications):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("connection reset")
+        return [None] * len(notifications)
+
+
+async def run_queue(db, provider, notifications, max_attempts=3):
+    queue = NotificationQueue({"email": provider}, db=db, workers=1, max_attempts=max_attempts, backoff_seconds=0)
+    await queue.start()
+    for notification in notifications:
+        queue.enqueue(notification)
+    await queue.stop()
+    return queue
+
+
+async def test_fake_provider_failure_is_retried_then_sent(db):
+    provider = FakeProvider("email", failures_per_recipient=1, latency_seconds=0)
+    await run_queue(db, provider, [Notification("v1", "email", "a@example.com", "111111")])
+
+    assert provider.delivered == [{"recipient": "a@example.com", "code": "111111"}]
+    stored = await db.notification_deliveries.find_one({"verification_id": "v1"})
+    assert stored["status"] == SENT
+    assert stored["attempts"] == 2
+    assert stored["last_error"] is None
+
+
+async def test_fake_provider_dead_letters_after_max_attempts(db):
+    provider = FakeProvider("email", failures_per_recipient=5, latency_seconds=0)
+    queue = await run_queue(db, provider, [Notification("v1", "email", "a@example.com", "111111")], max_attempts=3)
+
+    stored = await db.notification_deliveries.find_one({"verification_id": "v1"})
+    assert stored["status"] == DEAD
+    assert stored["attempts"] == 3
+    assert "simulated email outage" in stored["last_error"]
+    assert [entry["verification_id"] for entry in await queue.dead_letters()] == ["v1"]
+
+
+async def test_unexpected_provider_exception_is_retried(db):
+    provider = BrokenProvider(failures=1)
+    await run_queue(db, provider, [Notification("v1", "email", "a@example.com", "111111")])
+
+    stored = await db.notification_deliveries.find_one({"verification_id": "v1"})
+    assert stored["status"] == SENT
+    assert stored["attempts"] == 2
+
+
+async def test_unexpected_provider_exception_is_dead_lettered(db):
+    provider = BrokenProvider(failures=10)
+    await run_queue(db, provider, [Notification("v1", "email", "a@example.com", "111111")], max_attempts=2)
+
+    stored = await db.notification_deliveries.find_one({"verification_id": "v1"})
+    assert stored["status"] == DEAD
+    assert stored["last_error"] == "RuntimeError: connection reset"
+
+
+async def test_in_flight_status_is_visible_to_other_workers(db):
+    provider = FakeProvider("email", failures_per_recipient=0, latency_seconds=0.2)
+    owner = NotificationQueue({"email": provider}, db=db, workers=1)
+    other = NotificationQueue({"email": provider}, db=db, workers=1)
+    await owner.start()
+    owner.enqueue(Notification("v1", "email", "a@example.com", "111111"))
+    await owner.drain_status_writes()
+
+    assert (await other.get_status("v1"))["status"] == QUEUED
+    await owner.stop()
+    assert (await other.get_status("v1"))["status"] == SENT
+
+
+async def test_queued_write_never_overwrites_a_later_state(db):
+    provider = FakeProvider("email", failures_per_recipient=0, latency_seconds=0)
+    queue = await run_queue(db, provider, [Notification("v1", "email", "a@example.com", "111111")])
+    await queue._record_queued({"verification_id": "v1", "status": QUEUED})
+
+    assert (await db.notification_deliveries.find_one({"verification_id": "v1"}))["status"] == SENT
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException
+
+from password_hashing import PasswordHasher
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_hash_and_verify_in_the_pool(hasher):
+    await hasher.start()
+    hashed = await hasher.hash("s3cret")
+
+    assert hashed.startswith("$2b$04$")
+    assert await hasher.verify("s3cret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    assert hasher.snapshot()["verify"]["calls"] == 2
+
+
+async def test_hash_many_keeps_order(hasher):
+    passwords = [f"password-{i}" for i in range(5)]
+    hashed = await hasher.hash_many(passwords, chunk_size=2)
+
+    assert len(hashed) == 5
+    for password, digest in zip(passwords, hashed):
+        assert await hasher.verify(password, digest)
+
+
+async def test_rejects_with_retry_after_when_saturated(hasher):
+    hasher.in_flight = hasher.capacity
+
+    with pytest.raises(HTTPException) as excinfo:
+        await hasher.hash("s3cret")
+
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["Retry-After"] == "1"
+    assert hasher.rejected == 1
@@ -0,0 +1,64 @@
+import fakeredis
+import pytest
+from fastapi import HTTPException
+
+from rate_limit import InMemoryRateLimiter, RateLimiter, RedisRateLimiter, parse_rule
+
+pytestmark = pytest.mark.anyio
+
+RULES = {"login": {"ip": parse_rule("5/60"), "email": parse_rule("2/300")}}
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    if request.param == "memory":
+        return InMemoryRateLimiter(rules=RULES, enabled=True)
+    return RedisRateLimiter(fakeredis.FakeAsyncRedis(), rules=RULES, enabled=True)
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimiter(rules=RULES)
+
+
+def test_parse_rule():
+    assert parse_rule("10/60") == (10, 10 / 60)
+
+
+async def test_rejects_with_retry_after_once_the_bucket_is_empty(limiter):
+    for _ in range(2):
+        await limiter.enforce("login", ip="10.0.0.1", email="a@example.com")
+
+    with pytest.raises(HTTPException) as excinfo:
+        await limiter.enforce("login", ip="10.0.0.1", email="A@example.com")
+
+    assert excinfo.value.status_code == 429
+    # 2 tokens per 300 s refill one token in 150 s
+    assert 140 <= int(excinfo.value.headers["Retry-After"]) <= 150
+    assert limiter.rejected == 1
+
+
+async def test_rejected_requests_do_not_drain_the_other_buckets(limiter):
+    for _ in range(2):
+        await limiter.enforce("login", ip="10.0.0.1", email="a@example.com")
+    # The email bucket is empty; these must not spend the IP bucket's 3 remaining tokens
+    for _ in range(5):
+        with pytest.raises(HTTPException):
+            await limiter.enforce("login", ip="10.0.0.1", email="a@example.com")
+
+    for email in ("b@example.com", "c@example.com", "d@example.com"):
+        await limiter.enforce("login", ip="10.0.0.1", email=email)
+    with pytest.raises(HTTPException):
+        await limiter.enforce("login", ip="10.0.0.1", email="e@example.com")
+
+
+async def test_unknown_route_and_missing_identities_are_not_limited(limiter):
+    for _ in range(10):
+        await limiter.enforce("unknown", ip="10.0.0.1")
+        await limiter.enforce("login")
+
+
+async def test_disabled_limiter_allows_everything():
+    limiter = InMemoryRateLimiter(rules=RULES, enabled=False)
+    for _ in range(10):
+        await limiter.enforce("login", ip="10.0.0.1", email="a@example.com")
@@ -0,0 +1,63 @@
+import math
+
+import pytest
+from pydantic import ValidationError
+
+from roi import ROI_MAX_AMOUNT, ROI_MAX_MULTIPLIER, ROI_MAX_TERM_MONTHS, ROIEngine, TermTable
+from server import ROIScenario, ROITermsUpdate
+
+pytestmark = pytest.mark.anyio
+
+
+def test_projects_a_batch_like_the_calculator(db):
+    engine = ROIEngine(db)
+    result = engine.project([1000, 1000, 100, 5000], [6, 9, 6, 7], [False, True, False, False])
+
+    assert result["count"] == 4
+    assert result["final_amount"].tolist() == [1250.0, 1575.0, 0.0, 0.0]
+    assert result["profit_percentage"].tolist() == [25.0, 57.5, 0.0, 0.0]
+    assert result["eligible"].tolist() == [True, True, False, False]
+    assert result["known_term"].tolist() == [True, True, True, False]
+
+
+@pytest.mark.parametrize(
+    "scenario",
+    [
+        {"amount": 1000, "term": 10**30},
+        {"amount": 1000, "term": 0},
+        {"amount": 1000, "term": ROI_MAX_TERM_MONTHS + 1},
+        {"amount": 1e308, "term": 12, "compound": True},
+        {"amount": -1, "term": 12},
+        {"amount": "NaN", "term": 12},
+        {"amount": "Infinity", "term": 12},
+    ],
+)
+def test_out_of_range_scenarios_are_rejected(scenario):
+    with pytest.raises(ValidationError):
+        ROIScenario(**scenario)
+
+
+def test_largest_accepted_inputs_project_to_finite_numbers(db):
+    update = ROITermsUpdate(
+        terms=[{"months": ROI_MAX_TERM_MONTHS, "multiplier": ROI_MAX_MULTIPLIER}], compound_bonus=ROI_MAX_MULTIPLIER
+    )
+    engine = ROIEngine(db)
+    engine.table = TermTable([term.model_dump() for term in update.terms], update.compound_bonus)
+    scenario = ROIScenario(amount=ROI_MAX_AMOUNT, term=ROI_MAX_TERM_MONTHS, compound=True)
+
+    result = engine.project([scenario.amount], [scenario.term], [scenario.compound])
+    assert result["eligible"].tolist() == [True]
+    assert all(math.isfinite(result[column][0]) for column in ("final_amount", "profit", "profit_percentage"))
+
+
+@pytest.mark.parametrize(
+    "terms",
+    [
+        {"terms": [{"months": 10**30, "multiplier": 2}]},
+        {"terms": [{"months": 12, "multiplier": 1e308}]},
+        {"terms": [{"months": 12, "multiplier": 2}], "compound_bonus": 1e308},
+    ],
+)
+def test_out_of_range_terms_are_rejected(terms):
+    with pytest.raises(ValidationError):
+        ROITermsUpdate(**terms)
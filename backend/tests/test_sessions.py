@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from sessions import SESSION_GRACE, SESSION_INVALID, SESSION_REUSED, SESSION_ROTATED, SessionStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store(db):
+    return SessionStore(db, reuse_grace=timedelta(seconds=10))
+
+
+async def end_grace_window(db, token):
+    session_id = token.partition(".")[0]
+    await db.sessions.update_one({"id": session_id}, {"$set": {"rotated_at": datetime.utcnow() - timedelta(minutes=1)}})
+
+
+async def test_rotation_replaces_the_token(store):
+    first = await store.create("user-1", "Firefox", "10.0.0.1")
+    outcome, user_id, second = await store.rotate(first)
+
+    assert (outcome, user_id) == (SESSION_ROTATED, "user-1")
+    assert second != first
+    assert (await store.rotate(second))[0] == SESSION_ROTATED
+
+
+async def test_second_tab_in_grace_window_gets_no_new_refresh_token(store, db):
+    t0 = await store.create("user-1")
+    _, _, t1 = await store.rotate(t0)  # tab A
+    before = await db.sessions.find_one({}, {"_id": 0, "token_hash": 1, "generation": 1})
+
+    assert await store.rotate(t0) == (SESSION_GRACE, "user-1", None)  # tab B, same moment
+    assert await db.sessions.find_one({}, {"_id": 0, "token_hash": 1, "generation": 1}) == before
+
+
+async def test_tabs_keep_working_after_the_grace_window(store):
+    t0 = await store.create("user-1")
+    _, _, t1 = await store.rotate(t0)
+    await store.rotate(t0)
+    await end_grace_window(store.db, t1)
+
+    # Both tabs now share T1 through localStorage
+    outcome, _, t2 = await store.rotate(t1)
+    assert outcome == SESSION_ROTATED
+    assert (await store.rotate(t1))[0] == SESSION_GRACE
+    assert (await store.rotate(t2))[0] == SESSION_ROTATED
+
+
+async def test_reuse_after_the_grace_window_revokes_the_session(store):
+    t0 = await store.create("user-1")
+    _, _, t1 = await store.rotate(t0)
+    await end_grace_window(store.db, t1)
+
+    assert await store.rotate(t0) == (SESSION_REUSED, "user-1", None)
+    assert (await store.rotate(t1))[0] == SESSION_INVALID
+    assert await store.list_active("user-1") == []
+
+
+async def test_malformed_revoked_and_expired_tokens_are_invalid(store, db):
+    assert (await store.rotate("no-dot"))[0] == SESSION_INVALID
+
+    revoked = await store.create("user-1")
+    assert await store.revoke_token(revoked)
+    assert (await store.rotate(revoked))[0] == SESSION_INVALID
+
+    expired = await store.create("user-2")
+    await db.sessions.update_one({"user_id": "user-2"}, {"$set": {"expires_at": datetime.utcnow()}})
+    assert (await store.rotate(expired))[0] == SESSION_INVALID
+
+
+async def test_revoke_is_scoped_to_the_owner(store):
+    token = await store.create("user-1")
+    session_id = token.partition(".")[0]
+
+    assert not await store.revoke(session_id, user_id="someone-else")
+    assert [session["id"] for session in await store.list_active("user-1")] == [session_id]
+
+
+async def test_logout_needs_the_secret(store):
+    token = await store.create("user-1")
+    session_id = token.partition(".")[0]
+
+    assert not await store.revoke_token(f"{session_id}.forged")
+    assert not await store.revoke_token(session_id)
+    assert (await store.rotate(token))[0] == SESSION_ROTATED
+
+
+async def test_logout_accepts_the_current_or_grace_secret(store):
+    t0 = await store.create("user-1")
+    _, _, t1 = await store.rotate(t0)
+    # The other tab, still holding the secret just rotated away
+    assert await store.revoke_token(t0)
+    assert (await store.rotate(t1))[0] == SESSION_INVALID
+
+    t0 = await store.create("user-2")
+    _, _, t1 = await store.rotate(t0)
+    await end_grace_window(store.db, t1)
+    assert not await store.revoke_token(t0)
+    assert await store.revoke_token(t1)
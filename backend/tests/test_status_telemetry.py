@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import indexes
+import server
+from status_telemetry import StatusTelemetry
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 2, 12, 30, 15)
+
+
+def heartbeat(client_name, seconds):
+    return {"id": f"{client_name}-{seconds}", "client_name": client_name, "timestamp": NOW + timedelta(seconds=seconds)}
+
+
+async def record_all(telemetry, checks):
+    await telemetry.start()
+    for check in checks:
+        telemetry.record(check)
+    await telemetry.stop()
+
+
+class FlakyBuckets:
+    """Wraps status_minutes so the first ``bulk_write`` fails the way ``failure`` says"""
+
+    def __init__(self, collection, failure):
+        self.collection = collection
+        self.failure = failure
+        self.calls = []
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.calls.append(len(requests))
+        if len(self.calls) == 1:
+            if self.failure == "partial":
+                # The first upsert failed; the others were applied
+                await self.collection.bulk_write(requests[1:], ordered=ordered)
+                raise BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "duplicate key"}]})
+            raise AutoReconnect("primary stepped down")
+        return await self.collection.bulk_write(requests, ordered=ordered)
+
+
+class Database:
+    def __init__(self, db, status_minutes):
+        self.status_checks = db.status_checks
+        self.status_minutes = status_minutes
+
+
+async def test_buckets_and_summary(db):
+    telemetry = StatusTelemetry(db, flush_seconds=60)
+    checks = [heartbeat("web", 0), heartbeat("web", 20), heartbeat("web", 70), heartbeat("ios", 5)]
+    await record_all(telemetry, checks)
+
+    assert await db.status_checks.count_documents({}) == 4
+    assert await db.status_minutes.count_documents({}) == 3
+    summary = await telemetry.summary(NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    assert summary["total_checks"] == 4
+    web = next(client for client in summary["clients"] if client["client_name"] == "web")
+    assert (web["checks"], web["active_minutes"]) == (3, 2)
+    assert (web["first_seen"], web["last_seen"]) == (NOW, NOW + timedelta(seconds=70))
+
+
+async def test_bucket_upsert_is_retried_after_the_raw_insert(db):
+    status_minutes = FlakyBuckets(db.status_minutes, "error")
+    telemetry = StatusTelemetry(Database(db, status_minutes), flush_seconds=60)
+    await record_all(telemetry, [heartbeat("web", 0), heartbeat("ios", 0)])
+
+    assert status_minutes.calls == [2, 2]
+    assert await db.status_checks.count_documents({}) == 2
+    assert (await telemetry.summary(NOW - timedelta(hours=1), NOW + timedelta(hours=1)))["total_checks"] == 2
+    assert telemetry.snapshot()["bucket_failures"] == 0
+
+
+async def test_only_failed_upserts_are_retried(db):
+    status_minutes = FlakyBuckets(db.status_minutes, "partial")
+    telemetry = StatusTelemetry(Database(db, status_minutes), flush_seconds=60)
+    await record_all(telemetry, [heartbeat("web", 0), heartbeat("ios", 0), heartbeat("ios", 1)])
+
+    assert status_minutes.calls == [2, 1]
+    summary = await telemetry.summary(NOW - timedelta(hours=1), NOW + timedelta(hours=1))
+    assert {client["client_name"]: client["checks"] for client in summary["clients"]} == {"web": 1, "ios": 2}
+
+
+def test_raw_retention_is_opt_in():
+    assert "status_checks" not in indexes.INDEXES
+
+
+async def test_summary_accepts_timezone_aware_bounds(db, monkeypatch):
+    telemetry = StatusTelemetry(db, flush_seconds=60)
+    await record_all(telemetry, [heartbeat("web", 0)])
+    monkeypatch.setattr(server, "status_telemetry", telemetry)
+
+    plus_two = timezone(timedelta(hours=2))
+    summary = await server.get_status_summary(
+        since=(NOW - timedelta(minutes=5)).replace(tzinfo=timezone.utc).astimezone(plus_two),
+        until=(NOW + timedelta(minutes=5)).replace(tzinfo=timezone.utc).astimezone(plus_two),
+    )
+    assert summary["total_checks"] == 1
+    assert summary["since"] == NOW - timedelta(minutes=5)
+
+    # Naive bounds are already UTC; mixing the two is fine
+    summary = await server.get_status_summary(since=NOW - timedelta(minutes=5), until=datetime.now(timezone.utc))
+    assert summary["total_checks"] == 1
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from tests.test_auth_api import bearer, register
+from token_versions import CLAIMS_REVOKED, CLAIMS_STALE, CLAIMS_VALID, TokenVersionMap
+
+pytestmark = pytest.mark.anyio
+
+
+def timestamp(moment):
+    return int((moment - datetime(1970, 1, 1)).total_seconds())
+
+
+async def add_user(db, user_id, **fields):
+    await db.users.insert_one({"id": user_id, "email": f"{user_id}@example.com", "token_version": 0, **fields})
+
+
+async def test_revoke_bumps_the_version_past_issued_tokens(db):
+    versions = TokenVersionMap(db, timedelta(minutes=30))
+    await add_user(db, "u1")
+    issued_at = timestamp(datetime.utcnow() - timedelta(seconds=5))
+
+    assert versions.check("u1", 0, issued_at) == CLAIMS_VALID
+    assert await versions.revoke("u1") == 1
+    assert versions.check("u1", 0, issued_at) == CLAIMS_REVOKED
+    assert versions.check("u1", 1, timestamp(datetime.utcnow() + timedelta(seconds=1))) == CLAIMS_VALID
+    assert await versions.revoke("missing") is None
+
+
+async def test_claim_changes_make_older_tokens_stale(db):
+    versions = TokenVersionMap(db, timedelta(minutes=30))
+    await add_user(db, "u1", token_version=2)
+    issued_at = timestamp(datetime.utcnow() - timedelta(seconds=5))
+
+    await versions.claims_changed("u1")
+    assert versions.check("u1", 2, issued_at) == CLAIMS_STALE
+    assert versions.check("u1", 2, None) == CLAIMS_STALE
+    assert versions.check("u1", 2, timestamp(datetime.utcnow() + timedelta(seconds=1))) == CLAIMS_VALID
+
+
+async def test_refresh_picks_up_changes_from_other_workers(db):
+    this_worker = TokenVersionMap(db, timedelta(minutes=30))
+    other_worker = TokenVersionMap(db, timedelta(minutes=30))
+    await add_user(db, "u1")
+    await this_worker.refresh()
+    issued_at = timestamp(datetime.utcnow() - timedelta(seconds=5))
+
+    await other_worker.revoke("u1")
+    assert this_worker.check("u1", 0, issued_at) == CLAIMS_VALID
+    await this_worker.refresh()
+    assert this_worker.check("u1", 0, issued_at) == CLAIMS_REVOKED
+
+
+async def test_refresh_drops_changes_older_than_any_token(db):
+    versions = TokenVersionMap(db, timedelta(minutes=30))
+    await add_user(db, "recent", token_version=1, claims_changed_at=datetime.utcnow() - timedelta(minutes=5))
+    await add_user(db, "old", token_version=3, claims_changed_at=datetime.utcnow() - timedelta(hours=1))
+
+    await versions.refresh()
+    assert versions.snapshot()["tracked_users"] == 1
+    assert versions.check("old", 0, None) == CLAIMS_VALID
+
+    # A tracked entry goes once its change falls behind the token lifetime
+    versions.max_token_lifetime = timedelta(minutes=1)
+    await versions.refresh()
+    assert versions.snapshot()["tracked_users"] == 0
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(server, "STATELESS_AUTH", True)
+
+
+@pytest.fixture
+async def client(stateless, client):
+    # The stateless switch has to be set before the lifespan starts the map
+    assert server.token_versions.running
+    yield client
+
+
+async def admin_and_user(client):
+    admin = await register(client, "admin@example.com")
+    user = await register(client, "leo@example.com")
+    return bearer(admin["access_token"]), user
+
+
+async def test_logout_everywhere_rejects_existing_tokens(client, db):
+    admin, tokens = await admin_and_user(client)
+    assert (await client.get("/api/auth/me", headers=bearer(tokens["access_token"]))).status_code == 200
+    user_id = (await db.users.find_one({"email": "leo@example.com"}))["id"]
+
+    response = await client.post(f"/api/admin/users/{user_id}/revoke-tokens", headers=admin)
+    assert response.json()["token_version"] == 1
+
+    assert (await client.get("/api/auth/me", headers=bearer(tokens["access_token"]))).status_code == 401
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+async def test_reused_refresh_token_rejects_the_access_token(client, monkeypatch):
+    _, tokens = await admin_and_user(client)
+    first = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert first.status_code == 200
+
+    # Replaying the rotated refresh token after the grace window bumps the version
+    monkeypatch.setattr(server.session_store, "reuse_grace", timedelta(0))
+    assert (await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).status_code == 401
+    for access_token in (tokens["access_token"], first.json()["access_token"]):
+        assert (await client.get("/api/auth/me", headers=bearer(access_token))).status_code == 401
+
+
+async def test_stale_claims_are_read_from_the_database(client):
+    _, tokens = await admin_and_user(client)
+    headers = bearer(tokens["access_token"])
+    assert (await client.get("/api/auth/me", headers=headers)).json()["mfa_enabled"] is False
+
+    response = await client.put("/api/user/settings", headers=headers, json={"mfa_enabled": True, "mfa_method": "email"})
+    assert response.status_code == 200
+    me = (await client.get("/api/auth/me", headers=headers)).json()
+    assert me["mfa_enabled"] is True and me["mfa_method"] == "email"
@@ -0,0 +1,127 @@
+import io
+
+import orjson
+import pytest
+
+from tests.test_auth_api import bearer, register
+from user_import import iter_csv_rows
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def admin(client):
+    # The first account becomes the bootstrap admin
+    tokens = await register(client, "admin@example.com")
+    return bearer(tokens["access_token"])
+
+
+async def upload(client, admin, content, filename="users.csv"):
+    return await client.post("/api/admin/users/import", headers=admin, files={"file": (filename, content)})
+
+
+def events(response):
+    return [orjson.loads(line) for line in response.text.splitlines()]
+
+
+async def test_csv_import_creates_users(client, db, admin):
+    content = (
+        "﻿email,password,phone_number,mfa_enabled,mfa_method\r\n"
+        "Erin@Example.com,pass-1,,true,email\r\n"
+        "frank@example.com,pass-2,+15550100,,\r\n"
+    ).encode("utf-8")
+
+    response = await upload(client, admin, content)
+    assert response.status_code == 200
+    done = events(response)[-1]
+    assert done["event"] == "done"
+    assert (done["processed"], done["inserted"], done["failed"]) == (2, 2, 0)
+
+    erin = await db.users.find_one({"email": "erin@example.com"})
+    assert erin["mfa_enabled"] and erin["mfa_method"] == "email"
+    assert erin["hashed_password"] != "pass-1"
+    response = await client.post("/api/auth/login", json={"email": "frank@example.com", "password": "pass-2"})
+    assert response.status_code == 200
+
+
+async def test_bad_rows_are_reported_and_the_rest_imported(client, db, admin):
+    content = (
+        "email,password,mfa_method\n"
+        "not-an-email,pass\n"
+        "gina@example.com,pass\n"
+        "GINA@example.com,pass\n"
+        "admin@example.com,pass\n"
+        "hank@example.com,pass,carrier-pigeon\n"
+    ).encode("utf-8")
+
+    lines = events(await upload(client, admin, content))
+    errors = {event["row"]: event["error"] for event in lines if event["event"] == "error"}
+    assert set(errors) == {2, 4, 5, 6}
+    assert errors[4] == "Duplicate email in file"
+    assert errors[5] == "Email already registered"
+    assert "MFA method" in errors[6]
+    assert (lines[-1]["inserted"], lines[-1]["failed"]) == (1, 4)
+    assert await db.users.count_documents({}) == 2
+
+
+async def test_csv_that_is_not_utf8_is_refused_up_front(client, db, admin):
+    content = "email,password\nrené@example.com,pass\n".encode("cp1252")
+
+    response = await upload(client, admin, content)
+    assert response.status_code == 400
+    assert "line 2" in response.json()["detail"]
+    assert await db.users.count_documents({}) == 1
+
+
+async def test_ndjson_import_reports_unparseable_lines(client, db, admin):
+    content = b'{"email": "ivan@example.com", "password": "pass"}\n\nnot json\n[1, 2]\n'
+
+    lines = events(await upload(client, admin, content, filename="users.ndjson"))
+    errors = {event["row"]: event["error"] for event in lines if event["event"] == "error"}
+    assert errors == {3: "Invalid JSON", 4: "Expected a JSON object"}
+    assert lines[-1]["inserted"] == 1
+    assert await db.users.find_one({"email": "ivan@example.com"})
+
+
+def test_malformed_csv_ends_with_a_row_error():
+    # A field past csv.field_size_limit() makes the reader raise
+    content = b"email,password\na@example.com,x\nb@example.com," + b"x" * 200000 + b"\nc@example.com,y\n"
+    rows = list(iter_csv_rows(io.BytesIO(content)))
+    assert len(rows) == 2
+    assert rows[0] == (2, {"email": "a@example.com", "password": "x"})
+    row_number, error = rows[1]
+    assert row_number == 3 and "Malformed CSV" in str(error)
+
+
+async def test_bulk_operations(client, db, admin):
+    tokens = await register(client, "judy@example.com")
+    judy = await db.users.find_one({"email": "judy@example.com"})
+
+    response = await client.post("/api/admin/users/bulk", headers=admin, json={"operations": [
+        {"email": "Judy@Example.com", "action": "enable_mfa", "mfa_method": "sms"},
+        {"user_id": judy["id"], "action": "deactivate"},
+        {"email": "judy@example.com", "action": "enable_mfa", "mfa_method": "fax"},
+        {"action": "activate"},
+        {"email": "judy@example.com", "action": "promote"},
+        {"email": "nobody@example.com", "action": "activate"},
+    ]})
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["requested"], result["applied"], result["matched"]) == (6, 3, 2)
+    assert [error["index"] for error in result["errors"]] == [2, 3, 4]
+
+    judy = await db.users.find_one({"email": "judy@example.com"})
+    assert judy["mfa_enabled"] and judy["mfa_method"] == "sms"
+    assert not judy["is_active"]
+    # Deactivation ends existing sessions and access tokens
+    assert (await client.get("/api/auth/me", headers=bearer(tokens["access_token"]))).status_code == 401
+    response = await client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+async def test_bulk_operations_require_an_admin(client, admin):
+    tokens = await register(client, "kim@example.com")
+    response = await client.post("/api/admin/users/bulk", headers=bearer(tokens["access_token"]), json={
+        "operations": [{"email": "kim@example.com", "action": "deactivate"}],
+    })
+    assert response.status_code == 403
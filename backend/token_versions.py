@@ -0,0 +1,110 @@
+"""Per-user token versions that revoke or mark stale the claims of stateless access tokens."""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION_REFRESH_SECONDS = float(os.environ.get('TOKEN_VERSION_REFRESH_SECONDS', 5))
+
+# Claim verdicts from TokenVersionMap.check
+CLAIMS_VALID = "valid"
+CLAIMS_STALE = "stale"
+CLAIMS_REVOKED = "revoked"
+
+
+class TokenVersionMap:
+    def __init__(self, db, max_token_lifetime: timedelta, refresh_seconds: float = TOKEN_VERSION_REFRESH_SECONDS):
+        self.db = db
+        self.max_token_lifetime = max_token_lifetime
+        self.refresh_seconds = refresh_seconds
+        # user_id -> (token_version, claims_changed_at)
+        self._versions: Dict[str, Tuple[int, datetime]] = {}
+        self._synced_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+        logger.info(f"Token version map loaded with {len(self._versions)} recently changed users")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def check(self, user_id: str, token_version: int, issued_at: Optional[int]) -> str:
+        entry = self._versions.get(user_id)
+        if entry is None:
+            return CLAIMS_VALID
+        current_version, claims_changed_at = entry
+        if token_version < current_version:
+            return CLAIMS_REVOKED
+        if issued_at is None or datetime.utcfromtimestamp(issued_at) < claims_changed_at:
+            return CLAIMS_STALE
+        return CLAIMS_VALID
+
+    async def claims_changed(self, user_id: str):
+        """Record that a claim-bearing field changed; older tokens fall back to MongoDB"""
+        await self._touch(user_id, {})
+
+    async def revoke(self, user_id: str) -> Optional[int]:
+        """Invalidate every token issued to ``user_id`` so far; returns the new version"""
+        return await self._touch(user_id, {"$inc": {"token_version": 1}})
+
+    async def _touch(self, user_id: str, update: Dict[str, Any]) -> Optional[int]:
+        now = datetime.utcnow()
+        user_doc = await self.db.users.find_one_and_update(
+            {"id": user_id},
+            {**update, "$set": {"claims_changed_at": now}},
+            projection={"_id": 0, "token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if user_doc is None:
+            return None
+        token_version = user_doc.get("token_version", 0)
+        self._versions[user_id] = (token_version, now)
+        return token_version
+
+    async def refresh(self):
+        now = datetime.utcnow()
+        horizon = now - self.max_token_lifetime
+        # Re-read a little overlap so writes committed out of order aren't missed
+        since = horizon if self._synced_until is None else max(horizon, self._synced_until - timedelta(seconds=self.refresh_seconds))
+        cursor = self.db.users.find(
+            {"claims_changed_at": {"$gt": since}},
+            {"_id": 0, "id": 1, "token_version": 1, "claims_changed_at": 1},
+        )
+        async for user_doc in cursor:
+            self._versions[user_doc["id"]] = (user_doc.get("token_version", 0), user_doc["claims_changed_at"])
+        self._synced_until = now
+        for user_id in [user_id for user_id, (_, changed_at) in self._versions.items() if changed_at <= horizon]:
+            del self._versions[user_id]
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving with the last snapshot; the next pass catches up
+                logger.error(f"Token version refresh failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "tracked_users": len(self._versions),
+            "refresh_seconds": self.refresh_seconds,
+            "synced_until": self._synced_until,
+        }
@@ -0,0 +1,147 @@
+"""Batched admin import of users from CSV or NDJSON uploads."""
+import csv
+import io
+import os
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from pymongo.errors import BulkWriteError
+
+USER_IMPORT_BATCH_SIZE = int(os.environ.get('USER_IMPORT_BATCH_SIZE', 500))
+USER_IMPORT_MAX_ROWS = int(os.environ.get('USER_IMPORT_MAX_ROWS', 100000))
+DUPLICATE_KEY_ERROR = 11000
+
+
+class RowError(Exception):
+    pass
+
+
+def check_utf8(content: bytes) -> None:
+    """Raise ``ValueError`` unless ``content`` decodes as UTF-8.
+
+    Checked before the import starts streaming, since a decode error raised
+    mid-stream can only cut the response short.
+    """
+    try:
+        content.decode("utf-8")
+    except UnicodeDecodeError as e:
+        line_number = content.count(b"\n", 0, e.start) + 1
+        raise ValueError(f"File is not UTF-8 encoded (line {line_number}); save it as UTF-8 and upload it again") from None
+
+
+def iter_csv_rows(binary_file) -> Iterator[Tuple[int, Any]]:
+    """(row number, dict) per data row; row 1 is the header. A malformed row yields a RowError and ends the file"""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    row_number = 1
+    try:
+        for row_number, row in enumerate(reader, start=2):
+            # Empty cells mean "not given"
+            yield row_number, {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    except csv.Error as e:
+        yield row_number + 1, RowError(f"Malformed CSV: {e}")
+
+
+def iter_ndjson_rows(binary_file) -> Iterator[Tuple[int, Any]]:
+    """(line number, dict) per non-blank line; unparseable lines yield a RowError"""
+    for line_number, line in enumerate(binary_file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_number, RowError("Invalid JSON")
+            continue
+        yield line_number, row if isinstance(row, dict) else RowError("Expected a JSON object")
+
+
+def _error_message(error: Exception) -> str:
+    errors = getattr(error, "errors", None)
+    if callable(errors):
+        # pydantic ValidationError: "email: value is not a valid email address"
+        return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in errors())
+    return str(error)
+
+
+async def import_users(
+    db,
+    hasher,
+    rows: Iterable[Tuple[int, Any]],
+    validate: Callable[[Dict[str, Any]], Any],
+    build_document: Callable[[Any, str], Dict[str, Any]],
+    batch_size: int = USER_IMPORT_BATCH_SIZE,
+    max_rows: int = USER_IMPORT_MAX_ROWS,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Import ``rows`` and yield ``error``, ``progress`` and finally ``done`` events.
+
+    ``validate`` turns a raw row into an object with ``email`` and ``password``
+    or raises ``ValueError``; ``build_document`` makes the user document from
+    it and the password hash.
+    """
+    started = time.perf_counter()
+    totals = {"processed": 0, "inserted": 0, "failed": 0}
+    seen_emails = set()
+    batch: List[Tuple[int, Any]] = []
+
+    def failure(row_number: int, error: str, email: Optional[str] = None) -> Dict[str, Any]:
+        totals["failed"] += 1
+        return {"event": "error", "row": row_number, "email": email, "error": error}
+
+    async def flush() -> AsyncIterator[Dict[str, Any]]:
+        emails = [user.email for _, user in batch]
+        existing = set()
+        async for user_doc in db.users.find({"email": {"$in": emails}}, {"_id": 0, "email": 1}):
+            existing.add(user_doc["email"])
+        pending = []
+        for row_number, user in batch:
+            if user.email in existing:
+                yield failure(row_number, "Email already registered", user.email)
+            else:
+                pending.append((row_number, user))
+
+        if pending:
+            hashes = await hasher.hash_many([user.password for _, user in pending])
+            documents = [build_document(user, hashed) for (_, user), hashed in zip(pending, hashes)]
+            try:
+                result = await db.users.insert_many(documents, ordered=False)
+                totals["inserted"] += len(result.inserted_ids)
+            except BulkWriteError as e:
+                totals["inserted"] += e.details.get("nInserted", 0)
+                for write_error in e.details.get("writeErrors", []):
+                    row_number, user = pending[write_error["index"]]
+                    message = "Email already registered" if write_error.get("code") == DUPLICATE_KEY_ERROR else write_error.get("errmsg")
+                    yield failure(row_number, message, user.email)
+
+        totals["processed"] += len(batch)
+        batch.clear()
+        yield {"event": "progress", **totals}
+
+    for count, (row_number, row) in enumerate(rows, start=1):
+        if count > max_rows:
+            yield failure(row_number, f"Import is limited to {max_rows} rows; the rest of the file was skipped")
+            break
+        if isinstance(row, Exception):
+            totals["processed"] += 1
+            yield failure(row_number, _error_message(row))
+            continue
+        try:
+            user = validate(row)
+        except ValueError as e:
+            totals["processed"] += 1
+            yield failure(row_number, _error_message(e), row.get("email"))
+            continue
+        if user.email in seen_emails:
+            totals["processed"] += 1
+            yield failure(row_number, "Duplicate email in file", user.email)
+            continue
+        seen_emails.add(user.email)
+        batch.append((row_number, user))
+        if len(batch) >= batch_size:
+            async for event in flush():
+                yield event
+
+    if batch:
+        async for event in flush():
+            yield event
+    yield {"event": "done", **totals, "seconds": round(time.perf_counter() - started, 3)}
@@ -448,13 +448,12 @@ def test_admin_access():
         logs = logs_response.json()
         if logs:  # If there are any logs
             for log in logs:
-                # Check that _id is properly serialized as a string
-                assert "_id" in log
-                assert isinstance(log["_id"], str)
+                # The plaintext code and raw _id are projected away
+                assert "_id" not in log
+                assert "code" not in log
                 # Check other fields are present and properly serialized
                 assert "id" in log
                 assert "email" in log
-                assert "code" in log
                 assert "method" in log
                 assert "purpose" in log
                 assert "created_at" in log
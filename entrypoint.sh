@@ -5,15 +5,14 @@ set -e
 cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
-# Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Gunicorn master with uvicorn workers; WEB_CONCURRENCY sets the worker count
+gunicorn -c gunicorn.conf.py server:app &
 BACKEND_PID=$!
 
-echo "Waiting for backend to start..."
-sleep 30
-
-if ! kill -0 $BACKEND_PID 2>/dev/null; then
+echo "Waiting for backend to become ready..."
+if ! python3 healthcheck.py --wait "${BACKEND_READY_TIMEOUT:-60}"; then
     echo "Backend failed to start at initialization, exiting"
+    kill $BACKEND_PID 2>/dev/null || true
     exit 1
 fi
 
@@ -23,6 +22,8 @@ NGINX_PID=$!
 
 # Handle termination signals
 trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+# SIGHUP rolls the backend workers without dropping requests
+trap 'kill -HUP $BACKEND_PID' SIGHUP
 
 # Check if processes are still running
 while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import AdminLogin from './admin/AdminLogin';
 import AdminDashboard from './admin/AdminDashboard';
 import AdminMFAGate from './AdminMFAGate';
+import { authFetch, clearTokens } from '../services/authSession';
 
 const AdminApp = () => {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
@@ -22,11 +23,8 @@ const AdminApp = () => {
         return;
       }
 
-      const response = await fetch(`${backendUrl}/api/auth/me`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
+      // Renews an expired access token with the refresh token instead of forcing a new login
+      const response = await authFetch(`${backendUrl}/api/auth/me`);
 
       if (response.ok) {
         const userData = await response.json();
@@ -46,7 +44,7 @@ const AdminApp = () => {
   };
 
   const handleLogout = () => {
-    localStorage.removeItem('auth_token');
+    clearTokens();
     setIsAuthenticated(false);
     setCurrentUser(null);
   };
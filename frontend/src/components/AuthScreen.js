@@ -2,6 +2,7 @@ import React, { useState } from 'react';
 import { motion } from 'framer-motion';
 import { EyeIcon, EyeSlashIcon, KeyIcon, UserPlusIcon } from '@heroicons/react/24/outline';
 import MFAVerification from './MFAVerification';
+import { storeTokens } from '../services/authSession';
 
 const AuthScreen = ({ onAuthenticated }) => {
   const [email, setEmail] = useState('');
@@ -50,7 +51,7 @@ const AuthScreen = ({ onAuthenticated }) => {
           setRequiresMFA(true);
         } else {
           // Complete authentication
-          localStorage.setItem('auth_token', data.access_token);
+          storeTokens(data);
           onAuthenticated();
         }
       } else {
@@ -65,7 +66,7 @@ const AuthScreen = ({ onAuthenticated }) => {
 
   const handleMFAVerified = (tokenData) => {
     // Store the new token and complete authentication
-    localStorage.setItem('auth_token', tokenData.access_token);
+    storeTokens(tokenData);
     localStorage.removeItem('temp_auth_token');
     onAuthenticated();
   };
@@ -24,6 +24,7 @@ import {
   Title,
 } from 'chart.js';
 import MFASettings from './MFASettings';
+import { authFetch } from '../services/authSession';
 
 ChartJS.register(
   ArcElement,
@@ -55,11 +56,8 @@ const Dashboard = ({ onBackToLanding }) => {
       const token = localStorage.getItem('auth_token');
       if (!token) return;
 
-      const response = await fetch(`${backendUrl}/api/auth/me`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
+      // Renews an expired access token with the refresh token instead of forcing a new login
+      const response = await authFetch(`${backendUrl}/api/auth/me`);
 
       if (response.ok) {
         const userData = await response.json();
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { ShieldCheckIcon, DevicePhoneMobileIcon, EnvelopeIcon } from '@heroicons/react/24/outline';
+import { storeTokens } from '../services/authSession';
 
 const MFAVerification = ({ email, onVerified, onBack, adminMode = false }) => {
   const [selectedMethod, setSelectedMethod] = useState('email');
@@ -101,7 +102,7 @@ const MFAVerification = ({ email, onVerified, onBack, adminMode = false }) => {
           onVerified(true);
         } else {
           // For regular login, we get a new token
-          localStorage.setItem('auth_token', data.access_token);
+          storeTokens(data);
           onVerified(data);
         }
       } else {
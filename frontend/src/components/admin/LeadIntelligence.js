@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { motion } from 'framer-motion';
 import { 
   MagnifyingGlassIcon,
@@ -10,173 +10,86 @@ import {
   PhoneIcon,
   EnvelopeIcon
 } from '@heroicons/react/24/outline';
-import { airtableService } from '../../services/airtableService';
+import { authFetch } from '../../services/authSession';
+
+const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+const PAGE_SIZE = 24;
+const SEARCH_DEBOUNCE_MS = 300;
+// Sort dropdown values -> /api/admin/leads ?sort=
+const SORT_PARAMS = { leadScore: 'score', timestamp: 'recent', investment: 'investment' };
+
+// API documents are snake_case; the cards below read camelCase
+const toLead = (lead) => ({
+  id: lead.id,
+  firstName: lead.first_name,
+  lastName: lead.last_name,
+  email: lead.email,
+  phone: lead.phone || '',
+  investmentCapacity: lead.investment_capacity,
+  accreditedStatus: lead.accredited_status,
+  leadScore: lead.lead_score,
+  priority: lead.priority,
+  status: lead.status,
+  source: lead.source,
+  // Stored as naive UTC
+  timestamp: new Date(`${lead.created_at}Z`),
+  followUpRequired: lead.follow_up_required,
+  interestLevel: lead.interest_level,
+  additionalInfo: lead.additional_info
+});
 
 const LeadIntelligence = () => {
   const [leads, setLeads] = useState([]);
-  const [filteredLeads, setFilteredLeads] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
   const [filterStatus, setFilterStatus] = useState('all');
   const [sortBy, setSortBy] = useState('leadScore');
+  // The request whose response may still update the list
+  const requestRef = useRef(null);
 
+  // Filtering, search and sorting happen server-side; only one page is held here
   useEffect(() => {
-    loadLeads();
-  }, []);
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm.trim()), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   useEffect(() => {
-    filterAndSortLeads();
-  }, [leads, searchTerm, filterStatus, sortBy]);
+    loadLeads();
+    // A page for the old filters must not land after the new one
+    return () => requestRef.current?.abort();
+  }, [debouncedSearch, filterStatus, sortBy]);
 
-  const loadLeads = async () => {
+  const loadLeads = async (after = null) => {
+    requestRef.current?.abort();
+    const controller = new AbortController();
+    requestRef.current = controller;
     try {
       setLoading(true);
-      
-      // Mock lead data for demonstration
-      const mockLeads = [
-        {
-          id: 1,
-          firstName: 'Marcus',
-          lastName: 'Thompson',
-          email: 'marcus.thompson@example.com',
-          phone: '+1 (555) 123-4567',
-          investmentCapacity: '500000-1000000',
-          accreditedStatus: 'yes',
-          leadScore: 185,
-          priority: 'Immediate',
-          status: 'New Application',
-          source: 'inner-circle-application',
-          timestamp: new Date('2024-01-15T10:30:00'),
-          followUpRequired: true,
-          interestLevel: 'Ultra High',
-          additionalInfo: 'Interested in PropTech and renewable energy investments. Has previous VC experience.'
-        },
-        {
-          id: 2,
-          firstName: 'Sarah',
-          lastName: 'Chen',
-          email: 'sarah.chen@techstartup.com',
-          phone: '+1 (555) 234-5678',
-          investmentCapacity: '250000-500000',
-          accreditedStatus: 'yes',
-          leadScore: 165,
-          priority: 'High',
-          status: 'Reviewing',
-          source: 'roi-calculator',
-          timestamp: new Date('2024-01-15T09:15:00'),
-          followUpRequired: true,
-          interestLevel: 'High',
-          additionalInfo: 'CEO of tech startup, looking for diversification opportunities.'
-        },
-        {
-          id: 3,
-          firstName: 'David',
-          lastName: 'Rodriguez',
-          email: 'david.rodriguez@realestate.com',
-          phone: '+1 (555) 345-6789',
-          investmentCapacity: '100000-250000',
-          accreditedStatus: 'no',
-          leadScore: 140,
-          priority: 'Medium',
-          status: 'Contacted',
-          source: 'website',
-          timestamp: new Date('2024-01-14T16:45:00'),
-          followUpRequired: false,
-          interestLevel: 'Medium-High',
-          additionalInfo: 'Real estate professional interested in portfolio expansion.'
-        },
-        {
-          id: 4,
-          firstName: 'Jennifer',
-          lastName: 'Walsh',
-          email: 'jennifer.walsh@investment.com',
-          phone: '+1 (555) 456-7890',
-          investmentCapacity: '1000000+',
-          accreditedStatus: 'yes',
-          leadScore: 195,
-          priority: 'Immediate',
-          status: 'Approved',
-          source: 'referral',
-          timestamp: new Date('2024-01-14T14:20:00'),
-          followUpRequired: false,
-          interestLevel: 'Ultra High',
-          additionalInfo: 'High-net-worth individual with $5M+ investment portfolio.'
-        },
-        {
-          id: 5,
-          firstName: 'Michael',
-          lastName: 'Foster',
-          email: 'michael.foster@consulting.com',
-          phone: '+1 (555) 567-8901',
-          investmentCapacity: '50000-100000',
-          accreditedStatus: 'no',
-          leadScore: 95,
-          priority: 'Standard',
-          status: 'New Application',
-          source: 'roi-calculator',
-          timestamp: new Date('2024-01-14T11:10:00'),
-          followUpRequired: true,
-          interestLevel: 'Medium',
-          additionalInfo: 'Management consultant exploring investment opportunities.'
-        }
-      ];
-      
-      setLeads(mockLeads);
+      const params = new URLSearchParams({ sort: SORT_PARAMS[sortBy], limit: PAGE_SIZE });
+      if (filterStatus === 'followup') params.append('follow_up', 'true');
+      else if (filterStatus !== 'all') params.append('status', filterStatus);
+      if (debouncedSearch) params.append('q', debouncedSearch);
+      if (after) params.append('after', after);
+
+      const response = await authFetch(`${backendUrl}/api/admin/leads?${params.toString()}`, {
+        signal: controller.signal
+      });
+      if (!response.ok) {
+        throw new Error(`Lead request failed: ${response.status}`);
+      }
+      const page = (await response.json()).map(toLead);
+      setLeads(previous => (after ? [...previous, ...page] : page));
+      setNextCursor(response.headers.get('X-Next-After'));
     } catch (error) {
-      console.error('Error loading leads:', error);
+      if (error.name !== 'AbortError') console.error('Error loading leads:', error);
     } finally {
-      setLoading(false);
+      // A superseded request leaves the spinner to the one that replaced it
+      if (requestRef.current === controller) setLoading(false);
     }
   };
 
-  const filterAndSortLeads = () => {
-    let filtered = [...leads];
-
-    // Apply search filter
-    if (searchTerm) {
-      filtered = filtered.filter(lead =>
-        `${lead.firstName} ${lead.lastName}`.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        lead.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        lead.investmentCapacity.includes(searchTerm)
-      );
-    }
-
-    // Apply status filter
-    if (filterStatus !== 'all') {
-      filtered = filtered.filter(lead => 
-        filterStatus === 'followup' ? lead.followUpRequired : lead.status === filterStatus
-      );
-    }
-
-    // Apply sorting
-    filtered.sort((a, b) => {
-      switch (sortBy) {
-        case 'leadScore':
-          return b.leadScore - a.leadScore;
-        case 'timestamp':
-          return new Date(b.timestamp) - new Date(a.timestamp);
-        case 'investment':
-          return getInvestmentValue(b.investmentCapacity) - getInvestmentValue(a.investmentCapacity);
-        default:
-          return 0;
-      }
-    });
-
-    setFilteredLeads(filtered);
-  };
-
-  const getInvestmentValue = (capacity) => {
-    const values = {
-      '1000000+': 1000000,
-      '500000-1000000': 750000,
-      '250000-500000': 375000,
-      '100000-250000': 175000,
-      '50000-100000': 75000,
-      '25000-50000': 37500
-    };
-    return values[capacity] || 0;
-  };
-
   const getScoreColor = (score) => {
     if (score >= 180) return 'text-green-400 bg-green-400/20';
     if (score >= 150) return 'text-gold-400 bg-gold-400/20';
@@ -212,7 +125,7 @@ const LeadIntelligence = () => {
         </div>
         <div className="flex items-center gap-4">
           <div className="text-right">
-            <div className="text-2xl font-bold text-gold-400">{filteredLeads.length}</div>
+            <div className="text-2xl font-bold text-gold-400">{leads.length}{nextCursor ? '+' : ''}</div>
             <div className="text-sm text-platinum-400">Active Leads</div>
           </div>
         </div>
@@ -260,7 +173,7 @@ const LeadIntelligence = () => {
 
           {/* Refresh Button */}
           <button
-            onClick={loadLeads}
+            onClick={() => loadLeads()}
             className="btn-secondary py-3 px-6 rounded-xl font-semibold"
           >
             Refresh Data
@@ -270,7 +183,7 @@ const LeadIntelligence = () => {
 
       {/* Lead Cards */}
       <div className="grid grid-cols-1 lg:grid-cols-2 xl:grid-cols-3 gap-6">
-        {loading ? (
+        {loading && leads.length === 0 ? (
           // Loading skeletons
           [...Array(6)].map((_, index) => (
             <div key={index} className="glass-dark p-6 rounded-2xl animate-pulse">
@@ -280,13 +193,13 @@ const LeadIntelligence = () => {
             </div>
           ))
         ) : (
-          filteredLeads.map((lead, index) => (
+          leads.map((lead, index) => (
             <motion.div
               key={lead.id}
               className="glass-dark p-6 rounded-2xl hover:scale-105 transition-transform duration-300"
               initial={{ opacity: 0, y: 20 }}
               animate={{ opacity: 1, y: 0 }}
-              transition={{ duration: 0.5, delay: index * 0.1 }}
+              transition={{ duration: 0.5, delay: (index % PAGE_SIZE) * 0.05 }}
             >
               {/* Lead Header */}
               <div className="flex items-start justify-between mb-4">
@@ -372,6 +285,18 @@ const LeadIntelligence = () => {
           ))
         )}
       </div>
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={() => loadLeads(nextCursor)}
+            disabled={loading}
+            className="btn-secondary py-3 px-6 rounded-xl font-semibold"
+          >
+            {loading ? 'Loading...' : 'Load More'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
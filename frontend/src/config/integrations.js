@@ -20,14 +20,6 @@ export const INTEGRATION_CONFIG = {
     enableRetargeting: process.env.REACT_APP_ENABLE_RETARGETING === 'true'
   },
 
-  // Airtable Configuration
-  airtable: {
-    baseId: process.env.REACT_APP_AIRTABLE_BASE_ID || 'your-base-id-here',
-    tableName: process.env.REACT_APP_AIRTABLE_TABLE_NAME || 'Investor_Applications',
-    apiKey: process.env.REACT_APP_AIRTABLE_API_KEY || 'your-airtable-key-here',
-    baseUrl: 'https://api.airtable.com/v0'
-  },
-
   // Email Notifications
   notifications: {
     adminEmail: process.env.REACT_APP_ADMIN_EMAIL || 'your-inbox@email.com',
@@ -56,10 +48,6 @@ export const validateIntegrations = () => {
     issues.push('GA4 Measurement ID not configured');
   }
   
-  if (INTEGRATION_CONFIG.airtable.baseId.includes('your-base')) {
-    issues.push('Airtable Base ID not configured');
-  }
-  
   return {
     isValid: issues.length === 0,
     issues: issues
@@ -5,14 +5,15 @@ import { useState, useEffect, useCallback } from 'react';
 import { INTEGRATION_CONFIG, validateIntegrations } from '../config/integrations';
 import { analyticsService } from '../services/enhancedAnalytics';
 import { mailchimpService, addQualifiedInvestorLead, addInnerCircleApplication } from '../services/mailchimpService';
-import { airtableService } from '../services/airtableService';
+import { authFetch } from '../services/authSession';
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
 
 export const useIntegrations = () => {
   const [isInitialized, setIsInitialized] = useState(false);
   const [integrationStatus, setIntegrationStatus] = useState({
     analytics: false,
-    mailchimp: false,
-    airtable: false
+    mailchimp: false
   });
   const [errors, setErrors] = useState([]);
 
@@ -41,16 +42,6 @@ export const useIntegrations = () => {
         }
       }
 
-      // Test Airtable connection
-      if (INTEGRATION_CONFIG.features.investmentApplicationEnabled) {
-        try {
-          // Test connection here if needed
-          setIntegrationStatus(prev => ({ ...prev, airtable: true }));
-        } catch (error) {
-          console.warn('Airtable connection test failed:', error);
-        }
-      }
-
       setIsInitialized(true);
     } catch (error) {
       console.error('Integration initialization failed:', error);
@@ -112,20 +103,29 @@ export const useIntegrations = () => {
         source = 'inner-circle-application'
       } = applicationData;
 
-      // Calculate lead score
-      const leadScore = airtableService.calculateLeadScore(applicationData);
-      const priority = airtableService.getPriority(applicationData);
-
-      // Add to Airtable
-      let airtableResult = null;
-      if (integrationStatus.airtable) {
-        airtableResult = await airtableService.addInvestorApplication({
-          ...applicationData,
-          source,
-          leadScore,
-          priority
-        });
+      // Store in the backend, which scores it and syncs it to Airtable
+      const response = await fetch(`${BACKEND_URL}/api/applications`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          first_name: firstName,
+          last_name: lastName,
+          email,
+          phone: phone || null,
+          investment_capacity: investmentCapacity,
+          accredited_status: accreditedStatus,
+          investment_experience: investmentExperience || null,
+          hear_about_us: hearAboutUs || null,
+          additional_info: additionalInfo || null,
+          source
+        })
+      });
+      if (!response.ok) {
+        throw new Error(`Application submission failed: ${response.status}`);
       }
+      const stored = await response.json();
+      const leadScore = stored.lead_score;
+      const priority = stored.priority;
 
       // Add to Mailchimp
       if (integrationStatus.mailchimp) {
@@ -153,7 +153,7 @@ export const useIntegrations = () => {
       return { 
         success: true, 
         message: 'Application submitted successfully',
-        airtableRecord: airtableResult?.id,
+        applicationId: stored.id,
         leadScore,
         priority
       };
@@ -201,21 +201,27 @@ export const useIntegrations = () => {
     };
   }, [isInitialized, integrationStatus, errors]);
 
-  // Admin Functions (for future admin dashboard)
+  // Admin Functions, against the backend lead endpoints (admin token required)
   const adminFunctions = {
     getApplications: useCallback(async (filters = {}) => {
-      if (integrationStatus.airtable) {
-        return await airtableService.getApplications(filters);
+      const response = await authFetch(`${BACKEND_URL}/api/admin/leads?${new URLSearchParams(filters).toString()}`);
+      if (!response.ok) {
+        throw new Error(`Lead listing failed: ${response.status}`);
       }
-      return { records: [] };
-    }, [integrationStatus]),
-
-    updateApplicationStatus: useCallback(async (recordId, status, notes = '') => {
-      if (integrationStatus.airtable) {
-        return await airtableService.updateApplicationStatus(recordId, status, notes);
+      return await response.json();
+    }, []),
+
+    updateApplicationStatus: useCallback(async (leadId, status, notes = '') => {
+      const response = await authFetch(`${BACKEND_URL}/api/admin/leads/${leadId}`, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ status, follow_up_notes: notes || null })
+      });
+      if (!response.ok) {
+        throw new Error(`Lead update failed: ${response.status}`);
       }
-      return null;
-    }, [integrationStatus])
+      return await response.json();
+    }, [])
   };
 
   return {
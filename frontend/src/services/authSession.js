@@ -0,0 +1,71 @@
+// Auth session helpers for Nhalege Capital
+// Keeps the access/refresh token pair in localStorage and renews the access
+// token through /api/auth/refresh instead of sending users back to login
+
+const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
+
+export const storeTokens = (tokenData) => {
+  localStorage.setItem('auth_token', tokenData.access_token);
+  if (tokenData.refresh_token) {
+    localStorage.setItem('refresh_token', tokenData.refresh_token);
+  }
+};
+
+export const clearTokens = async () => {
+  const refreshToken = localStorage.getItem('refresh_token');
+  localStorage.removeItem('auth_token');
+  localStorage.removeItem('refresh_token');
+  if (refreshToken) {
+    try {
+      await fetch(`${backendUrl}/api/auth/logout`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      });
+    } catch (error) {
+      console.error('Logout request failed:', error);
+    }
+  }
+};
+
+// Shared between callers so concurrent 401s trigger a single rotation
+let pendingRefresh = null;
+
+export const refreshAccessToken = () => {
+  if (!pendingRefresh) {
+    pendingRefresh = (async () => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) return null;
+
+      const response = await fetch(`${backendUrl}/api/auth/refresh`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      });
+      if (!response.ok) {
+        localStorage.removeItem('refresh_token');
+        return null;
+      }
+      const tokenData = await response.json();
+      storeTokens(tokenData);
+      return tokenData.access_token;
+    })().finally(() => {
+      pendingRefresh = null;
+    });
+  }
+  return pendingRefresh;
+};
+
+// fetch() with the bearer token, retried once with a refreshed token on 401
+export const authFetch = async (url, options = {}) => {
+  const withToken = (token) => fetch(url, {
+    ...options,
+    headers: { ...(options.headers || {}), 'Authorization': `Bearer ${token}` }
+  });
+
+  const response = await withToken(localStorage.getItem('auth_token'));
+  if (response.status !== 401) return response;
+
+  const token = await refreshAccessToken();
+  return token ? withToken(token) : response;
+};